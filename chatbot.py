@@ -6,23 +6,20 @@ Combines retrieval + answer synthesis for end-to-end chatbot
 import os
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-# Set environment variables
-os.environ['TRANSFORMERS_NO_TF'] = '1'
-os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+# Set environment variables (without overriding the caller's own settings)
+os.environ.setdefault('TRANSFORMERS_NO_TF', '1')
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
 
 # Add current directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src import (
-    RetrievalPipeline,
-    TwoTierEmbeddingPipeline,
-    AnswerSynthesizer,
-    FreeEmbeddingGenerator,
-    FAISSStore,
-    ParentChunkLoader
-)
+# The src modules pull in torch/faiss/sentence-transformers, so they are
+# imported where used; --help and argument errors stay fast
+if TYPE_CHECKING:
+    from src import AnswerSynthesizer, ParentChunkLoader, RetrievalPipeline
 
 
 def initialize_chatbot(
@@ -47,15 +44,13 @@ def initialize_chatbot(
     Returns:
         Tuple of (retrieval_pipeline, answer_synthesizer)
     """
-    # Determine dimension
-    dimension_map = {
-        "sentence-transformers/all-MiniLM-L6-v2": 384,
-        "sentence-transformers/all-mpnet-base-v2": 768,
-        "intfloat/e5-large-v2": 1024,
-        "intfloat/e5-small-v2": 384,
-        "intfloat/e5-base-v2": 768,
-    }
-    dimension = dimension_map.get(model_name, 384)
+    from src import (
+        RetrievalPipeline,
+        TwoTierEmbeddingPipeline,
+        AnswerSynthesizer,
+        FreeEmbeddingGenerator,
+        FAISSStore
+    )
     
     # Initialize embedding generator
     embedding_generator = FreeEmbeddingGenerator(
@@ -63,6 +58,9 @@ def initialize_chatbot(
         device=device
     )
     
+    # Index dimension comes from the loaded model (works for any model)
+    dimension = embedding_generator.dimensions
+    
     # Initialize vector stores
     core_store = FAISSStore(
         index_path=core_index_path,
@@ -104,9 +102,9 @@ def initialize_chatbot(
 
 def chat(
     query: str,
-    retrieval_pipeline: RetrievalPipeline,
-    answer_synthesizer: AnswerSynthesizer,
-    parent_loader: Optional[ParentChunkLoader] = None,
+    retrieval_pipeline: "RetrievalPipeline",
+    answer_synthesizer: "AnswerSynthesizer",
+    parent_loader: Optional["ParentChunkLoader"] = None,
     use_longtail: bool = False,
     include_citations: bool = True
 ) -> dict:
@@ -253,6 +251,8 @@ def main():
     )
     
     # STEP 2: Load parent chunks for full expansion
+    from src import ParentChunkLoader
+    
     print("Loading parent chunks...")
     parent_loader = ParentChunkLoader(chunks_dir="chunks_product_management")
     print(f"Loaded {parent_loader.get_stats()['total_parents']} parent chunks")
@@ -3,11 +3,13 @@ Embedding Pipeline Script
 Processes JSON chunks and creates two-tier embeddings (core + longtail).
 """
 
+import logging
 import os
+import random
 import sys
-import json
+import time
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import Dict, Optional, Any
 
 # Add current directory to path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -16,79 +18,21 @@ from src import (
     EmbeddingGenerator,
     PineconeStore,
     TwoTierEmbeddingPipeline,
-    ChunkClassifier,
-    ParentChildChunk,
-    VideoMetadata
+    ChunkClassifier
+)
+from src.episode_loading import (
+    MAX_GROUP_RETRIES, index_episode_group, list_episode_sources, prefetch_episodes
 )
-from src.storage import ChunkStorage
-
 
-def load_chunks_from_json(json_file: Path) -> Dict[str, Any]:
-    """
-    Load chunks from JSON file.
-    
-    Args:
-        json_file: Path to JSON file
-        
-    Returns:
-        Dictionary with episode data
-    """
-    with open(json_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-
-def chunks_from_json_data(episode_data: Dict[str, Any]) -> tuple:
-    """
-    Convert JSON data to ParentChildChunk objects.
-    
-    Args:
-        episode_data: Episode data from JSON
-        
-    Returns:
-        Tuple of (parent_chunks, child_chunks, metadata, enriched_texts)
-    """
-    # Create metadata
-    meta_dict = episode_data['metadata']
-    metadata = VideoMetadata(
-        video_id=meta_dict.get('video_id', ''),
-        title=meta_dict.get('title', ''),
-        guest=meta_dict.get('guest', ''),
-        publish_date=meta_dict.get('publish_date', ''),
-        topics=meta_dict.get('topics', []),
-        description=meta_dict.get('description', ''),
-        view_count=meta_dict.get('view_count'),
-        duration=meta_dict.get('duration')
-    )
-    
-    # Create parent chunks
-    parent_chunks = []
-    for p_dict in episode_data.get('parent_chunks', []):
-        chunk = ParentChildChunk(
-            text=p_dict['text'],
-            start_seconds=p_dict['start_seconds'],
-            end_seconds=p_dict['end_seconds'],
-            chunk_type='parent'
-        )
-        chunk.id = p_dict['id']
-        parent_chunks.append(chunk)
-    
-    # Create child chunks
-    child_chunks = []
-    enriched_texts = []
-    for c_dict in episode_data.get('child_chunks', []):
-        chunk = ParentChildChunk(
-            text=c_dict['text'],
-            start_seconds=c_dict['start_seconds'],
-            end_seconds=c_dict['end_seconds'],
-            speaker=c_dict.get('speaker'),
-            parent_id=c_dict.get('parent_id'),
-            chunk_type='child'
-        )
-        chunk.id = c_dict['id']
-        child_chunks.append(chunk)
-        enriched_texts.append(c_dict.get('enriched_text', c_dict['text']))
-    
-    return parent_chunks, child_chunks, metadata, enriched_texts
+# Per-episode progress: one record per episode on stdout (same stream as
+# print, so ordering with the pipeline's own output is kept)
+logger = logging.getLogger("embed")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
 
 
 def embed_all_chunks(
@@ -98,7 +42,9 @@ def embed_all_chunks(
     pinecone_environment: str,
     core_index_name: str = "product-management-core",
     longtail_index_name: str = "product-management-longtail",
-    batch_size: int = 100
+    batch_size: int = 100,
+    mega_batch_episodes: int = 8,
+    embedding_cache_path: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Embed all chunks from JSON files.
@@ -111,6 +57,9 @@ def embed_all_chunks(
         core_index_name: Name of core index
         longtail_index_name: Name of longtail index
         batch_size: Batch size for processing
+        mega_batch_episodes: Episodes embedded together in one embedding call
+        embedding_cache_path: Opt-in SQLite file caching embeddings across
+            runs, so unchanged chunks are not re-embedded (None disables it)
         
     Returns:
         Dictionary with embedding statistics
@@ -119,12 +68,8 @@ def embed_all_chunks(
     if not chunks_path.exists():
         raise ValueError(f"Chunks directory not found: {chunks_dir}")
     
-    # Find all JSON files
-    json_files = list(chunks_path.glob("*.json"))
-    # Exclude consolidated file
-    json_files = [f for f in json_files if f.name != "all_chunks.json"]
-    
-    print(f"Found {len(json_files)} episode JSON files")
+    num_episodes, episode_sources = list_episode_sources(chunks_path)
+    print(f"Found {num_episodes} episodes")
     
     # Initialize embedding components
     embedding_generator = EmbeddingGenerator(
@@ -148,7 +93,8 @@ def embed_all_chunks(
     two_tier_pipeline = TwoTierEmbeddingPipeline(
         embedding_generator=embedding_generator,
         core_store=core_store,
-        longtail_store=longtail_store
+        longtail_store=longtail_store,
+        embedding_cache_path=embedding_cache_path
     )
     
     # Process episodes
@@ -165,49 +111,53 @@ def embed_all_chunks(
     print("Starting Embedding Process")
     print("="*70)
     
-    for i, json_file in enumerate(json_files, 1):
-        print(f"\n[{i}/{len(json_files)}] Processing: {json_file.name}")
-        
+    # Next files are loaded and parsed while earlier ones are embedded.
+    # Loaded episodes are indexed in groups: one embedding call per group.
+    group = []
+    retry_groups = []
+    for i, (name, episode) in enumerate(prefetch_episodes(episode_sources), 1):
         try:
-            # Load episode data
-            episode_data = load_chunks_from_json(json_file)
-            
-            # Convert to chunk objects
-            parent_chunks, child_chunks, metadata, enriched_texts = chunks_from_json_data(episode_data)
-            
-            print(f"  Episodes: {metadata.title or 'N/A'}")
-            print(f"  Guest: {metadata.guest or 'N/A'}")
-            print(f"  Child chunks: {len(child_chunks)}")
-            
-            # Index chunks
-            stats = two_tier_pipeline.index_chunks(
-                child_chunks=child_chunks,
-                parent_chunks=parent_chunks,
-                metadata=metadata,
-                enriched_texts=enriched_texts
-            )
-            
-            print(f"  Core chunks indexed: {stats['core_chunks']}")
-            print(f"  Longtail chunks indexed: {stats['longtail_chunks']}")
-            print(f"  Skipped chunks: {stats['skipped_chunks']}")
-            
-            # Update totals
-            total_stats["total_episodes"] += 1
-            total_stats["total_chunks"] += stats["total_chunks"]
-            total_stats["core_chunks"] += stats["core_chunks"]
-            total_stats["longtail_chunks"] += stats["longtail_chunks"]
-            total_stats["skipped_chunks"] += stats["skipped_chunks"]
-            total_stats["episodes_processed"].append({
-                "episode_id": metadata.video_id,
-                "title": metadata.title,
-                "stats": stats
-            })
-            
+            # Wait for episode data (loaded and converted on a worker thread)
+            parent_chunks, child_chunks, metadata, enriched_texts = episode.result()
         except Exception as e:
-            print(f"  ERROR: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[%d/%d] %s | ERROR: %s", i, num_episodes, name, e)
             continue
+        
+        logger.info(
+            "[%d/%d] %s | %s | guest: %s | child chunks: %d",
+            i, num_episodes, name,
+            metadata.title or 'N/A', metadata.guest or 'N/A', len(child_chunks)
+        )
+        
+        group.append((child_chunks, parent_chunks, metadata, enriched_texts))
+        if len(group) >= mega_batch_episodes:
+            failed = index_episode_group(two_tier_pipeline, group, total_stats)
+            if failed:
+                retry_groups.append(failed)
+            group = []
+    
+    if group:
+        failed = index_episode_group(two_tier_pipeline, group, total_stats)
+        if failed:
+            retry_groups.append(failed)
+    
+    # Retry groups that hit transient errors, backing off longer each round
+    for attempt in range(MAX_GROUP_RETRIES):
+        if not retry_groups:
+            break
+        delay = 5.0 * 2 ** attempt * (0.5 + random.random())
+        logger.info("\nRetrying %d group(s) in %.0fs...", len(retry_groups), delay)
+        time.sleep(delay)
+        retry_groups = [
+            failed for failed in (
+                index_episode_group(two_tier_pipeline, group, total_stats)
+                for group in retry_groups
+            )
+            if failed
+        ]
+    
+    for group in retry_groups:
+        logger.error("Giving up on: %s", ", ".join(metadata.title or metadata.video_id or 'N/A' for _, _, metadata, _ in group))
     
     print("\n" + "="*70)
     print("Embedding Complete")
@@ -264,6 +214,23 @@ def main():
         default="product-management-longtail",
         help="Longtail index name (default: product-management-longtail)"
     )
+    parser.add_argument(
+        "--mega-batch-episodes",
+        type=int,
+        default=8,
+        help="Episodes embedded together in one embedding call (default: 8)"
+    )
+    parser.add_argument(
+        "--embedding-cache",
+        type=str,
+        default=None,
+        help="SQLite file caching embeddings across runs (default: no cache)"
+    )
+    parser.add_argument(
+        "--no-embedding-cache",
+        action="store_true",
+        help="Re-embed every chunk without reading or writing the cache"
+    )
     
     args = parser.parse_args()
     
@@ -286,7 +253,9 @@ def main():
         pinecone_api_key=pinecone_key,
         pinecone_environment=pinecone_env,
         core_index_name=args.core_index,
-        longtail_index_name=args.longtail_index
+        longtail_index_name=args.longtail_index,
+        mega_batch_episodes=args.mega_batch_episodes,
+        embedding_cache_path=None if args.no_embedding_cache else args.embedding_cache
     )
     
     print("\nEmbedding complete!")
@@ -3,9 +3,13 @@ Process transcripts from a specific topic index file (e.g., product-management.m
 """
 
 import os
+import shutil
 import sys
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
 # Add the current directory to Python path so it can find 'src'
 current_dir = Path(__file__).resolve().parent
@@ -14,7 +18,61 @@ if str(current_dir) not in sys.path:
 
 from src import VideoRAGPipeline
 from src.github_integration import GitHubRepo, TopicIndexParser
-from src.storage import ChunkStorage
+from src.storage import EPISODES_JSONL, ChunkStorage, json_line
+
+
+# Per-process pipeline and storage used by episode workers (no embedding client)
+_worker_pipeline: Optional[VideoRAGPipeline] = None
+_worker_storage: Optional[ChunkStorage] = None
+
+
+def _init_episode_worker(config: Dict[str, Any], output_dir: str) -> None:
+    """Build the worker's pipeline and storage once when the process starts."""
+    global _worker_pipeline, _worker_storage
+    _worker_pipeline = VideoRAGPipeline(**config)
+    _worker_storage = ChunkStorage(output_dir=output_dir)
+
+
+def _process_one_episode(args: Tuple[Dict[str, Any], str, str]) -> Tuple[Dict[str, Any], Path, bytes]:
+    """
+    Chunk one episode and save its JSON inside a worker process.
+    
+    Args:
+        args: (episode entry from the topic file, transcript path, topic name)
+        
+    Returns:
+        (process_file result, path of the saved episode JSON, the episode
+        as a JSONL line)
+    """
+    episode, full_path, topic_name = args
+    
+    # Extract guest name for metadata
+    guest_name = episode['guest'].replace('-', ' ').title()
+    
+    # Process the transcript (indexing happens in the parent process)
+    result = _worker_pipeline.process_file(
+        file_path=full_path,
+        metadata_override={
+            'guest': guest_name,
+            'title': episode['title'] or f"Episode with {guest_name}",
+            'topics': [topic_name]
+        },
+        index=False
+    )
+    
+    # Extract episode identifier for saving
+    episode_id = result['metadata'].video_id or episode['guest']
+    
+    # Save chunks to JSON
+    episode_data = _worker_storage.episode_to_dict(
+        episode_id=episode_id,
+        parent_chunks=result['parent_chunks'],
+        child_chunks=result['child_chunks'],
+        metadata=result['metadata'],
+        enriched_texts=result.get('enriched_texts')
+    )
+    output_file = _worker_storage.save_episode_data(episode_data)
+    return result, output_file, json_line(episode_data)
 
 
 def process_topic_from_github(
@@ -24,7 +82,8 @@ def process_topic_from_github(
     index: bool = False,
     embedding_api_key: Optional[str] = None,
     output_dir: str = "chunks_product_management",
-    clean_output: bool = True
+    clean_output: bool = True,
+    max_workers: Optional[int] = None
 ):
     """
     Process all transcripts referenced in a topic index file from GitHub.
@@ -35,6 +94,9 @@ def process_topic_from_github(
         clone_repo: Whether to clone the repo (False if already cloned)
         index: Whether to index the processed chunks
         embedding_api_key: OpenAI API key for embeddings (optional)
+        output_dir: Directory for the per-episode JSON files
+        clean_output: Whether to delete existing output first
+        max_workers: Worker processes for chunking (default: CPU count)
     """
     print("=" * 70)
     print("Video RAG Pipeline - Topic-Based Processing")
@@ -78,74 +140,86 @@ def process_topic_from_github(
     storage = ChunkStorage(output_dir=output_dir)
     
     # Clean output directory if requested (to avoid overlap)
+    # The old directory is moved aside (one rename) and deleted in a background
+    # thread, so chunking doesn't wait on thousands of unlinks
     if clean_output and storage.output_dir.exists():
-        import shutil
         print(f"\nCleaning existing output directory: {storage.output_dir}")
-        shutil.rmtree(storage.output_dir)
-        print("Existing chunks deleted. Starting fresh.\n")
+        trash_dir = Path(tempfile.mkdtemp(
+            prefix=f"{storage.output_dir.name}.deleting-",
+            dir=storage.output_dir.parent
+        ))
+        storage.output_dir.rename(trash_dir / storage.output_dir.name)
+        threading.Thread(
+            target=shutil.rmtree, args=(trash_dir,), kwargs={'ignore_errors': True},
+            name="clean-output"
+        ).start()
+        print("Existing chunks moved aside for deletion. Starting fresh.\n")
     
     # Recreate output directory
     storage.output_dir.mkdir(parents=True, exist_ok=True)
     
     # Process each episode
+    # Ingestion through enrichment is CPU-bound and independent per episode,
+    # so it runs in worker processes; indexing stays in this process.
     results = []
-    print(f"\nProcessing {len(topic_data['episodes'])} episodes...")
+    episode_lines = []
+    episodes = topic_data['episodes']
+    total = len(episodes)
+    topic_name = Path(topic_file).stem.replace('-', ' ').title()
+    print(f"\nProcessing {total} episodes...")
     print("-" * 70)
     
-    for i, episode in enumerate(topic_data['episodes'], 1):
-        transcript_path = episode['path']
-        full_path = repo.local_path / transcript_path
-        
+    episode_args = []
+    for i, episode in enumerate(episodes, 1):
+        full_path = repo.local_path / episode['path']
         if not full_path.exists():
-            print(f"⚠ [{i}/{len(topic_data['episodes'])}] Skipping {episode['guest']}: File not found")
+            print(f"⚠ [{i}/{total}] Skipping {episode['guest']}: File not found")
             continue
-        
-        print(f"\n[{i}/{len(topic_data['episodes'])}] Processing: {episode['guest']}")
-        print(f"   File: {transcript_path}")
-        
-        try:
-            # Extract guest name for metadata
-            guest_name = episode['guest'].replace('-', ' ').title()
-            
-            # Process the transcript
-            result = pipeline.process_file(
-                file_path=str(full_path),
-                metadata_override={
-                    'guest': guest_name,
-                    'title': episode['title'] or f"Episode with {guest_name}",
-                    'topics': [Path(topic_file).stem.replace('-', ' ').title()]
-                },
-                index=index
-            )
-            
-            # Extract episode identifier for saving
-            episode_id = result['metadata'].video_id or episode['guest']
-            
-            # Save chunks to JSON
-            output_file = storage.save_episode_chunks(
-                episode_id=episode_id,
-                parent_chunks=result['parent_chunks'],
-                child_chunks=result['child_chunks'],
-                metadata=result['metadata'],
-                enriched_texts=result.get('enriched_texts')
-            )
-            
-            results.append({
-                'episode': episode,
-                'result': result
-            })
+        episode_args.append((i, episode, str(full_path)))
+    
+    max_workers = max_workers or os.cpu_count() or 1
+    # Workers chunk with the same settings as this process's pipeline
+    init_args = (pipeline.processing_config(), str(storage.output_dir))
+    
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             initializer=_init_episode_worker,
+                             initargs=init_args) as executor:
+        futures = [
+            (i, episode, executor.submit(_process_one_episode, (episode, full_path, topic_name)))
+            for i, episode, full_path in episode_args
+        ]
+        for i, episode, future in futures:
+            try:
+                result, output_file, episode_line = future.result()
+            except Exception as e:
+                print(f"\n[{i}/{total}] Failed: {episode['guest']}")
+                print(f"   File: {episode['path']}")
+                print(f"   Error: {e}")
+                continue
             
-            parent_count = len(result['parent_chunks'])
-            child_count = len(result['child_chunks'])
-            print(f"   Created {parent_count} parent chunks, {child_count} child chunks")
-            print(f"   Saved to: {output_file}")
+            # The episode JSON is already saved: keep chunks.jsonl in step
+            # with it even if indexing below fails
+            episode_lines.append(episode_line)
             
-        except Exception as e:
-            import traceback
-            print(f"   Error: {e}")
-            print(f"   Error details:")
-            traceback.print_exc()
-            continue
+            print(f"\n[{i}/{total}] Processed: {episode['guest']}")
+            print(f"   File: {episode['path']}")
+            try:
+                if index:
+                    pipeline.index_results(result)
+                
+                results.append({
+                    'episode': episode,
+                    'result': result
+                })
+                
+                parent_count = len(result['parent_chunks'])
+                child_count = len(result['child_chunks'])
+                print(f"   Created {parent_count} parent chunks, {child_count} child chunks")
+                print(f"   Saved to: {output_file}")
+                
+            except Exception as e:
+                print(f"   Error: {e}")
+                continue
     
     # Save consolidated JSON file with all chunks
     print("\n" + "=" * 70)
@@ -157,6 +231,16 @@ def process_topic_from_github(
     )
     print(f"Consolidated file saved to: {consolidated_file}")
     
+    # One-episode-per-line file for the embed step (one sequential read
+    # instead of one open per episode). Without a clean start it is rebuilt
+    # from all episode files, so episodes from earlier runs are kept.
+    if clean_output:
+        jsonl_file = storage.output_dir / EPISODES_JSONL
+        jsonl_file.write_bytes(b''.join(episode_lines))
+    else:
+        jsonl_file = storage.build_episodes_jsonl()
+    print(f"Episode JSONL file saved to: {jsonl_file}")
+    
     # Summary
     print("\n" + "=" * 70)
     print("Processing Summary")
@@ -221,6 +305,12 @@ def main():
         action="store_true",
         help="Don't delete existing output directory (append to existing)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for chunking (default: CPU count)"
+    )
     
     args = parser.parse_args()
     
@@ -232,7 +322,8 @@ def main():
         index=args.index,
         embedding_api_key=args.api_key,
         output_dir=args.output_dir,
-        clean_output=not args.no_clean
+        clean_output=not args.no_clean,
+        max_workers=args.workers
     )
     
     return results
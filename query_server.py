@@ -5,39 +5,221 @@ Query the RAG server (auto-detects Groq/Ollama)
 import sys
 import requests
 import json
+from functools import lru_cache
+from typing import List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Optional - C JSON parser/serializer (faster on large answers with citations)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
 
 SERVER_URL = "http://localhost:8000/query"
 
-def query(question: str, mode: str = "fast"):
+SEP = "=" * 70
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# One keep-alive session for all queries: repeated calls reuse the pooled
+# connection instead of opening a new one each time
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.2)
+)
+_SESSION.mount('http://', _ADAPTER)
+_SESSION.mount('https://', _ADAPTER)
+
+
+def close():
+    """Close the pooled connections."""
+    _SESSION.close()
+
+
+def _dumps(data) -> bytes:
+    """Serialize a request body as UTF-8 JSON."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
+
+def _loads(data: bytes):
+    """Parse a UTF-8 JSON response body."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _fetch_answer(question: str, mode: str, use_longtail: bool) -> bytes:
+    """POST one query and return the raw JSON body (raises on HTTP errors)."""
+    response = _SESSION.post(
+        SERVER_URL,
+        data=_dumps({
+            "query": question,
+            "synthesize_answer": True,
+            "include_citations": True,
+            "mode": mode,
+            "use_longtail": use_longtail
+        }),
+        headers=JSON_HEADERS,
+        timeout=60
+    )
+    response.raise_for_status()
+    return response.content
+
+
+# Repeated questions in one process (eval loops, notebooks) skip the round
+# trip. Raw bytes are cached so every caller parses its own copy; failed
+# requests raise and are never cached.
+_fetch_answer_cached = lru_cache(maxsize=1024)(_fetch_answer)
+
+
+def _print_header(question: str, mode: str):
+    """Print the query banner (one write)."""
+    sys.stdout.write(
+        f"\n{SEP}\nQUERY: {question}\n{SEP}\n\n"
+        f"[INFO] Mode: {mode.upper()}\n"
+        "[1/2] Sending request to server...\n"
+    )
+
+
+def query(question: str, mode: str = "fast", use_cache: bool = True):
     """Query the RAG system."""
     
-    print(f"\n{'='*70}")
-    print(f"QUERY: {question}")
-    print(f"{'='*70}\n")
+    _print_header(question, mode)
+    
+    fetch = _fetch_answer_cached if use_cache else _fetch_answer
+    try:
+        data = _loads(fetch(question, mode, False))
+        
+    except requests.exceptions.HTTPError as e:
+        print(f"[ERROR] Server returned status {e.response.status_code}")
+        print(e.response.text)
+        return None
+    except requests.exceptions.ConnectionError:
+        print("[ERROR] Could not connect to server!")
+        print("Make sure server is running:")
+        print('  python server.py')
+        return None
+    except Exception as e:
+        print(f"[ERROR] {e}")
+        return None
+    
+    print_response(data)
+    return data
+
+
+def query_stream(question: str, mode: str = "fast"):
+    """
+    Query the RAG system, printing the answer as it is generated.
     
-    print(f"[INFO] Mode: {mode.upper()}")
-    print("[1/2] Sending request to server...")
+    Reads the server-sent events of /query/stream: answer pieces are
+    written as they arrive, then the full response is printed.
     
+    Args:
+        question: Question to ask
+        mode: Answer mode
+        
+    Returns:
+        The final response, or None if the request failed
+    """
+    _print_header(question, mode)
+    
+    data = None
+    streamed = False
     try:
-        response = requests.post(
-            SERVER_URL,
-            json={
+        with _SESSION.post(
+            SERVER_URL + "/stream",
+            data=_dumps({
                 "query": question,
                 "synthesize_answer": True,
                 "include_citations": True,
                 "mode": mode,
                 "use_longtail": False
-            },
+            }),
+            headers=JSON_HEADERS,
+            stream=True,
             timeout=60
-        )
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line.startswith(b"data:"):
+                    continue
+                event = _loads(line[5:])
+                if 'answer_delta' in event:
+                    if not streamed:
+                        sys.stdout.write(f"\n{SEP}\nANSWER\n{SEP}\n\n")
+                        streamed = True
+                    sys.stdout.write(event['answer_delta'])
+                    sys.stdout.flush()
+                elif 'error' in event:
+                    print(f"\n[ERROR] {event['error']}")
+                    return None
+                elif 'response' in event:
+                    data = event['response']
         
-        if response.status_code != 200:
-            print(f"[ERROR] Server returned status {response.status_code}")
-            print(response.text)
-            return None
+    except requests.exceptions.HTTPError as e:
+        print(f"[ERROR] Server returned status {e.response.status_code}")
+        print(e.response.text)
+        return None
+    except requests.exceptions.ConnectionError:
+        print("[ERROR] Could not connect to server!")
+        print("Make sure server is running:")
+        print('  python server.py')
+        return None
+    except Exception as e:
+        print(f"[ERROR] {e}")
+        return None
+    
+    if data is None:
+        print("\n[ERROR] Stream ended without a response")
+        return None
+    
+    if streamed:
+        print()
+    print_response(data, show_answer=not streamed)
+    return data
+
+
+def query_batch(questions: List[str], mode: str = "fast") -> Optional[List[dict]]:
+    """
+    Query the RAG system with several questions in one request.
+    
+    The server retrieves for all questions in one batch, then answers
+    each one as a separate first-turn query.
+    
+    Args:
+        questions: Questions to ask
+        mode: Answer mode for every question
         
-        data = response.json()
+    Returns:
+        One response per question, or None if the request failed
+    """
+    print(f"[INFO] Sending {len(questions)} queries in one request (mode: {mode.upper()})...")
+    try:
+        response = _SESSION.post(
+            SERVER_URL + "/batch",
+            data=_dumps({
+                "queries": questions,
+                "mode": mode,
+                "use_longtail": False
+            }),
+            headers=JSON_HEADERS,
+            # The server answers every question before responding
+            timeout=60 * max(1, len(questions))
+        )
+        response.raise_for_status()
+        return _loads(response.content)
         
+    except requests.exceptions.HTTPError as e:
+        print(f"[ERROR] Server returned status {e.response.status_code}")
+        print(e.response.text)
+        return None
     except requests.exceptions.ConnectionError:
         print("[ERROR] Could not connect to server!")
         print("Make sure server is running:")
@@ -46,9 +228,67 @@ def query(question: str, mode: str = "fast"):
     except Exception as e:
         print(f"[ERROR] {e}")
         return None
+
+
+def _format_answer(answer) -> str:
+    """Render server.py's structured AnswerContent as plain text."""
+    if not isinstance(answer, dict):
+        return answer or ""
+    parts = [answer.get('direct_answer', '')]
+    if answer.get('key_ideas'):
+        parts.append("Key ideas:\n" + "\n".join(f"- {idea}" for idea in answer['key_ideas']))
+    if answer.get('common_pitfall'):
+        parts.append(f"Common pitfall: {answer['common_pitfall']}")
+    if answer.get('summary'):
+        parts.append(f"Summary: {answer['summary']}")
+    return "\n\n".join(part for part in parts if part)
+
+
+def _normalize_response(data: dict) -> dict:
+    """
+    Map server.py's QueryResponse onto the fields print_response reads.
+    
+    /query, /query/batch and the final /query/stream event all return
+    QueryResponse (latency_ms, structured answer, sources); responses that
+    already use the flat format are returned unchanged.
+    """
+    if 'latency_seconds' in data:
+        return data
+    sources = data.get('sources') or []
+    return {
+        'latency_seconds': round(data.get('latency_ms', 0) / 1000, 2),
+        'answer': _format_answer(data.get('answer')),
+        'is_refusal': data.get('safety_refusal', False),
+        'citations': [
+            {
+                'source_num': i,
+                'speaker': source.get('speaker', 'Unknown'),
+                'video_title': source.get('video_title', 'Unknown'),
+                'timestamp': source.get('timestamp', '0m0s'),
+                'youtube_url': source.get('link', ''),
+                'text_preview': source.get('text_preview', ''),
+            }
+            for i, source in enumerate(sources, 1)
+        ],
+        'provider': data.get('provider', 'unknown'),
+        'query_mode': data.get('mode', 'unknown'),
+        'confidence': data.get('confidence', 'unknown'),
+        'num_chunks': len(sources),
+    }
+
+
+def print_response(data: dict, show_answer: bool = True):
+    """
+    Print one query response.
+    
+    Lines are collected and written to stdout in one call.
     
+    Args:
+        data: Response from the server (QueryResponse or the flat format)
+        show_answer: Print the answer text (False when it was already streamed)
+    """
+    data = _normalize_response(data)
     latency = data['latency_seconds']
-    print(f"[2/2] Response received in {latency}s")
     
     # Performance indicator
     if latency < 1.5:
@@ -60,28 +300,22 @@ def query(question: str, mode: str = "fast"):
     else:
         perf = "SLOW"
     
-    print(f"     Performance: {perf}")
+    out = [
+        f"[2/2] Response received in {latency}s",
+        f"     Performance: {perf}",
+    ]
     
     # Display answer
-    print(f"\n{'='*70}")
-    print("ANSWER")
-    print(f"{'='*70}\n")
-    
-    if data.get('answer'):
-        print(data['answer'])
-    else:
-        print("(No answer generated)")
+    if show_answer:
+        out += ["", SEP, "ANSWER", SEP, ""]
+        out.append(data['answer'] if data.get('answer') else "(No answer generated)")
     
     # Display GROUND-TRUTH citations (no hallucination)
     # BUT: Don't show if LLM refused (safety feature)
     if data.get('is_refusal'):
-        print(f"\n{'='*70}")
-        print("[SAFETY] Question was refused - no citations shown")
-        print(f"{'='*70}")
+        out += ["", SEP, "[SAFETY] Question was refused - no citations shown", SEP]
     elif data.get('citations'):
-        print(f"\n{'='*70}")
-        print("CITATIONS (Ground Truth)")
-        print(f"{'='*70}\n")
+        out += ["", SEP, "CITATIONS (Ground Truth)", SEP, ""]
         for citation in data['citations'][:4]:
             source_num = citation.get('source_num', '?')
             speaker = citation.get('speaker', 'Unknown')
@@ -90,32 +324,61 @@ def query(question: str, mode: str = "fast"):
             youtube_url = citation.get('youtube_url', '')
             text_preview = citation.get('text_preview', citation.get('text', '')[:100])
             
-            print(f"[SOURCE {source_num}]")
-            print(f"    Speaker: {speaker}")
-            print(f"    Video: {video_title}")
-            print(f"    Time: {timestamp}")
-            print(f"    Link: {youtube_url}")
-            print(f"    Preview: {text_preview[:80]}...")
-            print()
+            out += [
+                f"[SOURCE {source_num}]",
+                f"    Speaker: {speaker}",
+                f"    Video: {video_title}",
+                f"    Time: {timestamp}",
+                f"    Link: {youtube_url}",
+                f"    Preview: {text_preview[:80]}...",
+                "",
+            ]
     
     # Display metadata
-    print(f"{'='*70}")
-    print("METADATA")
-    print(f"{'='*70}")
-    print(f"Provider: {data.get('provider', 'unknown')}")
-    print(f"Mode: {data.get('query_mode', 'unknown')}")
-    print(f"Confidence: {data.get('confidence', 'unknown')}")
-    print(f"Chunks: {data.get('num_chunks', 0)}")
-    print(f"Latency: {latency}s")
-    print(f"{'='*70}\n")
-    
-    return data
+    out += [
+        SEP,
+        "METADATA",
+        SEP,
+        f"Provider: {data.get('provider', 'unknown')}",
+        f"Mode: {data.get('query_mode', 'unknown')}",
+        f"Confidence: {data.get('confidence', 'unknown')}",
+        f"Chunks: {data.get('num_chunks', 0)}",
+        f"Latency: {latency}s",
+        SEP,
+        "",
+    ]
+    sys.stdout.write("\n".join(out) + "\n")
+
+
+DEFAULT_QUESTION = "How to prioritize features?"
 
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        question = " ".join(sys.argv[1:])
-    else:
-        question = "How to prioritize features?"
+    args = sys.argv[1:]
+    use_cache = "--no-cache" not in args
+    use_stream = "--stream" in args
+    # Batch mode is explicit (--batch or "-"): a non-tty stdin alone (cron,
+    # CI, < /dev/null) must not replace the default question
+    use_batch = "--batch" in args or "-" in args
+    args = [arg for arg in args if arg not in ("--no-cache", "--stream", "--batch", "-")]
     
-    query(question)
+    try:
+        questions = []
+        if use_batch:
+            # One question per line on stdin, all sent in one request
+            questions = [line.strip() for line in sys.stdin if line.strip()]
+            if not questions:
+                print("[WARN] No questions on stdin; asking the default question")
+        
+        if questions:
+            for question, data in zip(questions, query_batch(questions) or []):
+                sys.stdout.write(f"\n{SEP}\nQUERY: {question}\n{SEP}\n\n")
+                print_response(data)
+        else:
+            question = " ".join(args) if args else DEFAULT_QUESTION
+            if use_stream:
+                query_stream(question)
+            else:
+                query(question, use_cache=use_cache)
+    finally:
+        close()
@@ -5,6 +5,7 @@ Query the two-tier vector indexes with parent expansion and deduplication.
 
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional
 
@@ -19,7 +20,12 @@ from src import (
     RetrievalResult
 )
 
+SEP = "=" * 70
+RULE = "-" * 70
 
+# Repeated calls with the same settings (REPL, test harness, importing
+# callers) reuse the loaded model and open indexes
+@lru_cache(maxsize=4)
 def initialize_retrieval_pipeline(
     openai_api_key: str,
     pinecone_api_key: str,
@@ -98,7 +104,7 @@ def format_retrieval_results(results: List[RetrievalResult], retrieval_pipeline:
     
     lines = []
     lines.append(f"\nFound {len(results)} results:\n")
-    lines.append("="*70)
+    lines.append(SEP)
     
     for i, result in enumerate(results, 1):
         lines.append(f"\n[{i}] Score: {result.score:.3f} | Tier: {result.tier}")
@@ -119,7 +125,7 @@ def format_retrieval_results(results: List[RetrievalResult], retrieval_pipeline:
         if result.parent_text:
             lines.append(f"\n    Parent Context: {result.parent_text[:200]}...")
         
-        lines.append("-"*70)
+        lines.append(RULE)
     
     return "\n".join(lines)
 
@@ -5,6 +5,7 @@ Query the FAISS indexes using free Sentence Transformers models
 
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional
 
@@ -24,13 +25,19 @@ from src.free_embedding import FreeEmbeddingGenerator
 from src.faiss_store import FAISSStore
 from src.parent_loader import ParentChunkLoader
 
+SEP = "=" * 70
+RULE = "-" * 70
 
+# Repeated calls with the same settings (REPL, test harness, importing
+# callers) reuse the loaded model and open indexes
+@lru_cache(maxsize=4)
 def initialize_retrieval_pipeline(
     model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
     device: Optional[str] = None,
     core_index_path: str = "./faiss_indexes/product-management-core",
     longtail_index_path: str = "./faiss_indexes/product-management-longtail",
-    min_score_threshold: float = 0.3
+    min_score_threshold: float = 0.3,
+    quantization: str = "flat"
 ) -> RetrievalPipeline:
     """
     Initialize retrieval pipeline with free models.
@@ -40,26 +47,21 @@ def initialize_retrieval_pipeline(
         device: Device to use (auto-detects if None)
         core_index_path: Path to core FAISS index
         longtail_index_path: Path to longtail FAISS index
+        min_score_threshold: Minimum similarity score to consider
+        quantization: In-memory index encoding: "flat" (exact), "sq8" or "pq"
         
     Returns:
         Initialized RetrievalPipeline
     """
-    # Determine dimension
-    dimension_map = {
-        "sentence-transformers/all-MiniLM-L6-v2": 384,
-        "sentence-transformers/all-mpnet-base-v2": 768,
-        "intfloat/e5-large-v2": 1024,
-        "intfloat/e5-small-v2": 384,
-        "intfloat/e5-base-v2": 768,
-    }
-    dimension = dimension_map.get(model_name, 384)
-    
     # Initialize embedding generator
     embedding_generator = FreeEmbeddingGenerator(
         model_name=model_name,
         device=device
     )
     
+    # Index dimension comes from the loaded model (works for any model)
+    dimension = embedding_generator.dimensions
+    
     # Initialize vector stores
     core_store = FAISSStore(
         index_path=core_index_path,
@@ -71,6 +73,10 @@ def initialize_retrieval_pipeline(
         dimension=dimension
     )
     
+    # Smaller/faster search encodings, built from the loaded vectors
+    core_store.quantize(quantization)
+    longtail_store.quantize(quantization)
+    
     # Initialize two-tier pipeline (for parent lookup)
     two_tier_pipeline = TwoTierEmbeddingPipeline(
         embedding_generator=embedding_generator,
@@ -109,7 +115,7 @@ def format_retrieval_results(results: List[RetrievalResult], retrieval_pipeline:
     
     lines = []
     lines.append(f"\nFound {len(results)} results:\n")
-    lines.append("="*70)
+    lines.append(SEP)
     
     for i, result in enumerate(results, 1):
         lines.append(f"\n[{i}] Score: {result.score:.3f} | Tier: {result.tier}")
@@ -130,7 +136,7 @@ def format_retrieval_results(results: List[RetrievalResult], retrieval_pipeline:
         if result.parent_text:
             lines.append(f"\n    Parent Context: {result.parent_text[:200]}...")
         
-        lines.append("-"*70)
+        lines.append(RULE)
     
     return "\n".join(lines)
 
@@ -217,6 +223,14 @@ def main():
         default=0.3,
         help="Minimum similarity score threshold (default: 0.3)"
     )
+    parser.add_argument(
+        "--quantization",
+        type=str,
+        default="flat",
+        choices=list(FAISSStore.QUANTIZATIONS),
+        help="In-memory index encoding: flat (exact), sq8 (1/4 RAM, ~99%% recall@20) "
+             "or pq (~10x smaller, ~5x faster, ~80%% recall@20) (default: flat)"
+    )
     parser.add_argument(
         "--chunks-dir",
         type=str,
@@ -238,7 +252,8 @@ def main():
         device=args.device,
         core_index_path=args.core_index,
         longtail_index_path=args.longtail_index,
-        min_score_threshold=args.min_score
+        min_score_threshold=args.min_score,
+        quantization=args.quantization
     )
     
     # STEP 2: Load parent chunks for full expansion
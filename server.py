@@ -7,14 +7,28 @@ import os
 import sys
 import time
 import hashlib
+import json
+import queue
+import threading
 import uuid
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Callable, Optional, List, Dict, Any
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
+# Optional - C JSON serializer for responses (answers + sources are tens of KB)
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSONResponse = None
+    ORJSON_AVAILABLE = False
+
 # Set environment variables
 os.environ['TRANSFORMERS_NO_TF'] = '1'
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
@@ -41,7 +55,8 @@ from src.confidence import (
     get_confidence_prompt_modifier,
     limit_sources_by_answer_length
 )
-from src.memory import session_store
+from src.memory import get_session_store
+from src.unified_synthesizer import enable_queue_logging
 from src.followup_generator import (
     generate_followups, 
     extract_source_topics, 
@@ -54,7 +69,8 @@ from src.followup_generator import (
 app = FastAPI(
     title="Product Wisdom Hub API",
     description="Production-grade RAG with confidence gating and conversation memory",
-    version="3.2.0"
+    version="3.2.0",
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
 )
 
 # Add CORS middleware
@@ -137,6 +153,9 @@ answer_synthesizer = None
 llm_client = None
 actual_provider = None
 
+# Synthesizer request logs are written by a background thread
+synth_log_listener = enable_queue_logging()
+
 try:
     llm_client = get_llm(llm_provider)
     answer_synthesizer = UnifiedSynthesizer(
@@ -170,6 +189,12 @@ class QueryRequest(BaseModel):
     use_longtail: bool = False
     mode: str = "fast"
 
+class BatchQueryRequest(BaseModel):
+    """Independent first-turn queries answered in one request"""
+    queries: List[str]
+    use_longtail: bool = False
+    mode: str = "fast"
+
 class AnswerContent(BaseModel):
     """Structured answer content"""
     direct_answer: str
@@ -359,7 +384,7 @@ def parse_answer_sections(raw_answer: str) -> AnswerContent:
 @app.get("/")
 def root():
     """Health check"""
-    memory_stats = session_store.get_stats()
+    memory_stats = get_session_store().get_stats()
     return {
         "status": "running",
         "model": MODEL_NAME,
@@ -381,9 +406,13 @@ def health():
             "misses": cache_misses,
             "size": len(query_cache)
         },
-        "memory": session_store.get_stats()
+        "memory": get_session_store().get_stats()
     }
 
+def get_cache_key(query: str, mode: str) -> str:
+    """Key of a first-turn response in the query cache"""
+    return hashlib.md5(f"{query}_{mode}".encode()).hexdigest()
+
 @app.post("/query", response_model=QueryResponse)
 def query_endpoint(req: QueryRequest):
     """
@@ -391,6 +420,82 @@ def query_endpoint(req: QueryRequest):
     
     Returns STRICT contract - frontend renders only what's returned.
     """
+    return answer_query(req)
+
+@app.post("/query/batch", response_model=List[QueryResponse])
+def query_batch_endpoint(req: BatchQueryRequest):
+    """
+    Answer several independent queries (each in a new session) in one request.
+    
+    Retrieval for all queries runs as one batch: one embedding call and one
+    search per index. Each query is then answered exactly as by /query.
+    """
+    query_requests = [
+        QueryRequest(query=query, use_longtail=req.use_longtail, mode=req.mode)
+        for query in req.queries
+    ]
+    
+    # Safety refusals and cached answers never reach retrieval
+    to_retrieve = list(dict.fromkeys(
+        r.query for r in query_requests
+        if not get_safety_response(r.query)
+        and get_cache_key(r.query, r.mode) not in query_cache
+    ))
+    retrieved = {}
+    if to_retrieve:
+        print(f"\n[BATCH] Retrieving {len(to_retrieve)} of {len(query_requests)} queries")
+        batch_results = retrieval_pipeline.retrieve_batch(
+            to_retrieve,
+            use_longtail=req.use_longtail,
+            use_query_rewriting=False,
+            parent_loader=parent_loader
+        )
+        retrieved = dict(zip(to_retrieve, batch_results))
+    
+    return [answer_query(r, raw_results=retrieved.get(r.query)) for r in query_requests]
+
+@app.post("/query/stream")
+def query_stream_endpoint(req: QueryRequest):
+    """
+    Same as /query, streamed as server-sent events.
+    
+    Emits {"answer_delta": text} events while a RAG answer is generated,
+    then one {"response": QueryResponse} event (or {"error": detail}).
+    """
+    events: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+    
+    def run():
+        try:
+            response = answer_query(
+                req, on_answer_delta=lambda text: events.put({"answer_delta": text})
+            )
+            events.put({"response": response.dict()})
+        except HTTPException as e:
+            events.put({"error": e.detail})
+        finally:
+            events.put(None)
+    
+    threading.Thread(target=run, name="query-stream", daemon=True).start()
+    
+    def stream():
+        while (event := events.get()) is not None:
+            payload = orjson.dumps(event) if ORJSON_AVAILABLE else json.dumps(event).encode('utf-8')
+            yield b"data: " + payload + b"\n\n"
+    
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+def answer_query(req: QueryRequest, raw_results: Optional[List[Any]] = None,
+                 on_answer_delta: Optional[Callable[[str], None]] = None) -> QueryResponse:
+    """
+    Answer one query with confidence gating and conversation memory.
+    
+    Args:
+        req: Query request
+        raw_results: Retrieval results already fetched for req.query
+            (retrieves them when None)
+        on_answer_delta: Called with each generated piece of a RAG answer
+            (the answer is streamed from the LLM when set)
+    """
     global cache_hits, cache_misses
     start_time = time.time()
     
@@ -398,7 +503,7 @@ def query_endpoint(req: QueryRequest):
     # STEP 0: SESSION HANDLING
     # =========================================
     session_id = req.session_id or str(uuid.uuid4())
-    memory = session_store.get_or_create(session_id)
+    memory = get_session_store().get_or_create(session_id)
     
     print(f"\n{'='*60}")
     print(f"[QUERY] {req.query}")
@@ -442,7 +547,7 @@ def query_endpoint(req: QueryRequest):
     # =========================================
     # For first turn, use simple cache. For follow-ups, skip cache.
     if memory.get_turn_count() <= 1:
-        cache_key = hashlib.md5(f"{req.query}_{req.mode}".encode()).hexdigest()
+        cache_key = get_cache_key(req.query, req.mode)
         if cache_key in query_cache:
             cache_hits += 1
             print(f"   [CACHE HIT]")
@@ -459,12 +564,13 @@ def query_endpoint(req: QueryRequest):
         # =========================================
         # STEP 4: RETRIEVE & FILTER
         # =========================================
-        raw_results = retrieval_pipeline.retrieve_with_parent_loader(
-            query=req.query,
-            parent_loader=parent_loader,
-            use_longtail=req.use_longtail,
-            use_query_rewriting=False
-        )
+        if raw_results is None:
+            raw_results = retrieval_pipeline.retrieve_with_parent_loader(
+                query=req.query,
+                parent_loader=parent_loader,
+                use_longtail=req.use_longtail,
+                use_query_rewriting=False
+            )
         
         print(f"   [RETRIEVAL] Raw: {len(raw_results)} chunks")
         
@@ -490,7 +596,9 @@ def query_endpoint(req: QueryRequest):
         memory_context = memory.get_structured_context() if memory.get_turn_count() > 1 else {}
         summary_memory = memory_context.get("summary_memory", "")
         recent_turns = memory_context.get("recent_turns", "")
-        conversation_context = memory.get_context() if memory.get_turn_count() > 1 else ""  # Legacy fallback
+        conversation_context = (
+            memory.get_context(max_tokens=memory.CONTEXT_MAX_TOKENS) if memory.get_turn_count() > 1 else ""
+        )  # Legacy fallback
         
         if summary_memory or recent_turns:
             print(f"   [MEMORY] Summary: {len(summary_memory)} chars, Recent: {len(recent_turns)} chars")
@@ -562,15 +670,25 @@ def query_endpoint(req: QueryRequest):
         
         # Synthesize answer with structured memory (enables prompt caching)
         if answer_synthesizer:
-            result = answer_synthesizer.synthesize(
+            synth_kwargs = dict(
                 query=req.query,
                 retrieved_chunks=diverse_results,
                 include_citations=True,
                 mode=req.mode,
                 conversation_context=conversation_context,  # Legacy fallback
                 summary_memory=summary_memory,  # Compressed earlier context
-                recent_turns=recent_turns  # Last 2 turns
+                recent_turns=recent_turns,  # Last 2 turns
+                session_id=session_id  # Pins provider prompt-cache routing
             )
+            if on_answer_delta is not None:
+                # Pass pieces on as they arrive; the last event carries the result
+                for event in answer_synthesizer.synthesize_stream(**synth_kwargs):
+                    if event.get('done'):
+                        result = event
+                    else:
+                        on_answer_delta(event['answer_delta'])
+            else:
+                result = answer_synthesizer.synthesize(**synth_kwargs)
             raw_answer = result['answer']
         else:
             raw_answer = "Retrieval complete. Synthesis unavailable."
@@ -648,7 +766,7 @@ def query_endpoint(req: QueryRequest):
         
         # Cache first-turn responses only
         if memory.get_turn_count() <= 2:
-            cache_key = hashlib.md5(f"{req.query}_{req.mode}".encode()).hexdigest()
+            cache_key = get_cache_key(req.query, req.mode)
             query_cache[cache_key] = response
         
         return response
@@ -662,21 +780,16 @@ def query_endpoint(req: QueryRequest):
 @app.delete("/session/{session_id}")
 def clear_session(session_id: str):
     """Clear a specific session's memory."""
-    if session_id in session_store.sessions:
-        del session_store.sessions[session_id]
+    if get_session_store().delete(session_id):
         return {"status": "cleared", "session_id": session_id}
     return {"status": "not_found", "session_id": session_id}
 
 @app.get("/session/{session_id}")
 def get_session_info(session_id: str):
     """Get information about a session."""
-    if session_id in session_store.sessions:
-        memory = session_store.sessions[session_id]
-        return {
-            "session_id": session_id,
-            "turn_count": memory.get_turn_count(),
-            "context_preview": memory.get_context()[:500] if memory.get_context() else ""
-        }
+    info = get_session_store().info(session_id)
+    if info is not None:
+        return {"session_id": session_id, **info}
     return {"status": "not_found", "session_id": session_id}
 
 # ================================================
@@ -693,6 +806,11 @@ def startup_event():
     print("Docs: http://127.0.0.1:8000/docs")
     print("=" * 70 + "\n")
 
+@app.on_event("shutdown")
+def shutdown_event():
+    # Flush queued synthesizer logs
+    synth_log_listener.stop()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -10,8 +10,16 @@ from .faiss_store import FAISSStore
 from .parent_loader import ParentChunkLoader
 from .unified_synthesizer import UnifiedSynthesizer
 
-# LLM providers
-from .llm import BaseLLM, GroqLLM, OllamaLLM, get_llm, LLMRouter
+# LLM providers (GroqLLM / OllamaLLM resolve lazily through src.llm)
+from .llm import BaseLLM, get_llm, LLMRouter
+
+
+def __getattr__(name):
+    if name in ('GroqLLM', 'OllamaLLM'):
+        from . import llm
+        return getattr(llm, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'RetrievalPipeline',
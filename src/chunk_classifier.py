@@ -3,7 +3,9 @@ Chunk Classifier Module
 Lightweight rule-based classifier to categorize child chunks before embedding.
 """
 
-from typing import List, Literal
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Literal, Optional
 from .chunking import ParentChildChunk
 
 
@@ -22,6 +24,10 @@ class ChunkClassifier:
     - banter: jokes, filler (SKIP)
     """
     
+    # Distinct texts remembered by classify() (covers a full re-index
+    # of a ~10k-chunk corpus in one process)
+    CACHE_SIZE = 16384
+    
     def __init__(self, min_content_words: int = 25, relaxed_mode: bool = True):
         """
         Initialize classifier.
@@ -32,6 +38,9 @@ class ChunkClassifier:
         """
         self.min_content_words = min_content_words
         self.relaxed_mode = relaxed_mode
+        # Fewer characters than this can't hold min_content_words words
+        # (each word needs a character plus a separator)
+        self._short_chars = 2 * min_content_words - 1
         
         # FIX 1: RELAXED - Only hard sponsor/ad filters
         # Only skip if clearly an ad/sponsor
@@ -62,6 +71,28 @@ class ChunkClassifier:
             "strategy", "method", "process", "technique", "principle",
             "how to", "what is", "why", "because", "should", "recommend"
         ]
+        
+        self._init_cache()
+    
+    def _init_cache(self):
+        # Per instance, so the key is just the text: the thresholds and
+        # keyword lists are this classifier's own
+        self._classify_text = lru_cache(maxsize=self.CACHE_SIZE)(self._classify_text_uncached)
+    
+    def cache_clear(self):
+        """Forget cached classifications (call after changing keyword lists)."""
+        self._classify_text.cache_clear()
+    
+    def __getstate__(self):
+        # The cache wrapper can't be pickled (classify_batch workers);
+        # each process starts with its own empty cache
+        state = self.__dict__.copy()
+        del state['_classify_text']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_cache()
     
     def should_skip_chunk(self, text: str) -> bool:
         """
@@ -74,28 +105,46 @@ class ChunkClassifier:
         Returns:
             True if chunk should be skipped, False if it should be embedded
         """
-        t = text.lower().strip()
-        word_count = len(text.split())
+        return self._skip_reason(text, text.lower()) is not None
+    
+    def _skip_reason(self, text: str, text_lower: str) -> Optional[ChunkType]:
+        """
+        Find why a chunk should be skipped.
+        
+        Each keyword list is scanned at most once; plain substring checks
+        beat one combined regex here (Python's re is slow on alternations).
         
+        Args:
+            text: Chunk text
+            text_lower: text.lower()
+            
+        Returns:
+            "sponsor", "meta" or "banter", or None if the chunk should be embedded
+        """
         # 1. Hard sponsor / ad filters (ONLY skip if clearly an ad)
         for keyword in self.sponsor_keywords:
-            if keyword in t:
-                return True
+            if keyword in text_lower:
+                return "sponsor"
         
         # 2. Intro / outro boilerplate
         for keyword in self.meta_keywords:
-            if keyword in t:
-                return True
+            if keyword in text_lower:
+                return "meta"
         
         # 3. Pure filler (VERY short + no signal words)
-        if word_count < self.min_content_words:
+        # Length gate first; otherwise split only as far as the threshold
+        # (maxsplit caps the work at min_content_words words)
+        min_words = self.min_content_words
+        if len(text) < self._short_chars or len(text.split(None, min_words - 1)) < min_words:
             # Check if it has signal words - if yes, keep it
-            has_signal = any(signal in t for signal in self.signal_words)
-            if not has_signal:
-                return True
+            for signal in self.signal_words:
+                if signal in text_lower:
+                    break
+            else:
+                return "banter"
         
         # Everything else should be embedded
-        return False
+        return None
     
     def classify(self, chunk: ParentChildChunk) -> ChunkType:
         """
@@ -108,42 +157,56 @@ class ChunkClassifier:
         Returns:
             Chunk type classification
         """
-        text_lower = chunk.text.lower()
-        word_count = len(chunk.text.split())
-        
-        # FIX 1: Use relaxed should_skip logic
-        if self.should_skip_chunk(chunk.text):
-            # Determine skip reason for stats
-            for keyword in self.sponsor_keywords:
-                if keyword in text_lower:
-                    return "sponsor"
-            for keyword in self.meta_keywords:
-                if keyword in text_lower:
-                    return "meta"
-            # Must be too short without signal words
-            return "banter"
+        return self._classify_text(chunk.text)
+    
+    def _classify_text_uncached(self, text: str) -> ChunkType:
+        """Classify chunk text (see classify(); called through the cache)."""
+        text_lower = text.lower()
+        
+        # FIX 1: Use relaxed should_skip logic (the reason doubles as the type)
+        skip_reason = self._skip_reason(text, text_lower)
+        if skip_reason is not None:
+            return skip_reason
         
         # Check for anecdote indicators (but still embed them)
-        anecdote_score = sum(1 for indicator in self.anecdote_indicators 
-                           if indicator in text_lower)
-        if anecdote_score >= 2:  # Multiple indicators = likely anecdote
-            return "anecdote"
+        # Multiple indicators = likely anecdote; stop counting at two
+        anecdote_score = 0
+        for indicator in self.anecdote_indicators:
+            if indicator in text_lower:
+                anecdote_score += 1
+                if anecdote_score >= 2:
+                    return "anecdote"
         
         # Default: content (advice, frameworks, opinions)
         # FIX 1: Now most chunks will be classified as content
         return "content"
     
-    def classify_batch(self, chunks: List[ParentChildChunk]) -> List[ChunkType]:
+    def classify_batch(self, chunks: List[ParentChildChunk],
+                       max_workers: Optional[int] = None) -> List[ChunkType]:
         """
         Classify multiple chunks.
         
         Args:
             chunks: List of child chunks
+            max_workers: Worker processes for large corpora (None or 1 =
+                in this process). Only worth it for tens of thousands of
+                chunks; don't use it after torch/CUDA is initialized.
             
         Returns:
             List of classifications (same order as chunks)
         """
-        return [self.classify(chunk) for chunk in chunks]
+        texts = [chunk.text for chunk in chunks]
+        if not max_workers or max_workers <= 1 or len(texts) < 2:
+            return [self._classify_text(text) for text in texts]
+        
+        # A few shards per worker: one pickled classifier + text list each
+        shard_size = -(-len(texts) // (max_workers * 4))
+        shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+        classifications = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for shard_result in executor.map(_classify_shard, [self] * len(shards), shards):
+                classifications.extend(shard_result)
+        return classifications
     
     def should_embed(self, chunk_type: ChunkType) -> bool:
         """
@@ -218,3 +281,8 @@ class ChunkClassifier:
                 stats["embeddable"] += 1
         
         return stats
+
+
+def _classify_shard(classifier: ChunkClassifier, texts: List[str]) -> List[ChunkType]:
+    """Classify a shard of texts inside a worker process."""
+    return [classifier._classify_text(text) for text in texts]
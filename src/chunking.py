@@ -6,7 +6,7 @@ NOTE: tiktoken is optional - only needed for creating new chunks.
 The server only reads existing chunks, so tiktoken isn't required at runtime.
 """
 
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Sequence, Tuple
 import numpy as np
 
 # Optional imports - only needed for chunking, not for serving
@@ -32,6 +32,12 @@ except ImportError:
 class ParentChildChunk:
     """Represents a chunk in the hierarchical structure."""
     
+    # Thousands are built per episode: slots drop the per-instance __dict__
+    __slots__ = (
+        'text', 'start_seconds', 'end_seconds', 'speaker', 'parent_id',
+        'chunk_type', 'id', 'segment_indices', 'child_offset_in_parent'
+    )
+    
     def __init__(self, text: str, start_seconds: float, end_seconds: float,
                  speaker: Optional[str] = None, parent_id: Optional[str] = None,
                  chunk_type: str = "child"):
@@ -44,6 +50,54 @@ class ParentChildChunk:
         self.id = None  # Will be set during indexing
         # FIX 2: Track segment indices for index-based parent-child mapping
         self.segment_indices: List[int] = []
+        # Character offset of a child's text inside its parent (-1 = unknown)
+        self.child_offset_in_parent: int = -1
+    
+    @classmethod
+    def from_columns(cls, ids: Sequence[str], texts: Sequence[str],
+                     starts: Sequence[float], ends: Sequence[float],
+                     speakers: Optional[Sequence[Optional[str]]] = None,
+                     parent_ids: Optional[Sequence[Optional[str]]] = None,
+                     chunk_type: str = "child") -> List["ParentChildChunk"]:
+        """
+        Build many chunks from parallel columns (e.g. loaded from JSON).
+        
+        Same result as calling the constructor and setting .id per chunk, but
+        fields are stored directly, without an __init__ call per chunk.
+        
+        Args:
+            ids: Chunk IDs
+            texts: Chunk texts
+            starts: Start times in seconds
+            ends: End times in seconds
+            speakers: Speaker per chunk (None = all unknown)
+            parent_ids: Parent ID per chunk (None = no parents)
+            chunk_type: "parent" or "child" for every chunk
+            
+        Returns:
+            List of chunks in column order
+        """
+        n = len(ids)
+        speakers = speakers if speakers is not None else [None] * n
+        parent_ids = parent_ids if parent_ids is not None else [None] * n
+        
+        new = object.__new__
+        chunks = []
+        append = chunks.append
+        for chunk_id, text, start, end, speaker, parent_id in zip(
+                ids, texts, starts, ends, speakers, parent_ids):
+            chunk = new(cls)
+            chunk.text = text
+            chunk.start_seconds = start
+            chunk.end_seconds = end
+            chunk.speaker = speaker
+            chunk.parent_id = parent_id
+            chunk.chunk_type = chunk_type
+            chunk.id = chunk_id
+            chunk.segment_indices = []
+            chunk.child_offset_in_parent = -1
+            append(chunk)
+        return chunks
 
 
 class HierarchicalChunker:
@@ -323,7 +377,9 @@ class HierarchicalChunker:
             parent = parent_lookup.get(child.parent_id)
             if parent is None:
                 raise ValueError(f"Child {child.id} has invalid parent_id: {child.parent_id}")
-            if child.text not in parent.text:
+            # Record the offset once here so retrieval never has to search for it
+            child.child_offset_in_parent = parent.text.find(child.text)
+            if child.child_offset_in_parent == -1:
                 raise ValueError(
                     f"Child {child.id} text not found in parent {parent.id} text. "
                     f"This indicates cross-parent contamination."
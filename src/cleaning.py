@@ -7,6 +7,20 @@ import re
 from typing import List
 from .ingestion import Segment
 
+# Optional - multi-pattern DFA scanner (finds whether any artifact is present
+# in one pass, without the regex engine's per-bracket backtracking)
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    hyperscan = None
+    HYPERSCAN_AVAILABLE = False
+
+
+def _stop_scan(*args) -> bool:
+    """Hyperscan match handler: stop at the first match."""
+    return True
+
 
 class TextCleaner:
     """Cleans transcript text by removing artifacts and reconstructing sentences."""
@@ -19,9 +33,46 @@ class TextCleaner:
             r'\[.*?\d{2}:\d{2}:\d{2}.*?\]',  # Timestamp artifacts
         ]
         
+        # Compiled once. Kept as separate passes in order: one alternation
+        # was measured slower and removes different spans on nested brackets
+        self._artifact_res = [
+            re.compile(pattern, re.IGNORECASE) for pattern in self.artifact_patterns
+        ]
+        self._artifact_db = self._build_artifact_db()
+        
         # Pattern for general brackets (be more careful)
         self.bracket_pattern = re.compile(r'\[.*?\]|\(.*?\)')
     
+    def _build_artifact_db(self):
+        """Compile the artifact patterns into one Hyperscan database (None without hyperscan)."""
+        if not HYPERSCAN_AVAILABLE:
+            return None
+        database = hyperscan.Database()
+        database.compile(
+            expressions=[pattern.encode('ascii') for pattern in self.artifact_patterns],
+            ids=list(range(len(self.artifact_patterns))),
+            elements=len(self.artifact_patterns),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(self.artifact_patterns)
+        )
+        return database
+    
+    def _may_have_artifacts(self, text: str) -> bool:
+        """
+        Check whether any artifact pattern matches text.
+        
+        If none matches, the sequential re.sub passes leave the text
+        unchanged, so they can be skipped. Only ASCII text is checked with
+        Hyperscan (its caseless mode is ASCII-only; re also folds e.g. the
+        Kelvin sign into 'k'); anything else is assumed to match.
+        """
+        if self._artifact_db is None or not text.isascii():
+            return True
+        try:
+            self._artifact_db.scan(text.encode('ascii'), match_event_handler=_stop_scan)
+        except hyperscan.ScanTerminated:
+            return True
+        return False
+    
     def remove_artifacts(self, text: str) -> str:
         """
         Remove non-semantic artifacts from transcript text.
@@ -32,15 +83,16 @@ class TextCleaner:
         Returns:
             Cleaned text
         """
+        # Remove specific artifact patterns (all of them need a bracket;
+        # most caption text has none, so skip the scans)
         cleaned = text
+        if ('[' in cleaned or '(' in cleaned) and self._may_have_artifacts(cleaned):
+            for pattern in self._artifact_res:
+                cleaned = pattern.sub('', cleaned)
         
-        # Remove specific artifact patterns
-        for pattern in self.artifact_patterns:
-            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
-        
-        # Clean up extra whitespace
-        cleaned = re.sub(r'\s+', ' ', cleaned)
-        cleaned = cleaned.strip()
+        # Clean up extra whitespace (str.split() uses the same whitespace
+        # set as \s and is several times faster than re.sub)
+        cleaned = ' '.join(cleaned.split())
         
         return cleaned
     
@@ -55,29 +107,15 @@ class TextCleaner:
         Returns:
             Text with reconstructed sentences
         """
-        lines = text.split('\n')
-        reconstructed = []
-        buffer = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            buffer.append(line)
-            
-            # Check if line ends with terminal punctuation
-            if re.search(r'[.!?]\s*$', line):
-                # Join buffer and add to reconstructed
-                sentence = ' '.join(buffer)
-                reconstructed.append(sentence)
-                buffer = []
+        # Single line (always the case after remove_artifacts): nothing to join
+        if '\n' not in text:
+            return text.strip()
         
-        # Add any remaining buffer
-        if buffer:
-            reconstructed.append(' '.join(buffer))
-        
-        return ' '.join(reconstructed)
+        # Buffered lines are space-joined into a sentence at terminal
+        # punctuation and sentences are space-joined again, so the result is
+        # every non-empty line in order, joined by single spaces
+        stripped = (line.strip() for line in text.split('\n'))
+        return ' '.join(line for line in stripped if line)
     
     def clean_segment(self, segment: Segment) -> Segment:
         """
@@ -89,12 +127,11 @@ class TextCleaner:
         Returns:
             Cleaned segment
         """
-        # Remove artifacts
+        # Remove artifacts. The result is whitespace-collapsed (no line
+        # breaks, no outer spaces), so reconstruct_sentences would return it
+        # unchanged and is skipped
         cleaned_text = self.remove_artifacts(segment.text)
         
-        # Reconstruct sentences
-        cleaned_text = self.reconstruct_sentences(cleaned_text)
-        
         # Create new segment with cleaned text
         cleaned_segment = Segment(
             text=cleaned_text,
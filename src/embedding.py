@@ -3,13 +3,69 @@ Embedding and Vector Storage Module
 Handles embedding generation and vector database operations.
 """
 
+import hashlib
+import os
+import random
+import re
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Any
 from .chunking import ParentChildChunk
 from .ingestion import VideoMetadata
+from .parent_text_store import SpillingParentStore
 import numpy as np
 
 
+# Supported embedding precisions for storage / transfer
+QUANTIZATION_MODES = ("fp32", "fp16", "int8")
+
+# int8 scale: unit-normalized components in [-1, 1] map to [-127, 127]
+INT8_SCALE = 127.0
+
+# Characters ignored by EmbeddingGenerator's fuzzy cache keys
+_NON_WORD_RE = re.compile(r'[\W_]+')
+
+
+def quantize_embeddings(matrix: np.ndarray, mode: str = "fp32") -> np.ndarray:
+    """
+    Quantize an (n, dim) embedding matrix for cosine similarity.
+    
+    Rows are L2-normalized first, so int8 uses a fixed symmetric scale:
+    the dot product of two int8 rows divided by 127*127 is their cosine.
+    
+    Args:
+        matrix: Embedding matrix
+        mode: "fp32", "fp16" or "int8"
+        
+    Returns:
+        Matrix in the requested precision (fp32 is returned unnormalized)
+    """
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unsupported quantization mode: {mode}")
+    
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if mode == "fp32":
+        return matrix
+    
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    unit = matrix / np.maximum(norms, 1e-12)
+    
+    if mode == "fp16":
+        return unit.astype(np.float16)
+    return np.clip(np.round(unit * INT8_SCALE), -128, 127).astype(np.int8)
+
+
+def dequantize_embeddings(matrix: np.ndarray) -> np.ndarray:
+    """Convert a matrix produced by quantize_embeddings back to float32."""
+    matrix = np.asarray(matrix)
+    if matrix.dtype == np.int8:
+        return matrix.astype(np.float32) / INT8_SCALE
+    return matrix.astype(np.float32, copy=False)
+
+
 class VectorStore:
     """Abstract base class for vector storage."""
     
@@ -21,13 +77,41 @@ class VectorStore:
              filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Query the vector store."""
         raise NotImplementedError
+    
+    def upsert_dense(self, matrix: np.ndarray, records: List[Dict[str, Any]]):
+        """
+        Upsert a dense (n, dim) embedding matrix with one metadata record per row.
+        
+        Default implementation rebuilds per-vector dicts for upsert(); stores
+        that can take the matrix as-is should override this. Quantized
+        matrices (see quantize_embeddings) are converted back to float32.
+        """
+        matrix = dequantize_embeddings(matrix)
+        self.upsert([dict(record, vector=row.tolist()) for record, row in zip(records, matrix)])
+    
+    def query_batch(self, query_vectors: List[List[float]], top_k: int = 5,
+                    filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Query the vector store with several vectors at once.
+        
+        Default implementation issues one query per vector; stores that can
+        search a batch in a single call should override this.
+        """
+        return [self.query(query_vector, top_k=top_k, filters=filters)
+                for query_vector in query_vectors]
 
 
 class EmbeddingGenerator:
     """Generates embeddings for text chunks."""
     
+    # Most inputs the embeddings endpoint accepts in one request
+    MAX_BATCH_INPUTS = 2048
+    
     def __init__(self, model_name: str = "text-embedding-3-large", 
-                 dimensions: int = 1536, api_key: Optional[str] = None):
+                 dimensions: int = 1536, api_key: Optional[str] = None,
+                 request_batch_size: int = 256, max_concurrency: int = 8,
+                 max_retries: int = 5, cache_size: int = 5000,
+                 fuzzy_cache: bool = False):
         """
         Initialize embedding generator.
         
@@ -35,10 +119,27 @@ class EmbeddingGenerator:
             model_name: OpenAI embedding model name
             dimensions: Embedding dimensions (1536 for large, 256 for small)
             api_key: OpenAI API key
+            request_batch_size: Texts per embeddings request (capped at MAX_BATCH_INPUTS)
+            max_concurrency: Embeddings requests in flight at once in embed_batch
+            max_retries: Retries per request after a rate-limit (429) error
+            cache_size: Recent embeddings kept in memory, keyed by text hash
+                (repeated texts skip the API; 0 disables)
+            fuzzy_cache: Key the cache on the text's words only (case,
+                whitespace and punctuation ignored), so near-identical
+                texts share one embedding instead of each being requested
         """
         self.model_name = model_name
         self.dimensions = dimensions
         self.api_key = api_key
+        self.request_batch_size = min(request_batch_size, self.MAX_BATCH_INPUTS)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        
+        # Bounded LRU: text digest -> embedding (model/dimensions are fixed per instance)
+        self.cache_size = cache_size
+        self.fuzzy_cache = fuzzy_cache
+        self._cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
         
         # Initialize OpenAI client if API key provided
         if api_key:
@@ -63,36 +164,123 @@ class EmbeddingGenerator:
         if not self.client:
             raise ValueError("OpenAI client not initialized. Provide API key.")
         
+        key = self._cache_key(text)
+        cached = self._cache_get_many([key])
+        if cached:
+            return cached[key]
+        
         try:
             response = self.client.embeddings.create(
                 model=self.model_name,
                 input=text,
                 dimensions=self.dimensions
             )
-            return response.data[0].embedding
+            embedding = response.data[0].embedding
         except Exception as e:
             raise RuntimeError(f"Failed to generate embedding: {e}")
+        
+        self._cache_put_many([(key, embedding)])
+        return embedding
     
     def embed_batch(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for multiple texts.
         
+        Cached texts are served from memory; the rest are sent
+        request_batch_size at a time, with up to max_concurrency requests
+        in flight so API latency overlaps.
+        
         Args:
             texts: List of texts to embed
             
         Returns:
-            List of embedding vectors
+            List of embedding vectors, in input order
+        """
+        if not self.client:
+            raise ValueError("OpenAI client not initialized. Provide API key.")
+        
+        keys = [self._cache_key(text) for text in texts]
+        found = self._cache_get_many(keys)
+        
+        # Unique misses only: identical texts are requested once
+        misses = {key: text for key, text in zip(keys, texts) if key not in found}
+        if misses:
+            miss_texts = list(misses.values())
+            size = self.request_batch_size
+            batches = [miss_texts[start:start + size] for start in range(0, len(miss_texts), size)]
+            
+            if len(batches) <= 1 or self.max_concurrency <= 1:
+                results = [self._embed_request(batch) for batch in batches]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                    results = list(executor.map(self._embed_request, batches))
+            
+            new_embeddings = list(zip(misses, (embedding for result in results for embedding in result)))
+            self._cache_put_many(new_embeddings)
+            found.update(new_embeddings)
+        
+        return [found[key] for key in keys]
+    
+    def _cache_key(self, text: str) -> bytes:
+        if self.fuzzy_cache:
+            text = _NON_WORD_RE.sub(' ', text.casefold()).strip()
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    
+    def _cache_get_many(self, keys: List[bytes]) -> Dict[bytes, List[float]]:
+        """Look up cached embeddings (marks hits as recently used)."""
+        found = {}
+        if self.cache_size <= 0:
+            return found
+        with self._cache_lock:
+            for key in keys:
+                embedding = self._cache.get(key)
+                if embedding is not None:
+                    self._cache.move_to_end(key)
+                    found[key] = embedding
+        return found
+    
+    def _cache_put_many(self, items: List[tuple]):
+        """Cache (key, embedding) pairs, evicting the least recently used."""
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            for key, embedding in items:
+                self._cache[key] = embedding
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def _embed_request(self, batch: List[str]) -> List[List[float]]:
         """
-        embeddings = []
-        for text in texts:
-            embeddings.append(self.embed(text))
-        return embeddings
+        Send one embeddings request, retrying rate-limit errors.
+        
+        Retries back off exponentially with jitter, so concurrent requests
+        that hit the limit together don't all retry at the same moment.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.client.embeddings.create(
+                    model=self.model_name,
+                    input=batch,
+                    dimensions=self.dimensions
+                )
+                break
+            except Exception as e:
+                rate_limited = (getattr(e, 'status_code', None) == 429
+                                or type(e).__name__ == 'RateLimitError')
+                if not rate_limited or attempt == self.max_retries:
+                    raise RuntimeError(f"Failed to generate embeddings: {e}")
+                time.sleep(min(2 ** attempt, 30) * (0.5 + random.random()))
+        
+        # Results carry their input index; don't rely on response order
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
 
 
 class PineconeStore(VectorStore):
     """Pinecone vector store implementation."""
     
-    def __init__(self, api_key: str, environment: str, index_name: str):
+    def __init__(self, api_key: str, environment: str, index_name: str,
+                 batch_size: int = 100, pool_threads: int = 8):
         """
         Initialize Pinecone store.
         
@@ -100,6 +288,9 @@ class PineconeStore(VectorStore):
             api_key: Pinecone API key
             environment: Pinecone environment
             index_name: Index name
+            batch_size: Vectors per upsert request (Pinecone recommends 100;
+                larger requests hit the request size limit)
+            pool_threads: Upsert requests in flight at once
         """
         try:
             import pinecone
@@ -111,6 +302,8 @@ class PineconeStore(VectorStore):
         self.pinecone.init(api_key=api_key, environment=environment)
         self.index = self.pinecone.Index(index_name)
         self.index_name = index_name
+        self.batch_size = batch_size
+        self.pool_threads = pool_threads
     
     def upsert(self, vectors: List[Dict[str, Any]]):
         """Upsert vectors to Pinecone."""
@@ -144,7 +337,16 @@ class PineconeStore(VectorStore):
                 'metadata': metadata
             })
         
-        self.index.upsert(vectors=pinecone_vectors)
+        size = self.batch_size
+        batches = [pinecone_vectors[start:start + size] for start in range(0, len(pinecone_vectors), size)]
+        
+        if len(batches) <= 1 or self.pool_threads <= 1:
+            for batch in batches:
+                self.index.upsert(vectors=batch)
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.pool_threads, len(batches))) as executor:
+                # list() re-raises the first failed request
+                list(executor.map(lambda batch: self.index.upsert(vectors=batch), batches))
     
     def query(self, query_vector: List[float], top_k: int = 5,
              filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
@@ -160,23 +362,26 @@ class PineconeStore(VectorStore):
             filter=query_filter if query_filter else None
         )
         
-        # Format results
+        # Format results: one pass, one metadata lookup per match
         formatted_results = []
+        append = formatted_results.append
         for match in results['matches']:
             metadata = match['metadata']
-            formatted_results.append({
+            get = metadata.get
+            topics = get('topics')
+            append({
                 'id': match['id'],
                 'score': match['score'],
                 'text': metadata['text'],
                 'video_id': metadata['video_id'],
                 'start_seconds': metadata['start_seconds'],
                 'end_seconds': metadata['end_seconds'],
-                'speaker': metadata.get('speaker', ''),
-                'parent_id': metadata.get('parent_id', ''),
-                'tier': metadata.get('tier', ''),
-                'title': metadata.get('title', ''),
-                'guest': metadata.get('guest', ''),
-                'topics': metadata.get('topics', '').split(',') if metadata.get('topics') else []
+                'speaker': get('speaker', ''),
+                'parent_id': get('parent_id', ''),
+                'tier': get('tier', ''),
+                'title': get('title', ''),
+                'guest': get('guest', ''),
+                'topics': topics.split(',') if topics else []
             })
         
         return formatted_results
@@ -186,7 +391,8 @@ class EmbeddingPipeline:
     """Pipeline for embedding and indexing chunks."""
     
     def __init__(self, embedding_generator: EmbeddingGenerator, 
-                 vector_store: VectorStore, parent_store: Optional[Dict[str, str]] = None):
+                 vector_store: VectorStore, parent_store: Optional[Dict[str, str]] = None,
+                 parent_store_path: Optional[str] = None, max_resident_parents: int = 10_000):
         """
         Initialize embedding pipeline.
         
@@ -194,10 +400,20 @@ class EmbeddingPipeline:
             embedding_generator: Embedding generator instance
             vector_store: Vector store instance
             parent_store: Optional dict to store parent chunk texts (keyed by parent_id)
+            parent_store_path: If set (and no parent_store is given), parent texts
+                go to a SpillingParentStore: at most max_resident_parents stay in
+                memory, the rest are kept in this SQLite file (flushed after
+                every index_chunks call)
+            max_resident_parents: In-memory bound for the spilling store
         """
         self.embedding_generator = embedding_generator
         self.vector_store = vector_store
-        self.parent_store = parent_store or {}
+        if parent_store is not None:
+            self.parent_store = parent_store
+        elif parent_store_path:
+            self.parent_store = SpillingParentStore(parent_store_path, max_resident=max_resident_parents)
+        else:
+            self.parent_store = {}
     
     def index_chunks(self, child_chunks: List[ParentChildChunk],
                     parent_chunks: List[ParentChildChunk],
@@ -215,17 +431,24 @@ class EmbeddingPipeline:
         for parent_chunk in parent_chunks:
             if parent_chunk.id:
                 self.parent_store[parent_chunk.id] = parent_chunk.text
+        if isinstance(self.parent_store, SpillingParentStore):
+            self.parent_store.flush()
         
-        # Generate embeddings for child chunks
+        # Generate embeddings for child chunks (batched requests, not one
+        # round trip per chunk)
+        embeddings = self.embedding_generator.embed_batch(list(enriched_texts)) if enriched_texts else []
+        if isinstance(embeddings, np.ndarray):
+            # Local generators return a matrix; Pinecone takes plain lists
+            embeddings = embeddings.tolist()
         vectors_to_upsert = []
         
-        for idx, (child_chunk, enriched_text) in enumerate(zip(child_chunks, enriched_texts)):
-            # Generate embedding
-            embedding = self.embedding_generator.embed(enriched_text)
-            
+        # Random bytes for every chunk's UUID4 from one urandom() call
+        raw_ids = os.urandom(16 * len(child_chunks))
+        
+        for i, (child_chunk, embedding) in enumerate(zip(child_chunks, embeddings)):
             # Create vector record
             vector_record = {
-                'id': str(uuid.uuid4()),
+                'id': str(uuid.UUID(bytes=raw_ids[16 * i:16 * i + 16], version=4)),
                 'vector': embedding,
                 'text': child_chunk.text,  # Original text for display
                 'video_id': meta.video_id,
@@ -0,0 +1,100 @@
+"""
+Persistent Embedding Cache
+SQLite-backed store of chunk embeddings, so re-indexing unchanged chunks
+skips the embedding model/API.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Embeddings keyed by a hash of (namespace, text).
+
+    The namespace names the provider, model and dimension, so switching
+    any of them never returns a stale vector. Vectors are stored as raw
+    float32 bytes: a cache hit returns exactly what the model produced.
+    """
+
+    # Max keys per SELECT ... IN (...) (SQLite's default variable limit is 999)
+    LOOKUP_BATCH = 500
+
+    def __init__(self, path: str, namespace: str):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path: SQLite database file
+            namespace: Provider/model/dimension identifier mixed into every key
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.namespace = namespace
+        self._prefix = f"{namespace}\0".encode('utf-8')
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def key(self, text: str) -> bytes:
+        """16-byte SHA-256 prefix of (namespace, text)."""
+        return hashlib.sha256(self._prefix + text.encode('utf-8')).digest()[:16]
+
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        Look up several keys at once.
+
+        Args:
+            keys: Cache keys (from key())
+
+        Returns:
+            Dictionary of key -> float32 vector for the keys found
+        """
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), self.LOOKUP_BATCH):
+                batch = keys[start:start + self.LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                )
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[bytes, np.ndarray]]):
+        """
+        Store several vectors in one transaction.
+
+        Args:
+            items: (key, vector) pairs
+        """
+        rows = [
+            (key, np.asarray(vector, dtype=np.float32).tobytes())
+            for key, vector in items
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,297 @@
+"""
+Episode Loading
+Shared helpers for the embed scripts: read chunked episodes (chunks.jsonl or
+per-episode JSON files), convert them to chunk objects ahead of the consumer,
+and index them in groups with retries for transient errors.
+"""
+
+import logging
+import os
+from collections import deque
+from operator import attrgetter, itemgetter
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Iterator, Tuple, TYPE_CHECKING
+
+from .chunking import ParentChildChunk
+from .ingestion import VideoMetadata
+from .storage import EPISODES_JSONL, MSGSPEC_AVAILABLE, decode_episode, parse_json, read_json
+
+if TYPE_CHECKING:
+    from .two_tier_embedding import TwoTierEmbeddingPipeline
+
+# Same logger the embed scripts configure for per-episode progress
+logger = logging.getLogger("embed")
+
+# Errors worth retrying later instead of reporting with a traceback
+# (matched by class name so the openai package stays optional)
+TRANSIENT_ERROR_NAMES = frozenset({"RateLimitError", "APITimeoutError", "APIConnectionError"})
+
+# Rounds of retries for episode groups that failed with transient errors
+MAX_GROUP_RETRIES = 3
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """True if the error, or any error it was raised from, is transient."""
+    while error is not None:
+        if isinstance(error, (ConnectionError, TimeoutError)) or type(error).__name__ in TRANSIENT_ERROR_NAMES:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def load_chunks_from_json(json_file: Path) -> Dict[str, Any]:
+    """
+    Load chunks from JSON file.
+    
+    Args:
+        json_file: Path to JSON file
+        
+    Returns:
+        Dictionary with episode data
+    """
+    return read_json(json_file)
+
+
+def metadata_from_dict(meta_dict: Dict[str, Any]) -> VideoMetadata:
+    """Build VideoMetadata from the stored metadata dictionary."""
+    return VideoMetadata(
+        video_id=meta_dict.get('video_id', ''),
+        title=meta_dict.get('title', ''),
+        guest=meta_dict.get('guest', ''),
+        publish_date=meta_dict.get('publish_date', ''),
+        topics=meta_dict.get('topics', []),
+        description=meta_dict.get('description', ''),
+        view_count=meta_dict.get('view_count'),
+        duration=meta_dict.get('duration')
+    )
+
+
+def chunks_from_json_data(episode_data: Dict[str, Any]) -> tuple:
+    """
+    Convert JSON data to ParentChildChunk objects.
+    
+    Args:
+        episode_data: Episode data from JSON
+        
+    Returns:
+        Tuple of (parent_chunks, child_chunks, metadata, enriched_texts)
+    """
+    # Create metadata
+    metadata = metadata_from_dict(episode_data['metadata'])
+    
+    # Required fields are pulled out column-wise, then chunks built in bulk
+    required = itemgetter('id', 'text', 'start_seconds', 'end_seconds')
+    
+    # Create parent chunks
+    p_list = episode_data.get('parent_chunks', [])
+    p_ids, p_texts, p_starts, p_ends = zip(*map(required, p_list)) if p_list else ([], [], [], [])
+    parent_chunks = ParentChildChunk.from_columns(
+        p_ids, p_texts, p_starts, p_ends, chunk_type='parent'
+    )
+    
+    # Create child chunks
+    c_list = episode_data.get('child_chunks', [])
+    c_ids, c_texts, c_starts, c_ends = zip(*map(required, c_list)) if c_list else ([], [], [], [])
+    child_chunks = ParentChildChunk.from_columns(
+        c_ids, c_texts, c_starts, c_ends,
+        speakers=[c.get('speaker') for c in c_list],
+        parent_ids=[c.get('parent_id') for c in c_list],
+        chunk_type='child'
+    )
+    enriched_texts = [c.get('enriched_text', text) for c, text in zip(c_list, c_texts)]
+    
+    return parent_chunks, child_chunks, metadata, enriched_texts
+
+
+def chunks_from_episode_bytes(data: bytes) -> tuple:
+    """
+    Decode episode JSON with msgspec and convert it to ParentChildChunk objects.
+    
+    Same result as chunks_from_json_data(parse_json(data)), but chunks are
+    decoded straight into typed structs, without a dict per chunk.
+    
+    Args:
+        data: UTF-8 encoded episode JSON
+        
+    Returns:
+        Tuple of (parent_chunks, child_chunks, metadata, enriched_texts)
+    """
+    episode = decode_episode(data)
+    metadata = metadata_from_dict(episode.metadata)
+    required = attrgetter('id', 'text', 'start_seconds', 'end_seconds')
+    
+    # Create parent chunks
+    p_list = episode.parent_chunks
+    p_ids, p_texts, p_starts, p_ends = zip(*map(required, p_list)) if p_list else ([], [], [], [])
+    parent_chunks = ParentChildChunk.from_columns(
+        p_ids, p_texts, p_starts, p_ends, chunk_type='parent'
+    )
+    
+    # Create child chunks
+    c_list = episode.child_chunks
+    c_ids, c_texts, c_starts, c_ends = zip(*map(required, c_list)) if c_list else ([], [], [], [])
+    child_chunks = ParentChildChunk.from_columns(
+        c_ids, c_texts, c_starts, c_ends,
+        speakers=[c.speaker for c in c_list],
+        parent_ids=[c.parent_id for c in c_list],
+        chunk_type='child'
+    )
+    enriched_texts = [
+        c.enriched_text if c.enriched_text is not None else c.text for c in c_list
+    ]
+    
+    return parent_chunks, child_chunks, metadata, enriched_texts
+
+
+def iter_jsonl_sources(jsonl_path: Path) -> Iterator[Tuple[str, bytes]]:
+    """Yield (name, line) for each episode line of a JSONL file, reading lazily."""
+    with open(jsonl_path, 'rb') as f:
+        for n, line in enumerate(f, 1):
+            if line.strip():
+                yield f"{jsonl_path.name}:{n}", line
+
+
+def list_episode_sources(chunks_path: Path) -> Tuple[int, Iterator[Tuple[str, Any]]]:
+    """
+    List the episodes to embed.
+    
+    The JSONL episode file is streamed line by line when present, unless it
+    is older than one of the per-episode JSON files; then it is reported as
+    stale and every per-episode JSON file is listed instead.
+    
+    Args:
+        chunks_path: Chunks directory
+        
+    Returns:
+        (episode count, iterator of (name, source) pairs in processing order);
+        source is a JSONL line (bytes) or the Path of an episode JSON file
+    """
+    # Find all JSON files in one directory pass (DirEntry type needs no stat),
+    # excluding the consolidated file
+    with os.scandir(chunks_path) as entries:
+        json_entries = [
+            entry for entry in entries
+            if entry.name.endswith('.json') and entry.name != "all_chunks.json"
+            and entry.is_file()
+        ]
+    
+    jsonl_path = chunks_path / EPISODES_JSONL
+    if jsonl_path.is_file():
+        newest_json = max((entry.stat().st_mtime for entry in json_entries), default=0.0)
+        if jsonl_path.stat().st_mtime >= newest_json:
+            # Counting keeps no lines; the episodes are read again lazily
+            with open(jsonl_path, 'rb') as f:
+                count = sum(1 for line in f if line.strip())
+            return count, iter_jsonl_sources(jsonl_path)
+        logger.warning(
+            "%s is older than the per-episode JSON files; reading those instead "
+            "(rebuild it with ChunkStorage.build_episodes_jsonl)", jsonl_path.name
+        )
+    
+    json_files = sorted((entry.name, Path(entry.path)) for entry in json_entries)
+    return len(json_files), iter(json_files)
+
+
+def load_episode(source: Any) -> tuple:
+    """Parse one episode (JSONL line or JSON file) and convert it to chunk objects."""
+    if MSGSPEC_AVAILABLE:
+        data = source if isinstance(source, bytes) else source.read_bytes()
+        return chunks_from_episode_bytes(data)
+    if isinstance(source, bytes):
+        return chunks_from_json_data(parse_json(source))
+    return chunks_from_json_data(load_chunks_from_json(source))
+
+
+def prefetch_episodes(sources: Iterable[Tuple[str, Any]], prefetch: int = 2) -> Iterator[Tuple[str, Future]]:
+    """
+    Load episodes ahead of the consumer.
+    
+    While the caller embeds one episode, the next `prefetch` episodes are
+    read and parsed on worker threads. At most `prefetch + 1` episodes are
+    held in memory as chunk objects at once.
+    
+    Args:
+        sources: (name, source) pairs from list_episode_sources, in processing order
+        prefetch: Number of episodes to load ahead
+        
+    Yields:
+        (name, future) in input order; future.result() returns the
+        load_episode() tuple or raises its loading error
+    """
+    remaining = iter(sources)
+    with ThreadPoolExecutor(max_workers=max(1, prefetch)) as executor:
+        pending = deque(
+            (name, executor.submit(load_episode, source))
+            for name, source in (next(remaining, (None, None)) for _ in range(prefetch + 1))
+            if name is not None
+        )
+        while pending:
+            name, future = pending.popleft()
+            next_name, next_source = next(remaining, (None, None))
+            if next_name is not None:
+                pending.append((next_name, executor.submit(load_episode, next_source)))
+            yield name, future
+
+
+def index_episode_group(
+    two_tier_pipeline: 'TwoTierEmbeddingPipeline',
+    group: List[tuple],
+    total_stats: Dict[str, Any]
+) -> List[tuple]:
+    """
+    Index a group of loaded episodes and add their statistics to the totals.
+    
+    If the group fails with a non-transient error, its episodes are indexed
+    one at a time, so only the episode that causes the error is skipped.
+    
+    Args:
+        two_tier_pipeline: Pipeline to index into
+        group: (child_chunks, parent_chunks, metadata, enriched_texts) per episode
+        total_stats: Running totals, updated in place
+        
+    Returns:
+        Episodes that failed with a transient error and should be retried
+        (empty if there are none)
+    """
+    logger.info("\nIndexing %d episode(s)...", len(group))
+    try:
+        group_stats = two_tier_pipeline.index_episodes(group)
+    except Exception as e:
+        if is_transient_error(e):
+            # Expected under rate limiting: one line, no stack walk
+            logger.warning("  Transient error, will retry: %s", e)
+            return group
+        if len(group) == 1:
+            _, _, metadata, _ = group[0]
+            logger.exception("  ERROR: skipping %s: %s", metadata.title or metadata.video_id or 'N/A', e)
+            return []
+        logger.warning("  ERROR: %s; indexing the episodes one at a time", e)
+        group_stats = None
+    
+    if group_stats is None:
+        # Outside the except block, so episode errors don't chain to the group's
+        retry = []
+        for episode in group:
+            retry.extend(index_episode_group(two_tier_pipeline, [episode], total_stats))
+        return retry
+    
+    for (_, _, metadata, _), stats in zip(group, group_stats):
+        logger.info(
+            "  %s | core: %d | longtail: %d | skipped: %d",
+            metadata.title or metadata.video_id or 'N/A',
+            stats['core_chunks'], stats['longtail_chunks'], stats['skipped_chunks']
+        )
+        
+        # Update totals
+        total_stats["total_episodes"] += 1
+        total_stats["total_chunks"] += stats["total_chunks"]
+        total_stats["core_chunks"] += stats["core_chunks"]
+        total_stats["longtail_chunks"] += stats["longtail_chunks"]
+        total_stats["skipped_chunks"] += stats["skipped_chunks"]
+        total_stats["episodes_processed"].append({
+            "episode_id": metadata.video_id,
+            "title": metadata.title,
+            "stats": stats
+        })
+    return []
@@ -9,20 +9,37 @@ from typing import List, Dict, Optional, Any
 import numpy as np
 from pathlib import Path
 
-from .embedding import VectorStore
+from .embedding import VectorStore, dequantize_embeddings
 
 
 class FAISSStore(VectorStore):
     """FAISS vector store implementation (free, local, fast)."""
     
-    def __init__(self, index_path: str = "./faiss_index", dimension: int = 384):
+    # Storage precisions for new indexes
+    DTYPES = ("fp32", "fp16", "int8")
+    
+    # In-memory search encodings a loaded index can be converted to
+    QUANTIZATIONS = ("flat", "sq8", "pq")
+    
+    # Vectors buffered before an int8 index learns its value range
+    INT8_TRAIN_SIZE = 10_000
+    
+    def __init__(self, index_path: str = "./faiss_index", dimension: int = 384,
+                 dtype: str = "fp32"):
         """
         Initialize FAISS store.
         
         Args:
             index_path: Path to save/load FAISS index
             dimension: Embedding dimension (must match your embeddings)
+            dtype: Precision vectors are stored in when a new index is created:
+                "fp32" (exact), "fp16" (half the RAM/disk; scores of normalized
+                vectors change by ~1e-3) or "int8" (a quarter; ~0.99 recall@20;
+                vectors are buffered until INT8_TRAIN_SIZE have arrived, see
+                flush). An index loaded from disk keeps its own.
         """
+        if dtype not in self.DTYPES:
+            raise ValueError(f"Unsupported FAISS dtype: {dtype}")
         try:
             import faiss
             self.faiss = faiss
@@ -33,20 +50,113 @@ class FAISSStore(VectorStore):
         
         self.index_path = Path(index_path)
         self.dimension = dimension
+        self.dtype = dtype
+        self.quantization = "flat"
         
         # Create index directory if needed
         self.index_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Initialize FAISS index (Inner Product with normalized vectors = cosine similarity)
-        # Using IndexFlatIP because we normalize embeddings
-        self.index = self.faiss.IndexFlatIP(dimension)
+        self.index = self._new_index()
         
         # Store metadata (maps index position to chunk metadata)
         self.metadata: List[Dict[str, Any]] = []
         
+        # Vectors (and their metadata) waiting for an int8 index to be trained
+        self._pending_vectors: List[np.ndarray] = []
+        self._pending_metadata: List[Dict[str, Any]] = []
+        
         # Load existing index if it exists
         self._load_index()
     
+    def _new_index(self):
+        """
+        Create an empty exact inner-product index in the configured precision.
+        
+        Using inner product because we normalize embeddings. fp16/int8 use a
+        scalar quantizer; vectors are still added as float32 and encoded by
+        FAISS. int8 maps one shared value range onto 256 levels; the range is
+        learned from the first INT8_TRAIN_SIZE vectors upserted (see flush).
+        """
+        if self.dtype == "fp16":
+            return self.faiss.IndexScalarQuantizer(
+                self.dimension, self.faiss.ScalarQuantizer.QT_fp16, self.faiss.METRIC_INNER_PRODUCT
+            )
+        if self.dtype == "int8":
+            index = self.faiss.IndexScalarQuantizer(
+                self.dimension, self.faiss.ScalarQuantizer.QT_8bit_uniform, self.faiss.METRIC_INNER_PRODUCT
+            )
+            # Min/max of the training vectors plus 10% headroom for later ones
+            index.sq.rangestat = self.faiss.ScalarQuantizer.RS_minmax
+            index.sq.rangestat_arg = 0.1
+            return index
+        return self.faiss.IndexFlatIP(self.dimension)
+    
+    def _index_dtype(self) -> str:
+        """Storage precision of the current index, read from its encoding."""
+        index = self.index
+        if isinstance(index, self.faiss.IndexScalarQuantizer):
+            qtype = index.sq.qtype
+            if qtype == self.faiss.ScalarQuantizer.QT_fp16:
+                return "fp16"
+            if qtype in (self.faiss.ScalarQuantizer.QT_8bit_uniform, self.faiss.ScalarQuantizer.QT_8bit):
+                return "int8"
+        if isinstance(index, self.faiss.IndexFlat):
+            return "fp32"
+        # Other encodings (e.g. a saved pq copy) have no DTYPES equivalent
+        return self.dtype
+    
+    def quantize(self, kind: str, nlist: int = 64, nprobe: int = 16):
+        """
+        Re-encode the loaded vectors for smaller, faster search.
+        
+        Meant for read-only use (retrieval): the vectors are reconstructed
+        from the current index and re-added to a trained one, so "sq8" and
+        "pq" lose a little recall. The quantized index lives in memory only:
+        later upserts no longer save to index_path (the original stays
+        intact); call save_quantized() to write it to a separate path.
+        
+        Args:
+            kind: "flat" (no change), "sq8" (8-bit scalar, 1/4 of fp32 RAM)
+                or "pq" (IVF + product quantization, dimension/4 bytes per vector)
+            nlist: Number of IVF lists for "pq"
+            nprobe: Lists searched per query for "pq"
+        """
+        if kind not in self.QUANTIZATIONS:
+            raise ValueError(f"Unsupported FAISS quantization: {kind}")
+        self.flush()
+        n = self.index.ntotal
+        if kind == "flat" or n == 0:
+            return
+        
+        vectors = self.index.reconstruct_n(0, n)
+        faiss = self.faiss
+        
+        if kind == "pq" and n < 256 * 39:
+            # PQ codebooks need ~39 training points per centroid (256 per sub-quantizer)
+            print(f"[WARN] {n} vectors are too few to train PQ; using sq8 instead")
+            kind = "sq8"
+        
+        if kind == "sq8":
+            index = faiss.IndexScalarQuantizer(
+                self.dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+            )
+        else:
+            # The Python wrapper keeps the coarse quantizer referenced by the index
+            index = faiss.IndexIVFPQ(
+                faiss.IndexFlatIP(self.dimension), self.dimension,
+                min(nlist, n // 39), self.dimension // 4, 8, faiss.METRIC_INNER_PRODUCT
+            )
+        
+        index.train(vectors)
+        index.add(vectors)
+        if kind == "pq":
+            index.nprobe = nprobe
+        
+        self.index = index
+        self.quantization = kind
+        print(f"Quantized FAISS index to {kind} ({n} vectors)")
+    
     def _load_index(self):
         """Load existing FAISS index and metadata if available."""
         index_file = self.index_path.with_suffix('.index')
@@ -55,21 +165,35 @@ class FAISSStore(VectorStore):
         if index_file.exists() and meta_file.exists():
             print(f"Loading existing FAISS index from {index_file}...")
             try:
-                # Load FAISS index
+                # Load FAISS index (its own precision wins over the dtype argument)
                 self.index = self.faiss.read_index(str(index_file))
+                self.dtype = self._index_dtype()
                 
                 # Load metadata
                 with open(meta_file, 'rb') as f:
                     self.metadata = pickle.load(f)
                 
                 print(f"Loaded {len(self.metadata)} vectors from existing index")
+                
+                # Vectors an int8 index was still buffering when last saved
+                pending_file = self.index_path.with_suffix('.pending')
+                if pending_file.exists() and not self.index.is_trained:
+                    with open(pending_file, 'rb') as f:
+                        self._pending_vectors, self._pending_metadata = pickle.load(f)
+                    print(f"Loaded {len(self._pending_metadata)} vectors waiting for int8 training")
             except Exception as e:
                 print(f"Warning: Could not load existing index: {e}. Starting fresh.")
-                self.index = self.faiss.IndexFlatIP(self.dimension)
+                self.index = self._new_index()
                 self.metadata = []
+                self._pending_vectors = []
+                self._pending_metadata = []
     
     def _save_index(self):
-        """Save FAISS index and metadata to disk."""
+        """Save FAISS index and metadata to disk (skipped once quantized)."""
+        if self.quantization != "flat":
+            print(f"[INFO] {self.quantization} index not saved over {self.index_path}; use save_quantized()")
+            return
+        
         index_file = self.index_path.with_suffix('.index')
         meta_file = self.index_path.with_suffix('.meta')
         
@@ -79,8 +203,58 @@ class FAISSStore(VectorStore):
         with open(meta_file, 'wb') as f:
             pickle.dump(self.metadata, f)
         
+        pending_file = self.index_path.with_suffix('.pending')
+        if self._pending_metadata:
+            with open(pending_file, 'wb') as f:
+                pickle.dump((self._pending_vectors, self._pending_metadata), f)
+        elif pending_file.exists():
+            pending_file.unlink()
+        
         print(f"Saved {len(self.metadata)} vectors")
     
+    def save_quantized(self, index_path: str):
+        """
+        Save a quantized index and its metadata to a separate path.
+        
+        Args:
+            index_path: Path for the quantized copy (.index/.meta are added);
+                must differ from this store's index_path
+        """
+        if self.quantization == "flat":
+            raise ValueError("Index is not quantized; upserts already save it to index_path")
+        path = Path(index_path)
+        if path.with_suffix('.index') == self.index_path.with_suffix('.index'):
+            raise ValueError(f"Refusing to overwrite the original index at {self.index_path}")
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.faiss.write_index(self.index, str(path.with_suffix('.index')))
+        with open(path.with_suffix('.meta'), 'wb') as f:
+            pickle.dump(self.metadata, f)
+        
+        print(f"Saved {self.quantization} index ({len(self.metadata)} vectors) to {path.with_suffix('.index')}")
+    
+    def flush(self):
+        """
+        Train an int8 index on the buffered vectors and add them.
+        
+        An untrained int8 index holds upserted vectors back until
+        INT8_TRAIN_SIZE have arrived, so its value range covers more than the
+        first batch. Call this after the last upsert of a smaller corpus;
+        queries and quantize() flush first. No-op when nothing is buffered.
+        """
+        if not self._pending_metadata:
+            return
+        
+        vectors = np.concatenate(self._pending_vectors)
+        self.index.train(vectors)
+        self.index.add(vectors)
+        self.metadata.extend(self._pending_metadata)
+        self._pending_vectors = []
+        self._pending_metadata = []
+        
+        print(f"Trained int8 FAISS index on {len(vectors)} vectors")
+        self._save_index()
+    
     def upsert(self, vectors: List[Dict[str, Any]]):
         """
         Upsert vectors to FAISS index.
@@ -91,27 +265,39 @@ class FAISSStore(VectorStore):
         if not vectors:
             return
         
-        # Extract embeddings and metadata
-        embeddings = []
+        embeddings_array = np.array([vec['vector'] for vec in vectors], dtype=np.float32)
+        self.upsert_dense(embeddings_array, vectors)
+    
+    def upsert_dense(self, matrix: np.ndarray, records: List[Dict[str, Any]]):
+        """
+        Upsert a dense embedding matrix to FAISS index.
+        
+        Args:
+            matrix: (n, dimension) embedding matrix, one row per record
+                (float32, or fp16/int8 from quantize_embeddings)
+            records: Metadata dictionaries with 'id' and metadata (no 'vector' needed)
+        """
+        if not records:
+            return
+        
+        # FAISS takes float32 input (fp16 indexes encode it themselves)
+        embeddings_array = np.ascontiguousarray(dequantize_embeddings(matrix))
+        
+        # Ensure correct shape
+        if embeddings_array.ndim == 1:
+            embeddings_array = embeddings_array.reshape(1, -1)
+        
+        # Verify dimension matches
+        if embeddings_array.shape[1] != self.dimension:
+            raise ValueError(
+                f"Embedding dimension {embeddings_array.shape[1]} doesn't match "
+                f"index dimension {self.dimension}"
+            )
+        
+        # Extract metadata
         new_metadata = []
         
-        for vec in vectors:
-            # Convert to numpy array
-            embedding = np.array(vec['vector'], dtype=np.float32)
-            
-            # Ensure correct shape
-            if embedding.ndim == 1:
-                embedding = embedding.reshape(1, -1)
-            
-            # Verify dimension matches
-            if embedding.shape[1] != self.dimension:
-                raise ValueError(
-                    f"Embedding dimension {embedding.shape[1]} doesn't match "
-                    f"index dimension {self.dimension}"
-                )
-            
-            embeddings.append(embedding)
-            
+        for vec in records:
             # Store metadata
             metadata = {
                 'id': vec['id'],
@@ -121,6 +307,7 @@ class FAISSStore(VectorStore):
                 'end_seconds': vec['end_seconds'],
                 'speaker': vec.get('speaker', ''),
                 'parent_id': vec.get('parent_id', ''),
+                'child_offset': vec.get('child_offset', -1),
                 'publish_date': vec.get('publish_date', ''),
                 'tier': vec.get('tier', ''),
                 'title': vec.get('title', ''),
@@ -136,8 +323,24 @@ class FAISSStore(VectorStore):
             
             new_metadata.append(metadata)
         
-        # Concatenate embeddings
-        embeddings_array = np.vstack(embeddings)
+        # Upserting an existing ID replaces its vector (e.g. a retried episode)
+        replaced = self._remove_ids({metadata['id'] for metadata in new_metadata})
+        if replaced:
+            print(f"Replacing {replaced} existing vectors")
+        
+        # int8 indexes learn their value range from the buffered vectors
+        if not self.index.is_trained:
+            self._pending_vectors.append(embeddings_array)
+            self._pending_metadata.extend(new_metadata)
+            if len(self._pending_metadata) >= self.INT8_TRAIN_SIZE:
+                self.flush()
+            else:
+                self._save_index()
+                print(
+                    f"Buffered {len(records)} vectors for int8 training "
+                    f"({len(self._pending_metadata)}/{self.INT8_TRAIN_SIZE})"
+                )
+            return
         
         # Add to FAISS index
         self.index.add(embeddings_array)
@@ -148,7 +351,39 @@ class FAISSStore(VectorStore):
         # Save index
         self._save_index()
         
-        print(f"Added {len(vectors)} vectors to FAISS index (total: {len(self.metadata)})")
+        print(f"Added {len(records)} vectors to FAISS index (total: {len(self.metadata)})")
+    
+    def _remove_ids(self, ids: set) -> int:
+        """
+        Drop stored and buffered vectors whose metadata 'id' is in ids.
+        
+        Args:
+            ids: Vector IDs to remove
+            
+        Returns:
+            Number of vectors removed
+        """
+        removed = 0
+        
+        if self._pending_metadata:
+            keep = [i for i, meta in enumerate(self._pending_metadata) if meta['id'] not in ids]
+            if len(keep) < len(self._pending_metadata):
+                removed += len(self._pending_metadata) - len(keep)
+                self._pending_vectors = [np.concatenate(self._pending_vectors)[keep]]
+                self._pending_metadata = [self._pending_metadata[i] for i in keep]
+        
+        positions = [i for i, meta in enumerate(self.metadata) if meta['id'] in ids]
+        if positions:
+            if isinstance(self.index, self.faiss.IndexIVF):
+                # IVF keeps the removed labels' gaps, breaking position -> metadata
+                raise ValueError(f"Cannot replace vectors in a {self.quantization} index")
+            # Flat and scalar-quantized indexes compact in order, like the list below
+            self.index.remove_ids(np.asarray(positions, dtype=np.int64))
+            dropped = set(positions)
+            self.metadata = [meta for i, meta in enumerate(self.metadata) if i not in dropped]
+            removed += len(positions)
+        
+        return removed
     
     def query(self, query_vector: List[float], top_k: int = 5,
              filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
@@ -163,18 +398,43 @@ class FAISSStore(VectorStore):
         Returns:
             List of results with metadata
         """
+        return self.query_batch([query_vector], top_k=top_k, filters=filters)[0]
+    
+    def query_batch(self, query_vectors: List[List[float]], top_k: int = 5,
+                    filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Query FAISS index with several vectors in a single search call.
+        
+        Args:
+            query_vectors: Query embedding vectors
+            top_k: Number of results to return per query
+            filters: Optional metadata filters (applied after retrieval)
+            
+        Returns:
+            One result list per query vector, in input order
+        """
+        self.flush()
         if len(self.metadata) == 0:
-            return []
+            return [[] for _ in query_vectors]
         
-        # Convert query to numpy array
-        query_array = np.array([query_vector], dtype=np.float32)
+        # Convert queries to a (n_queries, dimension) matrix (no copy if the
+        # generator already returned a float32 array)
+        query_array = np.ascontiguousarray(query_vectors, dtype=np.float32)
         
-        # Search
-        distances, indices = self.index.search(query_array, min(top_k * 2, len(self.metadata)))
+        # Over-fetch only when filters may drop hits after the search
+        k = top_k * 2 if filters else top_k
+        distances, indices = self.index.search(query_array, min(k, len(self.metadata)))
         
-        # Format results
+        return [
+            self._format_results(distances[row], indices[row], top_k, filters)
+            for row in range(len(query_array))
+        ]
+    
+    def _format_results(self, distances: np.ndarray, indices: np.ndarray, top_k: int,
+                        filters: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Turn one row of FAISS search output into result dicts."""
         formatted_results = []
-        for i, idx in enumerate(indices[0]):
+        for i, idx in enumerate(indices):
             if idx < 0 or idx >= len(self.metadata):  # Invalid index
                 continue
             
@@ -192,7 +452,7 @@ class FAISSStore(VectorStore):
             
             # Convert distance to similarity score (for normalized vectors, distance is similarity)
             # FAISS IndexFlatIP returns inner product, which for normalized vectors = cosine similarity
-            score = float(distances[0][i])
+            score = float(distances[i])
             
             formatted_results.append({
                 'id': metadata['id'],
@@ -203,6 +463,7 @@ class FAISSStore(VectorStore):
                 'end_seconds': metadata['end_seconds'],
                 'speaker': metadata.get('speaker', ''),
                 'parent_id': metadata.get('parent_id', ''),
+                'child_offset': metadata.get('child_offset', -1),
                 'tier': metadata.get('tier', ''),
                 'title': metadata.get('title', ''),
                 'guest': metadata.get('guest', ''),
@@ -218,6 +479,9 @@ class FAISSStore(VectorStore):
         """Get index statistics."""
         return {
             'total_vectors': len(self.metadata),
+            'pending_vectors': len(self._pending_metadata),
             'dimension': self.dimension,
+            'dtype': self.dtype,
+            'quantization': self.quantization,
             'index_path': str(self.index_path)
         }
@@ -6,14 +6,21 @@ Reads transcripts from local files and GitHub repositories.
 import json
 import re
 import yaml
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime, date
 from pydantic import BaseModel, Field
 
 
-class Segment(BaseModel):
-    """Represents a single transcript segment with temporal and speaker metadata."""
+@dataclass(slots=True)
+class Segment:
+    """
+    Represents a single transcript segment with temporal and speaker metadata.
+    
+    A slotted dataclass rather than a pydantic model: transcripts produce
+    thousands of segments, and slots keep them small and fast to access.
+    """
     text: str
     start: float  # Start time in seconds
     duration: float  # Duration in seconds
@@ -4,10 +4,24 @@ Supports: Groq (fast), Ollama (local), Gemini (cloud)
 """
 
 from .base import BaseLLM
-from .groq_llm import GroqLLM
-from .ollama_llm import OllamaLLM
 from .router import get_llm, LLMRouter
 
+# Provider classes load on first access (PEP 562), so importing the package
+# does not pull in the groq SDK unless GroqLLM is actually used
+_LAZY_PROVIDERS = {
+    'GroqLLM': '.groq_llm',
+    'OllamaLLM': '.ollama_llm',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_PROVIDERS:
+        import importlib
+        module = importlib.import_module(_LAZY_PROVIDERS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     'BaseLLM',
     'GroqLLM',
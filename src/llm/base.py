@@ -27,13 +27,16 @@ class BaseLLM(ABC):
         pass
     
     @abstractmethod
-    def generate_with_system(self, system_prompt: str, user_prompt: str) -> str:
+    def generate_with_system(self, system_prompt: str, user_prompt: str,
+                             session_id: Optional[str] = None) -> str:
         """
         Generate text with explicit system and user prompts.
         
         Args:
             system_prompt: System instructions
             user_prompt: User's message/question
+            session_id: Optional stable caller ID; providers with prompt caching
+                use it to route repeat requests to the same cache
             
         Returns:
             Generated text response
@@ -54,6 +57,22 @@ class BaseLLM(ABC):
         # Default: non-streaming fallback
         yield self.generate(prompt)
     
+    def generate_stream_with_system(self, system_prompt: str, user_prompt: str,
+                                    session_id: Optional[str] = None) -> Iterator[str]:
+        """
+        Stream text with explicit system and user prompts (optional).
+        Default implementation falls back to non-streaming.
+        
+        Args:
+            system_prompt: System instructions
+            user_prompt: User's message/question
+            session_id: Optional stable caller ID (see generate_with_system)
+            
+        Yields:
+            Text pieces as they are generated
+        """
+        yield self.generate_with_system(system_prompt, user_prompt, session_id=session_id)
+    
     def get_provider_name(self) -> str:
         """Return the provider name for logging."""
         return self.__class__.__name__
@@ -51,12 +51,16 @@ class GroqLLM(BaseLLM):
     - mixtral-8x7b-32768 (good for complex tasks)
     """
     
+    # Leading numbering/bullets stripped from generated follow-up questions
+    _FOLLOWUP_PREFIX_CHARS = '0123456789.-•) '
+    
     def __init__(
         self,
         model: str = "llama-3.1-8b-instant",
         max_tokens: int = 600,
         temperature: float = 0.2,
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        client: Optional["Groq"] = None
     ):
         """
         Initialize Groq client.
@@ -66,6 +70,8 @@ class GroqLLM(BaseLLM):
             max_tokens: Maximum output tokens
             temperature: Response temperature (lower = more deterministic)
             api_key: Groq API key (or use GROQ_API_KEY env var)
+            client: Existing Groq client to share (its connection pool is
+                reused); api_key is ignored when given
         """
         if not GROQ_AVAILABLE:
             raise ImportError(
@@ -73,18 +79,25 @@ class GroqLLM(BaseLLM):
             )
         
         self.api_key = api_key or os.getenv("GROQ_API_KEY")
-        if not self.api_key:
+        if client is None and not self.api_key:
             raise ValueError(
                 "GROQ_API_KEY not set. Get one at: https://console.groq.com"
             )
         
-        self.client = Groq(api_key=self.api_key)
+        self.client = client if client is not None else Groq(api_key=self.api_key)
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
         
         print(f"   [OK] Groq client ready (model: {model})")
     
+    @staticmethod
+    def _routing_kwargs(session_id: Optional[str]) -> Dict:
+        """Request options that pin a session to one prompt-cache replica."""
+        if not session_id:
+            return {}
+        return {"user": session_id, "extra_headers": {"x-session-affinity": session_id}}
+    
     def generate(self, prompt: str) -> str:
         """
         Generate text using Groq with default system prompt.
@@ -97,17 +110,22 @@ class GroqLLM(BaseLLM):
         """
         return self.generate_with_system(self.DEFAULT_SYSTEM_PROMPT, prompt)
     
-    def generate_with_system(self, system_prompt: str, user_prompt: str) -> str:
+    def generate_with_system(self, system_prompt: str, user_prompt: str,
+                             session_id: Optional[str] = None) -> str:
         """
         Generate text with explicit system and user prompts.
         
         Args:
             system_prompt: System instructions
             user_prompt: User's message/question
+            session_id: Optional stable routing key, sent as the OpenAI-compatible
+                `user` field and an x-session-affinity header so repeat requests
+                hit the same prompt cache
             
         Returns:
             Generated text
         """
+        extra = self._routing_kwargs(session_id)
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -124,7 +142,8 @@ class GroqLLM(BaseLLM):
                 temperature=self.temperature,
                 max_tokens=self.max_tokens,
                 top_p=0.95,
-                stream=False
+                stream=False,
+                **extra
             )
             
             return response.choices[0].message.content.strip()
@@ -142,23 +161,43 @@ class GroqLLM(BaseLLM):
         Yields:
             Text tokens as they are generated
         """
+        return self._stream(CACHED_SYSTEM_PROMPT, prompt, {})
+    
+    def generate_stream_with_system(self, system_prompt: str, user_prompt: str,
+                                    session_id: Optional[str] = None) -> Iterator[str]:
+        """
+        Stream text with explicit system and user prompts.
+        
+        Args:
+            system_prompt: System instructions
+            user_prompt: User's message/question
+            session_id: Optional stable routing key (see generate_with_system)
+            
+        Yields:
+            Text tokens as they are generated
+        """
+        return self._stream(system_prompt, user_prompt, self._routing_kwargs(session_id))
+    
+    def _stream(self, system_prompt: str, user_prompt: str, extra: Dict) -> Iterator[str]:
+        """Stream a chat completion's text deltas (shared by the generate_stream* methods)."""
         try:
             stream = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {
                         "role": "system",
-                        "content": CACHED_SYSTEM_PROMPT
+                        "content": system_prompt
                     },
                     {
                         "role": "user",
-                        "content": prompt
+                        "content": user_prompt
                     }
                 ],
                 temperature=self.temperature,
                 max_tokens=self.max_tokens,
                 top_p=0.95,
-                stream=True
+                stream=True,
+                **extra
             )
             
             for chunk in stream:
@@ -306,10 +345,9 @@ Generate 3 follow-up questions:"""
             )
             
             raw = response.choices[0].message.content.strip()
-            # Parse questions (one per line)
-            questions = [q.strip() for q in raw.split('\n') if q.strip()]
-            # Clean any numbering or bullets
-            questions = [q.lstrip('0123456789.-•) ') for q in questions]
+            # Parse questions (one per line), cleaning any numbering or bullets
+            prefix_chars = self._FOLLOWUP_PREFIX_CHARS
+            questions = [line.strip().lstrip(prefix_chars) for line in raw.split('\n') if line.strip()]
             return questions[:3]  # Max 3
             
         except Exception as e:
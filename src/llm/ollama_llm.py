@@ -27,7 +27,8 @@ class OllamaLLM(BaseLLM):
         model: str = "qwen2.5:3b-instruct",
         base_url: str = "http://localhost:11434",
         max_tokens: int = 600,
-        temperature: float = 0.15
+        temperature: float = 0.15,
+        session: Optional[requests.Session] = None
     ):
         """
         Initialize Ollama client.
@@ -37,16 +38,19 @@ class OllamaLLM(BaseLLM):
             base_url: Ollama server URL
             max_tokens: Maximum output tokens
             temperature: Response temperature
+            session: HTTP session to share (a new one otherwise); keeps
+                connections to the Ollama server alive between requests
         """
         # Allow model override from environment
         self.model = os.getenv("OLLAMA_MODEL", model)
         self.base_url = base_url
         self.max_tokens = max_tokens
         self.temperature = temperature
+        self.session = session if session is not None else requests.Session()
         
         # Verify Ollama is running
         try:
-            response = requests.get(f"{base_url}/api/tags", timeout=5)
+            response = self.session.get(f"{base_url}/api/tags", timeout=5)
             if response.status_code == 200:
                 print(f"   [OK] Ollama connected: {base_url}")
                 print(f"   [OK] Using model: {self.model}")
@@ -67,7 +71,7 @@ class OllamaLLM(BaseLLM):
             Generated text
         """
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/generate",
                 json={
                     "model": self.model,
@@ -99,20 +103,22 @@ class OllamaLLM(BaseLLM):
         except Exception as e:
             raise Exception(f"Ollama generation failed: {e}")
     
-    def generate_with_system(self, system_prompt: str, user_prompt: str) -> str:
+    def generate_with_system(self, system_prompt: str, user_prompt: str,
+                             session_id: Optional[str] = None) -> str:
         """
         Generate text with explicit system and user prompts.
         
         Args:
             system_prompt: System instructions
             user_prompt: User's message/question
+            session_id: Ignored (single local server, no cache routing)
             
         Returns:
             Generated text
         """
         # Ollama uses /api/chat for system/user messages
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/chat",
                 json={
                     "model": self.model,
@@ -155,7 +161,7 @@ class OllamaLLM(BaseLLM):
             Text tokens as generated
         """
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/generate",
                 json={
                     "model": self.model,
@@ -189,5 +195,57 @@ class OllamaLLM(BaseLLM):
         except Exception as e:
             raise Exception(f"Ollama streaming failed: {e}")
     
+    def generate_stream_with_system(self, system_prompt: str, user_prompt: str,
+                                    session_id: Optional[str] = None) -> Iterator[str]:
+        """
+        Stream text with explicit system and user prompts.
+        
+        Args:
+            system_prompt: System instructions
+            user_prompt: User's message/question
+            session_id: Ignored (single local server, no cache routing)
+            
+        Yields:
+            Text tokens as generated
+        """
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/chat",
+                json={
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    "stream": True,
+                    "options": {
+                        "num_predict": self.max_tokens,
+                        "temperature": self.temperature,
+                        "top_p": 0.95,
+                        "top_k": 40,
+                        "num_ctx": 4096
+                    }
+                },
+                stream=True,
+                timeout=180
+            )
+            
+            response.raise_for_status()
+            
+            for line in response.iter_lines():
+                if line:
+                    try:
+                        data = json.loads(line)
+                        content = data.get("message", {}).get("content")
+                        if content:
+                            yield content
+                        if data.get("done", False):
+                            break
+                    except json.JSONDecodeError:
+                        continue
+            
+        except Exception as e:
+            raise Exception(f"Ollama streaming failed: {e}")
+    
     def get_provider_name(self) -> str:
         return f"ollama/{self.model}"
@@ -4,11 +4,18 @@ Supports: groq (default), ollama (fallback), auto (smart selection)
 """
 
 import os
-from typing import Optional
+import threading
+from typing import Dict, Optional
 
 from .base import BaseLLM
-from .groq_llm import GroqLLM, GROQ_AVAILABLE
-from .ollama_llm import OllamaLLM
+
+# Provider modules (and their SDKs) are imported by the _init_* method that
+# needs them, so using one backend never loads the other
+
+# Process-wide LLM clients keyed by requested provider, so every caller of
+# get_llm() shares one SDK client / HTTP connection pool per provider
+_llm_cache: Dict[str, BaseLLM] = {}
+_cache_lock = threading.Lock()
 
 
 class LLMRouter:
@@ -59,6 +66,7 @@ class LLMRouter:
     def _init_groq(self) -> BaseLLM:
         """Initialize Groq (will raise if API key missing)."""
         try:
+            from .groq_llm import GroqLLM
             llm = GroqLLM()
             self.actual_provider = "groq"
             return llm
@@ -68,6 +76,7 @@ class LLMRouter:
     def _init_ollama(self) -> BaseLLM:
         """Initialize Ollama."""
         try:
+            from .ollama_llm import OllamaLLM
             llm = OllamaLLM()
             self.actual_provider = "ollama"
             return llm
@@ -76,20 +85,23 @@ class LLMRouter:
     
     def _init_auto(self) -> BaseLLM:
         """Auto-select: try Groq first, fallback to Ollama."""
-        # Try Groq first (fast, reliable)
-        if GROQ_AVAILABLE and os.getenv("GROQ_API_KEY"):
-            try:
-                print("   [INFO] Trying Groq (fast cloud inference)...")
-                llm = GroqLLM()
-                self.actual_provider = "groq"
-                print("   [OK] Using Groq")
-                return llm
-            except Exception as e:
-                print(f"   [INFO] Groq not available: {e}")
+        # Try Groq first (fast, reliable); without a key the SDK is never imported
+        if os.getenv("GROQ_API_KEY"):
+            from .groq_llm import GroqLLM, GROQ_AVAILABLE
+            if GROQ_AVAILABLE:
+                try:
+                    print("   [INFO] Trying Groq (fast cloud inference)...")
+                    llm = GroqLLM()
+                    self.actual_provider = "groq"
+                    print("   [OK] Using Groq")
+                    return llm
+                except Exception as e:
+                    print(f"   [INFO] Groq not available: {e}")
         
         # Fallback to Ollama
         try:
             print("   [INFO] Falling back to Ollama (local)...")
+            from .ollama_llm import OllamaLLM
             llm = OllamaLLM()
             self.actual_provider = "ollama"
             print("   [OK] Using Ollama")
@@ -109,6 +121,8 @@ def get_llm(provider: Optional[str] = None) -> BaseLLM:
     """
     Convenience function to get configured LLM.
     
+    The instance is created once per provider and shared by later calls.
+    
     Args:
         provider: Override provider selection ("groq", "ollama", "auto")
         
@@ -116,4 +130,14 @@ def get_llm(provider: Optional[str] = None) -> BaseLLM:
         Configured LLM instance
     """
     router = LLMRouter(provider)
-    return router.get_llm()
+    llm = _llm_cache.get(router.provider)
+    if llm is not None:
+        return llm
+    
+    with _cache_lock:
+        # Another thread may have built it while we waited
+        llm = _llm_cache.get(router.provider)
+        if llm is None:
+            llm = router.get_llm()
+            _llm_cache[router.provider] = llm
+    return llm
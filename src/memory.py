@@ -9,19 +9,72 @@ Key Design Decisions:
 - Safety: unsafe queries are NOT stored
 """
 
+import threading
 import time
-from collections import deque
+from collections import OrderedDict, deque
+from functools import lru_cache
 from typing import List, Dict, Optional
 from dataclasses import dataclass, field
 
+# Optional - exact token counts for the context budget (len // 4 otherwise)
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
 
-@dataclass
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """cl100k_base encoding, loaded on first use (None if unavailable)."""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Count prompt tokens in text.
+    
+    Args:
+        text: Text to measure
+        
+    Returns:
+        Exact cl100k_base token count with tiktoken, else len(text) // 4
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, len(text) // 4)
+
+
+@dataclass(slots=True)
 class MemoryTurn:
-    """Single turn in conversation"""
+    """
+    Single turn in conversation.
+    
+    Every live session holds up to max_turns of these; slots drop the
+    per-instance __dict__.
+    """
     role: str  # "user" or "assistant"
     content: str
     timestamp: float = field(default_factory=time.time)
     query_type: Optional[str] = None  # "rag", "conversation", "safety"
+    # "User: ..." line used by get_context, rendered (and measured) once per turn
+    context_line: str = field(init=False, repr=False, compare=False)
+    context_tokens: int = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        prefix = "User" if self.role == "user" else "Assistant"
+        content = self.content
+        if len(content) > 300:
+            content = content[:300] + "..."
+        self.context_line = f"{prefix}: {content}"
+        self.context_tokens = estimate_tokens(self.context_line)
 
 
 class ConversationMemory:
@@ -37,6 +90,9 @@ class ConversationMemory:
     # Summarization threshold
     SUMMARIZE_AFTER_TURNS = 4  # Summarize after every 4 turns
     
+    # Token budget for get_context (about the old 1500-char budget)
+    CONTEXT_MAX_TOKENS = 375
+    
     def __init__(self, max_turns: int = 8):
         """
         Initialize conversation memory.
@@ -46,7 +102,8 @@ class ConversationMemory:
         """
         self.history: deque[MemoryTurn] = deque(maxlen=max_turns)
         self.created_at = time.time()
-        self.last_activity = time.time()
+        # Monotonic: only used for inactivity expiry, immune to clock changes
+        self.last_activity = time.monotonic()
         self.current_topic: Optional[str] = None  # Detected PM topic
         self.memory_summary: str = ""  # Compressed topic-aware summary
         self.turns_since_summary: int = 0
@@ -65,7 +122,7 @@ class ConversationMemory:
             content=content,
             query_type=query_type
         ))
-        self.last_activity = time.time()
+        self.last_activity = time.monotonic()
         self.turns_since_summary += 1
     
     def needs_summarization(self) -> bool:
@@ -152,12 +209,14 @@ class ConversationMemory:
             return True
         return False
     
-    def get_context(self, max_chars: int = 1500) -> str:
+    def get_context(self, max_chars: int = 1500, max_tokens: Optional[int] = None) -> str:
         """
         Returns compressed conversation context for prompt injection.
         
         Args:
             max_chars: Maximum characters for context (prevents prompt bloat)
+            max_tokens: Budget in prompt tokens instead of characters (takes
+                precedence over max_chars; counts are cached per turn)
             
         Returns:
             Formatted conversation history string
@@ -167,29 +226,31 @@ class ConversationMemory:
         
         context_lines = []
         total_chars = 0
+        total_tokens = 0
         
-        # Build from most recent, then reverse
-        for turn in reversed(list(self.history)):
-            prefix = "User" if turn.role == "user" else "Assistant"
-            
-            # Truncate long messages
-            content = turn.content
-            if len(content) > 300:
-                content = content[:300] + "..."
+        # Build from most recent, then reverse (a deque iterates backwards
+        # without being copied). Lines are pre-rendered and truncated per turn.
+        for turn in reversed(self.history):
+            line = turn.context_line
             
-            line = f"{prefix}: {content}"
-            
-            if total_chars + len(line) > max_chars:
+            if max_tokens is not None:
+                # Joining newline counted as one token
+                if total_tokens + turn.context_tokens > max_tokens:
+                    break
+                total_tokens += turn.context_tokens + 1
+            elif total_chars + len(line) > max_chars:
                 break
+            else:
+                total_chars += len(line) + 1
                 
-            context_lines.insert(0, line)
-            total_chars += len(line) + 1
+            context_lines.append(line)
         
+        context_lines.reverse()
         return "\n".join(context_lines)
     
     def get_last_user_query(self) -> Optional[str]:
         """Get the most recent user query."""
-        for turn in reversed(list(self.history)):
+        for turn in reversed(self.history):
             if turn.role == "user":
                 return turn.content
         return None
@@ -220,8 +281,12 @@ class SessionStore:
     CLEANUP_INTERVAL = 5 * 60  # Cleanup every 5 minutes
     
     def __init__(self):
-        self.sessions: Dict[str, ConversationMemory] = {}
-        self.last_cleanup = time.time()
+        # Ordered by last access (oldest first): get_or_create moves a
+        # session to the end and refreshes its last_activity, so eviction
+        # and expiry pop from the front
+        self.sessions: "OrderedDict[str, ConversationMemory]" = OrderedDict()
+        self.last_cleanup = time.monotonic()
+        self._lock = threading.Lock()
     
     def get_or_create(self, session_id: str) -> ConversationMemory:
         """
@@ -233,32 +298,78 @@ class SessionStore:
         Returns:
             ConversationMemory for this session
         """
-        # Periodic cleanup
-        if time.time() - self.last_cleanup > self.CLEANUP_INTERVAL:
-            self._cleanup_expired()
-        
-        if session_id not in self.sessions:
+        with self._lock:
+            # Periodic cleanup
+            if time.monotonic() - self.last_cleanup > self.CLEANUP_INTERVAL:
+                self._cleanup_expired()
+            
+            memory = self.sessions.get(session_id)
+            if memory is not None:
+                # Keep last_activity in step with the order the expiry walk relies on
+                self.sessions.move_to_end(session_id)
+                memory.last_activity = time.monotonic()
+                return memory
+            
             # Enforce max sessions
             if len(self.sessions) >= self.MAX_SESSIONS:
                 self._cleanup_oldest()
             
-            self.sessions[session_id] = ConversationMemory()
+            memory = self.sessions[session_id] = ConversationMemory()
+            return memory
+    
+    def delete(self, session_id: str) -> bool:
+        """
+        Remove a session.
         
-        return self.sessions[session_id]
+        Args:
+            session_id: Unique session identifier
+            
+        Returns:
+            True if the session existed
+        """
+        with self._lock:
+            return self.sessions.pop(session_id, None) is not None
+    
+    def info(self, session_id: str) -> Optional[Dict]:
+        """
+        Describe a session without counting as activity.
+        
+        Args:
+            session_id: Unique session identifier
+            
+        Returns:
+            Dictionary with turn_count and context_preview, or None if the
+            session does not exist
+        """
+        with self._lock:
+            memory = self.sessions.get(session_id)
+            if memory is None:
+                return None
+            context = memory.get_context()
+            return {
+                "turn_count": memory.get_turn_count(),
+                "context_preview": context[:500] if context else ""
+            }
     
     def _cleanup_expired(self):
-        """Remove sessions that have been inactive too long."""
-        now = time.time()
-        expired = [
-            sid for sid, memory in self.sessions.items()
-            if now - memory.last_activity > self.SESSION_EXPIRY_SECONDS
-        ]
+        """
+        Remove sessions that have been inactive too long.
+        
+        Walks from the least recently accessed session and stops at the
+        first live one, instead of scanning every session.
+        """
+        now = time.monotonic()
+        expired = 0
         
-        for sid in expired:
+        while self.sessions:
+            sid, memory = next(iter(self.sessions.items()))
+            if now - memory.last_activity <= self.SESSION_EXPIRY_SECONDS:
+                break
             del self.sessions[sid]
+            expired += 1
         
         if expired:
-            print(f"   [MEMORY] Cleaned up {len(expired)} expired sessions")
+            print(f"   [MEMORY] Cleaned up {expired} expired sessions")
         
         self.last_cleanup = now
     
@@ -267,15 +378,10 @@ class SessionStore:
         if not self.sessions:
             return
         
-        # Sort by last activity, remove oldest 10%
-        sorted_sessions = sorted(
-            self.sessions.items(),
-            key=lambda x: x[1].last_activity
-        )
-        
-        to_remove = max(1, len(sorted_sessions) // 10)
-        for sid, _ in sorted_sessions[:to_remove]:
-            del self.sessions[sid]
+        # Remove the least recently used 10%
+        to_remove = max(1, len(self.sessions) // 10)
+        for _ in range(to_remove):
+            self.sessions.popitem(last=False)
         
         print(f"   [MEMORY] Cleaned up {to_remove} oldest sessions (at capacity)")
     
@@ -288,5 +394,25 @@ class SessionStore:
         }
 
 
-# Global session store instance
-session_store = SessionStore()
+# Global session store, created on first use: importing this module (e.g.
+# for ConversationMemory) allocates nothing, and forked workers that never
+# touched it don't inherit a parent's store
+_session_store: Optional[SessionStore] = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Get the process-wide SessionStore, creating it on first call."""
+    global _session_store
+    if _session_store is None:
+        with _session_store_lock:
+            if _session_store is None:
+                _session_store = SessionStore()
+    return _session_store
+
+
+def __getattr__(name):
+    # Backward compatibility: `from src.memory import session_store`
+    if name == 'session_store':
+        return get_session_store()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,9 +3,12 @@ Parent Chunk Loader
 Loads parent chunks from JSON files for retrieval expansion
 """
 
-import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+
+from .storage import read_json
 
 
 class ParentChunkLoader:
@@ -14,14 +17,16 @@ class ParentChunkLoader:
     Builds lookup: (video_id, parent_id) -> parent_chunk_text
     """
     
-    def __init__(self, chunks_dir: str = "chunks_product_management"):
+    def __init__(self, chunks_dir: str = "chunks_product_management", max_workers: int = 8):
         """
         Initialize parent chunk loader.
         
         Args:
             chunks_dir: Directory containing JSON chunk files
+            max_workers: Threads reading episode files concurrently (1 = serial)
         """
         self.chunks_dir = Path(chunks_dir)
+        self.max_workers = max_workers
         self.parent_lookup: Dict[tuple, Dict[str, any]] = {}
         self._load_all_parents()
     
@@ -31,41 +36,69 @@ class ParentChunkLoader:
             print(f"Warning: Chunks directory not found: {self.chunks_dir}")
             return
         
-        json_files = list(self.chunks_dir.glob("*.json"))
-        json_files = [f for f in json_files if f.name != "all_chunks.json"]
+        # scandir entries carry the file type from the directory read (no
+        # per-file stat, no Path objects)
+        with os.scandir(self.chunks_dir) as entries:
+            json_files = [
+                entry.path for entry in entries
+                if entry.name.endswith(".json") and entry.name != "all_chunks.json" and entry.is_file()
+            ]
         
         print(f"Loading parent chunks from {len(json_files)} episode files...")
         
-        for json_file in json_files:
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    episode_data = json.load(f)
-                
-                video_id = episode_data.get('metadata', {}).get('video_id', '')
-                if not video_id:
-                    continue
-                
-                # Load parent chunks for this episode
-                for parent_chunk in episode_data.get('parent_chunks', []):
-                    parent_id = parent_chunk.get('id')
-                    if parent_id:
-                        key = (video_id, parent_id)
-                        self.parent_lookup[key] = {
-                            'text': parent_chunk.get('text', ''),
-                            'start_seconds': parent_chunk.get('start_seconds', 0.0),
-                            'end_seconds': parent_chunk.get('end_seconds', 0.0),
-                            'video_id': video_id,
-                            'parent_id': parent_id,
-                            'title': episode_data.get('metadata', {}).get('title', ''),
-                            'guest': episode_data.get('metadata', {}).get('guest', ''),
-                        }
-            
-            except Exception as e:
-                print(f"Warning: Could not load {json_file}: {e}")
-                continue
+        # File reads overlap across threads (I/O releases the GIL); results
+        # are merged here in file order, so later files still win on
+        # duplicate keys exactly as in a serial load
+        if self.max_workers > 1 and len(json_files) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(json_files))) as executor:
+                per_file = list(executor.map(self._parse_one, json_files))
+        else:
+            per_file = [self._parse_one(json_file) for json_file in json_files]
+        
+        for entries in per_file:
+            self.parent_lookup.update(entries)
         
         print(f"Loaded {len(self.parent_lookup)} parent chunks")
     
+    def _parse_one(self, json_file: str) -> List[Tuple[tuple, Dict[str, any]]]:
+        """
+        Read one episode file.
+        
+        Args:
+            json_file: Episode JSON file
+            
+        Returns:
+            ((video_id, parent_id), parent chunk) pairs (empty if unreadable)
+        """
+        entries = []
+        try:
+            # orjson (C parser) when installed, stdlib json otherwise
+            episode_data = read_json(json_file)
+            
+            metadata = episode_data.get('metadata', {})
+            video_id = metadata.get('video_id', '')
+            if not video_id:
+                return entries
+            
+            # Load parent chunks for this episode
+            for parent_chunk in episode_data.get('parent_chunks', []):
+                parent_id = parent_chunk.get('id')
+                if parent_id:
+                    entries.append(((video_id, parent_id), {
+                        'text': parent_chunk.get('text', ''),
+                        'start_seconds': parent_chunk.get('start_seconds', 0.0),
+                        'end_seconds': parent_chunk.get('end_seconds', 0.0),
+                        'video_id': video_id,
+                        'parent_id': parent_id,
+                        'title': metadata.get('title', ''),
+                        'guest': metadata.get('guest', ''),
+                    }))
+        
+        except Exception as e:
+            print(f"Warning: Could not load {json_file}: {e}")
+        
+        return entries
+    
     def get_parent(self, video_id: str, parent_id: str) -> Optional[Dict[str, any]]:
         """
         Get parent chunk by video_id and parent_id.
@@ -80,6 +113,19 @@ class ParentChunkLoader:
         key = (video_id, parent_id)
         return self.parent_lookup.get(key)
     
+    def get_parents_bulk(self, keys: List[Tuple[str, str]]) -> Dict[tuple, Dict[str, any]]:
+        """
+        Get several parent chunks at once.
+        
+        Args:
+            keys: (video_id, parent_id) pairs
+            
+        Returns:
+            Dictionary of (video_id, parent_id) -> parent chunk for the keys found
+        """
+        lookup = self.parent_lookup
+        return {key: lookup[key] for key in keys if key in lookup}
+    
     def get_stats(self) -> Dict[str, any]:
         """Get loader statistics."""
         return {
@@ -0,0 +1,159 @@
+"""
+Spilling Parent Text Store
+Dict-like store of parent chunk texts that keeps only the most recently used
+entries in memory and spills the rest to SQLite.
+
+Shared by EmbeddingPipeline and TwoTierEmbeddingPipeline for their
+disk-backed parent stores.
+"""
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+
+class SpillingParentStore(MutableMapping):
+    """
+    parent_id -> text mapping with bounded resident memory.
+
+    Up to max_resident texts live in an LRU-ordered dict; the least recently
+    used one is written to SQLite when the bound is exceeded, and read back
+    (and promoted) on the next access. flush() persists resident texts that
+    were set since the last write, so the store survives a restart.
+    """
+
+    # Max keys per SELECT ... IN (...) (SQLite's default variable limit is 999)
+    LOOKUP_BATCH = 500
+
+    def __init__(self, path: str, max_resident: int = 10_000):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite database file for evicted texts
+            max_resident: Maximum texts held in memory
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_resident = max_resident
+        self._hot: "OrderedDict[str, str]" = OrderedDict()
+        # Resident ids whose text is not on disk yet
+        self._dirty: set = set()
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS parent_texts (id TEXT PRIMARY KEY, text TEXT NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.commit()
+        self._lock = threading.RLock()
+
+    def _cold_get(self, parent_id: str) -> Optional[str]:
+        row = self._conn.execute("SELECT text FROM parent_texts WHERE id = ?", (parent_id,)).fetchone()
+        return row[0] if row else None
+
+    def __getitem__(self, parent_id: str) -> str:
+        with self._lock:
+            text = self._hot.get(parent_id)
+            if text is not None:
+                self._hot.move_to_end(parent_id)
+                return text
+            text = self._cold_get(parent_id)
+            if text is None:
+                raise KeyError(parent_id)
+            self._promote(parent_id, text)
+            return text
+
+    def __setitem__(self, parent_id: str, text: str):
+        with self._lock:
+            self._dirty.add(parent_id)
+            self._promote(parent_id, text)
+
+    def _promote(self, parent_id: str, text: str):
+        """Put a text in memory, spilling the coldest entries past the bound."""
+        self._hot[parent_id] = text
+        self._hot.move_to_end(parent_id)
+        if len(self._hot) <= self.max_resident:
+            return
+        evicted = []
+        while len(self._hot) > self.max_resident:
+            evicted.append(self._hot.popitem(last=False))
+            self._dirty.discard(evicted[-1][0])
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO parent_texts (id, text) VALUES (?, ?)", evicted
+        )
+        self._conn.commit()
+
+    def __delitem__(self, parent_id: str):
+        with self._lock:
+            in_memory = self._hot.pop(parent_id, None) is not None
+            self._dirty.discard(parent_id)
+            deleted = self._conn.execute("DELETE FROM parent_texts WHERE id = ?", (parent_id,)).rowcount
+            self._conn.commit()
+            if not in_memory and not deleted:
+                raise KeyError(parent_id)
+
+    def __contains__(self, parent_id) -> bool:
+        with self._lock:
+            return parent_id in self._hot or self._cold_get(parent_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            hot = list(self._hot)
+            cold = [row[0] for row in self._conn.execute("SELECT id FROM parent_texts")]
+        hot_ids = set(hot)
+        yield from hot
+        # A promoted text may still have a (stale) row on disk
+        yield from (parent_id for parent_id in cold if parent_id not in hot_ids)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def get_many(self, parent_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Look up several texts at once (one SQLite query for the cold ones).
+
+        Args:
+            parent_ids: Parent chunk IDs
+
+        Returns:
+            Dictionary of parent_id -> text for the IDs that are known
+        """
+        with self._lock:
+            found = {}
+            cold = {}  # ordered set: an ID requested twice is looked up once
+            for parent_id in parent_ids:
+                text = self._hot.get(parent_id)
+                if text is not None:
+                    found[parent_id] = text
+                else:
+                    cold[parent_id] = None
+            cold = list(cold)
+            for start in range(0, len(cold), self.LOOKUP_BATCH):
+                batch = cold[start:start + self.LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                found.update(self._conn.execute(
+                    f"SELECT id, text FROM parent_texts WHERE id IN ({placeholders})", batch
+                ))
+            return found
+
+    def flush(self):
+        """Write resident texts set since the last flush to disk."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO parent_texts (id, text) VALUES (?, ?)",
+                [(parent_id, self._hot[parent_id]) for parent_id in self._dirty],
+            )
+            self._conn.commit()
+            self._dirty.clear()
+
+    def close(self):
+        """Spill resident texts to disk and close the database connection."""
+        with self._lock:
+            self.flush()
+            self._conn.close()
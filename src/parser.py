@@ -4,6 +4,7 @@ Handles parsing of transcript formats, speaker extraction, and timestamp convers
 """
 
 import re
+import sys
 from typing import List, Optional, Tuple
 from .ingestion import Segment
 
@@ -57,11 +58,15 @@ class TranscriptParser:
             List of Segment objects with speaker and timestamp information
         """
         segments = []
+        # Word count per segment, accumulated while parsing so the duration
+        # estimates don't have to re-split each segment's joined text
+        word_counts = []
         lines = text.split('\n')
         
         current_speaker = None
         current_start = 0.0
         current_text_parts = []
+        current_word_count = 0
         estimated_time = 0.0
         
         for line in lines:
@@ -86,9 +91,11 @@ class TranscriptParser:
                         speaker=current_speaker
                     )
                     segments.append(segment)
+                    word_counts.append(current_word_count)
                 
                 # Extract new speaker info
-                speaker_name = match.group(1).strip()
+                # Interned: few distinct speakers, so merge comparisons become identity checks
+                speaker_name = sys.intern(match.group(1).strip())
                 hours = int(match.group(2))
                 minutes = int(match.group(3))
                 seconds = int(match.group(4))
@@ -98,6 +105,7 @@ class TranscriptParser:
                 current_start = hours * 3600 + minutes * 60 + seconds
                 estimated_time = current_start
                 current_text_parts = [text_content] if text_content else []
+                current_word_count = len(text_content.split())
                 
             else:
                 # Try simple "Speaker Name:" format
@@ -112,22 +120,24 @@ class TranscriptParser:
                             speaker=current_speaker
                         )
                         segments.append(segment)
+                        word_counts.append(current_word_count)
                         # Update estimated time for next segment
-                        word_count = len(segment.text.split())
-                        estimated_time += max(word_count / 2.5, 5.0)
+                        estimated_time += max(current_word_count / 2.5, 5.0)
                     
                     # Extract new speaker info
-                    speaker_name = simple_match.group(1).strip()
+                    speaker_name = sys.intern(simple_match.group(1).strip())
                     text_content = simple_match.group(2).strip()
                     
                     current_speaker = speaker_name
                     current_start = estimated_time  # Use estimated time
                     # Start with text on same line if present, otherwise wait for next line
                     current_text_parts = [text_content] if text_content else []
+                    current_word_count = len(text_content.split())
                 else:
                     # Continuation of current speaker's text
                     if current_speaker is not None:
                         current_text_parts.append(line)
+                        current_word_count += len(line.split())
                     # If no current speaker and line doesn't start with #, it might be orphaned text
                     elif not line.startswith('#'):
                         # Skip orphaned lines (not headers, not speaker lines)
@@ -142,20 +152,19 @@ class TranscriptParser:
                 speaker=current_speaker
             )
             segments.append(segment)
+            word_counts.append(current_word_count)
         
         # Calculate durations
         if segments:
             for i in range(len(segments) - 1):
                 # Estimate duration based on text length
-                word_count = len(segments[i].text.split())
-                estimated_duration = max(word_count / 2.5, 5.0)  # 150 words per minute
+                estimated_duration = max(word_counts[i] / 2.5, 5.0)  # 150 words per minute
                 segments[i].duration = estimated_duration
                 segments[i + 1].start = segments[i].start + estimated_duration
             
             # Last segment duration
             last_segment = segments[-1]
-            word_count = len(last_segment.text.split())
-            last_segment.duration = max(word_count / 2.5, 5.0)
+            last_segment.duration = max(word_counts[-1] / 2.5, 5.0)
         
         return segments
     
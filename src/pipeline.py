@@ -3,6 +3,8 @@ Main Pipeline Orchestrator
 Ties all components together into a complete processing pipeline.
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Optional, Dict, Any
 from pathlib import Path
 
@@ -12,6 +14,10 @@ from .cleaning import TextCleaner
 from .chunking import HierarchicalChunker
 from .embedding import EmbeddingGenerator, EmbeddingPipeline, VectorStore
 
+# Verify every enriched text still contains its child chunk text.
+# Also disabled when Python runs with -O (asserts are stripped).
+VERIFY_ENRICHMENT = True
+
 
 class VideoRAGPipeline:
     """Complete pipeline for processing video transcripts."""
@@ -21,7 +27,8 @@ class VideoRAGPipeline:
                  embedding_api_key: Optional[str] = None,
                  vector_store: Optional[VectorStore] = None,
                  parent_window_tokens: int = 2000,
-                 child_window_tokens: int = 250):
+                 child_window_tokens: int = 250,
+                 child_overlap_tokens: int = 50):
         """
         Initialize the complete pipeline.
         
@@ -31,6 +38,7 @@ class VideoRAGPipeline:
             vector_store: Vector store instance (optional)
             parent_window_tokens: Size of parent chunks
             child_window_tokens: Size of child chunks
+            child_overlap_tokens: Overlap between child chunks
         """
         # Initialize components
         self.ingester = FileIngester(transcripts_dir)
@@ -38,7 +46,8 @@ class VideoRAGPipeline:
         self.cleaner = TextCleaner()
         self.chunker = HierarchicalChunker(
             parent_window_tokens=parent_window_tokens,
-            child_window_tokens=child_window_tokens
+            child_window_tokens=child_window_tokens,
+            child_overlap_tokens=child_overlap_tokens
         )
         
         # Initialize embedding components
@@ -61,6 +70,24 @@ class VideoRAGPipeline:
         # For now, return None and handle it gracefully
         return None
     
+    def processing_config(self) -> Dict[str, Any]:
+        """
+        Constructor arguments that reproduce this pipeline's processing steps.
+        
+        Used to build worker-process pipelines. The embedding client is left
+        out (workers don't index), as is anything set on the components after
+        construction, such as a chunker embedding_model.
+        
+        Returns:
+            Keyword arguments for VideoRAGPipeline
+        """
+        return {
+            'transcripts_dir': str(self.ingester.transcripts_dir),
+            'parent_window_tokens': self.chunker.parent_window_tokens,
+            'child_window_tokens': self.chunker.child_window_tokens,
+            'child_overlap_tokens': self.chunker.child_overlap_tokens,
+        }
+    
     def process_file(self, file_path: str, 
                     metadata_override: Optional[Dict[str, Any]] = None,
                     index: bool = True) -> Dict[str, Any]:
@@ -102,34 +129,32 @@ class VideoRAGPipeline:
         # FIX 4: Enrichment happens exactly ONCE here in pipeline
         print("Enriching chunks with context...")
         parent_lookup = {p.id: p for p in parent_chunks}
-        enriched_texts = []
+        enriched_texts = [None] * len(child_chunks)
         
-        for child_chunk in child_chunks:
-            parent_chunk = parent_lookup.get(child_chunk.parent_id)
-            if parent_chunk:
-                enriched_text = self.chunker.enrich_with_context(
-                    child_chunk, parent_chunk, ingested.meta
-                )
-                # FIX 4: Hard assertion - fail fast if enrichment is wrong
-                assert child_chunk.text in enriched_text, (
+        # Hot loop: bind lookups to locals once
+        enrich = self.chunker.enrich_with_context
+        meta = ingested.meta
+        get_parent = parent_lookup.__getitem__
+        
+        for i, child_chunk in enumerate(child_chunks):
+            try:
+                parent_chunk = get_parent(child_chunk.parent_id)
+            except KeyError:
+                raise ValueError(f"No parent found for child {child_chunk.id} with parent_id {child_chunk.parent_id}")
+            enriched_text = enrich(child_chunk, parent_chunk, meta)
+            # FIX 4: Hard assertion - fail fast if enrichment is wrong
+            # enrich_with_context appends the chunk text, so endswith() settles
+            # the common case without a full substring scan
+            if __debug__ and VERIFY_ENRICHMENT:
+                child_text = child_chunk.text
+                assert enriched_text.endswith(child_text) or child_text in enriched_text, (
                     f"Enriched text for child {child_chunk.id} doesn't contain chunk text. "
-                    f"Child text: {child_chunk.text[:100]}... "
+                    f"Child text: {child_text[:100]}... "
                     f"Enriched text: {enriched_text[:100]}..."
                 )
-            else:
-                raise ValueError(f"No parent found for child {child_chunk.id} with parent_id {child_chunk.parent_id}")
-            enriched_texts.append(enriched_text)
-        
-        # Step 6: Indexing (if enabled and embedding generator available)
-        if index and self.embedding_pipeline:
-            print("Indexing chunks...")
-            self.embedding_pipeline.index_chunks(
-                child_chunks, parent_chunks, ingested.meta, enriched_texts
-            )
-            print("Indexing complete!")
+            enriched_texts[i] = enriched_text
         
-        # Return results
-        return {
+        result = {
             'ingested': ingested,
             'segments': cleaned_segments,
             'parent_chunks': parent_chunks,
@@ -137,15 +162,49 @@ class VideoRAGPipeline:
             'enriched_texts': enriched_texts,
             'metadata': ingested.meta
         }
+        
+        # Step 6: Indexing (if enabled and embedding generator available)
+        if index:
+            self.index_results(result)
+        
+        return result
+    
+    def index_results(self, result: Dict[str, Any]) -> None:
+        """
+        Index the chunks of a processed file.
+        
+        Kept separate from processing so that callers (process_directory,
+        process_topic_episodes) can run the CPU-bound steps in worker
+        processes and index in this process only.
+        
+        Args:
+            result: Dictionary returned by process_file
+        """
+        if not self.embedding_pipeline:
+            return
+        
+        print("Indexing chunks...")
+        self.embedding_pipeline.index_chunks(
+            result['child_chunks'], result['parent_chunks'],
+            result['metadata'], result['enriched_texts']
+        )
+        print("Indexing complete!")
     
     def process_directory(self, directory: Optional[str] = None,
-                         index: bool = True) -> List[Dict[str, Any]]:
+                         index: bool = True,
+                         max_workers: int = 1) -> List[Dict[str, Any]]:
         """
         Process all transcript files in a directory.
         
+        With max_workers > 1, files are ingested, parsed, cleaned and chunked
+        in worker processes built from processing_config(); indexing stays in
+        this process. On spawn-based platforms (Windows, macOS) the calling
+        script must guard its entry point with `if __name__ == "__main__":`.
+        
         Args:
             directory: Directory path (uses default if not provided)
             index: Whether to index the processed chunks
+            max_workers: Number of worker processes (default: 1 = sequential)
             
         Returns:
             List of processing results
@@ -158,14 +217,54 @@ class VideoRAGPipeline:
         if not dir_path.exists():
             raise FileNotFoundError(f"Directory not found: {dir_path}")
         
-        transcript_files = list(dir_path.glob("*.txt")) + list(dir_path.glob("*.md"))
+        # Single directory pass; plain path strings are what process_file takes
+        with os.scandir(dir_path) as entries:
+            transcript_files = sorted(
+                entry.path for entry in entries
+                if entry.name.endswith(('.txt', '.md'))
+                and not entry.name.startswith('.') and entry.is_file()
+            )
         
-        for file_path in transcript_files:
-            try:
-                result = self.process_file(str(file_path), index=index)
-                results.append(result)
-            except Exception as e:
-                print(f"Error processing {file_path}: {e}")
-                continue
+        if max_workers <= 1 or len(transcript_files) < 2:
+            for file_path in transcript_files:
+                try:
+                    result = self.process_file(file_path, index=index)
+                    results.append(result)
+                except Exception as e:
+                    print(f"Error processing {file_path}: {e}")
+                    continue
+            return results
+        
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_worker,
+                                 initargs=(self.processing_config(),)) as executor:
+            futures = [
+                (file_path, executor.submit(_process_file_worker, file_path))
+                for file_path in transcript_files
+            ]
+            for file_path, future in futures:
+                try:
+                    result = future.result()
+                    if index:
+                        self.index_results(result)
+                    results.append(result)
+                except Exception as e:
+                    print(f"Error processing {file_path}: {e}")
+                    continue
         
         return results
+
+
+# Per-process pipeline used by process_directory workers (no embedding client)
+_worker_pipeline: Optional[VideoRAGPipeline] = None
+
+
+def _init_worker(config: Dict[str, Any]) -> None:
+    """Build the worker's pipeline once when the process starts."""
+    global _worker_pipeline
+    _worker_pipeline = VideoRAGPipeline(**config)
+
+
+def _process_file_worker(file_path: str) -> Dict[str, Any]:
+    """Run ingestion through enrichment for one file inside a worker process."""
+    return _worker_pipeline.process_file(file_path, index=False)
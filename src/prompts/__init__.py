@@ -2,11 +2,15 @@
 Prompt loader utilities
 """
 
+from functools import lru_cache
 from pathlib import Path
 
-PROMPTS_DIR = Path(__file__).parent
+PROMPTS_DIR = Path(__file__).resolve().parent
 
 
+# Prompt files don't change at runtime: each is read once per process
+# (edits need a restart, or load_prompt.cache_clear())
+@lru_cache(maxsize=64)
 def load_prompt(filename: str) -> str:
     """
     Load a prompt template from file.
@@ -3,7 +3,18 @@ Query Rewriter Module
 STEP 3: Generate query variants to improve recall
 """
 
-from typing import List
+import re
+from functools import lru_cache
+from typing import List, Tuple
+
+# Question prefixes that get a rewritten variant (matched once per query)
+_QUESTION_PREFIX = re.compile(r'^(how to|what is)\b\s*')
+
+# Prefix -> template for the "product manager" context variant
+_PM_CONTEXT_TEMPLATES = {
+    "how to": "how do product managers {}",
+    "what is": "what is product management {}",
+}
 
 
 class QueryRewriter:
@@ -27,40 +38,42 @@ class QueryRewriter:
         Returns:
             List of query variants (including original)
         """
-        variants = [query]  # Always include original
+        return list(self._rewrite_cached(query))
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _rewrite_cached(query: str) -> Tuple[str, ...]:
+        """Pure function of the query, so repeated queries are served from cache."""
+        # Keyed by normalized form: insertion order is preserved and
+        # setdefault() drops duplicates as variants are added
+        variants = {query.lower().strip(): query}  # Always include original
+        
+        def add(variant: str) -> None:
+            variants.setdefault(variant.lower().strip(), variant)
         
         query_lower = query.lower()
+        match = _QUESTION_PREFIX.match(query_lower)
+        prefix = match.group(1) if match else None
+        rest = query_lower[match.end():] if match else query_lower
         
         # Pattern 1: Add "product manager" context if not present
-        if "product manager" not in query_lower and "pm" not in query_lower:
-            if query_lower.startswith("how to"):
-                variants.append(f"how do product managers {query_lower[7:]}")
-            elif query_lower.startswith("what is"):
-                variants.append(f"what is product management {query_lower[7:]}")
+        if prefix and "product manager" not in query_lower and "pm" not in query_lower:
+            add(_PM_CONTEXT_TEMPLATES[prefix].format(rest))
         
         # Pattern 2: Add framework/approach context
         if "framework" not in query_lower and "approach" not in query_lower:
             if "how to" in query_lower or "how do" in query_lower:
-                variants.append(f"framework for {query_lower}")
-                variants.append(f"approach to {query_lower}")
+                add(f"framework for {query_lower}")
+                add(f"approach to {query_lower}")
         
         # Pattern 3: Add "leaders" or "experts" context
-        if "leader" not in query_lower and "expert" not in query_lower:
-            variants.append(f"how do leaders {query_lower[7:]}" if query_lower.startswith("how to") else query)
+        if prefix == "how to" and "leader" not in query_lower and "expert" not in query_lower:
+            add(f"how do leaders {rest}")
         
         # Pattern 4: Remove question mark and add variations
         if query.endswith("?"):
             base = query[:-1].strip()
-            variants.append(base)
-            variants.append(f"{base} in product management")
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_variants = []
-        for variant in variants:
-            variant_lower = variant.lower().strip()
-            if variant_lower not in seen:
-                seen.add(variant_lower)
-                unique_variants.append(variant)
+            add(base)
+            add(f"{base} in product management")
         
-        return unique_variants[:5]  # Limit to 5 variants max
+        return tuple(variants.values())[:5]  # Limit to 5 variants max
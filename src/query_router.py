@@ -3,25 +3,29 @@ Query Router - Determines whether to use RAG or conversational mode
 Production-grade with PM intent detection and confidence thresholds
 """
 
+from functools import lru_cache
 from typing import List, Any
 
-# PM-related keywords for intent detection
-PM_KEYWORDS = {
-    "product", "pm", "features", "prioritize", "roadmap",
-    "users", "growth", "metrics", "revenue", "pricing",
-    "retention", "activation", "strategy", "okr", "kpi",
-    "sprint", "agile", "backlog", "stakeholder", "mvp",
-    "user research", "customer", "feedback", "iteration",
-    "launch", "release", "a/b test", "experiment", "hypothesis",
-    "market", "competitor", "positioning", "segmentation",
-    "onboarding", "churn", "engagement", "conversion",
-    "funnel", "journey", "persona", "jobs to be done",
-    "discovery", "delivery", "outcome", "output", "impact",
-    "prioritization", "framework", "rice", "ice", "moscow",
-    "north star", "leading indicator", "lagging indicator"
-}
+# PM-related keywords for intent detection.
+# A tuple ordered by how often each term shows up in PM questions, so the
+# any() scan in is_pm_intent usually stops after the first few entries.
+PM_KEYWORDS = (
+    # Most common
+    "product", "pm", "users", "customer", "growth", "metrics",
+    "roadmap", "prioritize", "prioritization", "features", "strategy",
+    "framework", "launch", "feedback", "stakeholder", "retention",
+    "onboarding", "engagement", "pricing", "discovery", "experiment",
+    # Less common
+    "revenue", "activation", "churn", "conversion", "funnel", "market",
+    "competitor", "positioning", "segmentation", "okr", "kpi", "mvp",
+    "north star", "user research", "jobs to be done", "persona", "journey",
+    "hypothesis", "a/b test", "iteration", "release", "sprint", "agile",
+    "backlog", "delivery", "outcome", "output", "impact", "rice", "ice",
+    "moscow", "leading indicator", "lagging indicator"
+)
 
 
+@lru_cache(maxsize=4096)
 def is_pm_intent(query: str) -> bool:
     """
     Detect if query has product management intent.
@@ -51,10 +55,15 @@ def should_use_rag(results: List[Any], min_strong_hits: int = 2, score_threshold
     if not results:
         return False
     
-    # Count chunks with strong relevance scores
-    strong_hits = [r for r in results if getattr(r, 'score', 0) >= score_threshold]
+    # Count chunks with strong relevance scores, stopping once we have enough
+    strong_hits = 0
+    for r in results:
+        if getattr(r, 'score', 0) >= score_threshold:
+            strong_hits += 1
+            if strong_hits >= min_strong_hits:
+                return True
     
-    return len(strong_hits) >= min_strong_hits
+    return strong_hits >= min_strong_hits
 
 
 def get_query_mode(query: str, results: List[Any]) -> str:
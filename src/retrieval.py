@@ -3,18 +3,40 @@ Retrieval Module with Parent Expansion
 Implements two-tier retrieval with parent context expansion and deduplication.
 """
 
-from typing import List, Dict, Optional, Any, Tuple, TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import attrgetter
+from typing import List, Dict, Optional, Any, Sequence, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .parent_loader import ParentChunkLoader
 
 from .embedding import EmbeddingGenerator, VectorStore
 from .two_tier_embedding import TwoTierEmbeddingPipeline
+from .semantic_cache import LSHQueryCache
+from .query_rewriter import QueryRewriter
+
+
+# Attribute names of RetrievalResult, in constructor order (also used by to_dict)
+_RESULT_FIELDS = (
+    'chunk_id', 'text', 'score', 'video_id', 'start_seconds', 'end_seconds',
+    'parent_id', 'speaker', 'tier', 'parent_text', 'video_title', 'guest',
+    'child_offset'
+)
+
+
+# Result lists repeat the same few videos/timestamps: build each URL once
+@lru_cache(maxsize=4096)
+def _deep_link(video_id: str, start: int) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}&t={start}s"
 
 
 class RetrievalResult:
     """Single retrieval result with full metadata for citations."""
     
+    # Hundreds are built per query: slots drop the per-instance __dict__
+    __slots__ = _RESULT_FIELDS
+    
     def __init__(
         self,
         chunk_id: str,
@@ -28,7 +50,8 @@ class RetrievalResult:
         tier: Optional[str] = None,
         parent_text: Optional[str] = None,
         video_title: Optional[str] = None,  # Episode title for citations
-        guest: Optional[str] = None  # Guest name (fallback for speaker)
+        guest: Optional[str] = None,  # Guest name (fallback for speaker)
+        child_offset: int = -1  # Offset of text within the parent chunk (-1 = unknown)
     ):
         self.chunk_id = chunk_id
         self.text = text
@@ -42,6 +65,7 @@ class RetrievalResult:
         self.parent_text = parent_text
         self.video_title = video_title
         self.guest = guest
+        self.child_offset = child_offset
     
     def get_speaker(self) -> str:
         """Get speaker name with fallback to guest."""
@@ -59,20 +83,14 @@ class RetrievalResult:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
-        return {
-            'chunk_id': self.chunk_id,
-            'text': self.text,
-            'score': self.score,
-            'video_id': self.video_id,
-            'start_seconds': self.start_seconds,
-            'end_seconds': self.end_seconds,
-            'parent_id': self.parent_id,
-            'speaker': self.speaker,
-            'tier': self.tier,
-            'parent_text': self.parent_text,
-            'video_title': self.video_title,
-            'guest': self.guest
-        }
+        return {name: getattr(self, name) for name in _RESULT_FIELDS}
+    
+    def copy(self) -> 'RetrievalResult':
+        """Shallow copy (all fields are immutable values)."""
+        clone = RetrievalResult.__new__(RetrievalResult)
+        for name in _RESULT_FIELDS:
+            setattr(clone, name, getattr(self, name))
+        return clone
 
 
 class RetrievalPipeline:
@@ -92,7 +110,9 @@ class RetrievalPipeline:
         core_top_k: int = 20,  # STEP 2.2: Increased from 12 to 20 for better recall
         longtail_top_k: int = 10,  # Increased from 6 to 10
         min_score_threshold: float = 0.3,  # FIX: Lowered from 0.7 to 0.3 for semantic search
-        parent_expansion_percent: float = 0.25  # ±25% of parent text
+        parent_expansion_percent: float = 0.25,  # ±25% of parent text
+        use_semantic_cache: bool = False,
+        semantic_cache_threshold: float = 0.97
     ):
         """
         Initialize retrieval pipeline.
@@ -106,6 +126,9 @@ class RetrievalPipeline:
             longtail_top_k: Number of results from longtail index (if needed)
             min_score_threshold: Minimum similarity score to consider
             parent_expansion_percent: Percentage of parent text to include (±25%)
+            use_semantic_cache: Serve near-duplicate queries from an LSH query cache
+                (opt-in: a paraphrase gets the cached results of the earlier query)
+            semantic_cache_threshold: Cosine similarity needed for a cache hit
         """
         self.embedding_generator = embedding_generator
         self.core_store = core_store
@@ -115,6 +138,18 @@ class RetrievalPipeline:
         self.longtail_top_k = longtail_top_k
         self.min_score_threshold = min_score_threshold
         self.parent_expansion_percent = parent_expansion_percent
+        self.use_semantic_cache = use_semantic_cache
+        self.semantic_cache_threshold = semantic_cache_threshold
+        
+        # One cache per (use_longtail, use_query_rewriting) combination,
+        # created on first use (dimension comes from the first embedding)
+        self._query_caches: Dict[Tuple[bool, bool], LSHQueryCache] = {}
+        
+        # Whether embed_batch accepts batch_size/show_progress (probed on first call)
+        self._embed_batch_supports_batch_size: Optional[bool] = None
+        
+        # Stateless; rewrite() memoizes variants per query string
+        self.query_rewriter = QueryRewriter()
     
     def retrieve(
         self,
@@ -137,57 +172,220 @@ class RetrievalPipeline:
         Returns:
             List of retrieval results with parent expansion
         """
+        # Semantic cache: paraphrases of a recent query reuse its results.
+        # Filtered queries are not cached.
+        query_cache = None
+        if self.use_semantic_cache and not filters:
+            query_embedding = self.embedding_generator.embed(query)
+            query_cache = self._get_query_cache(
+                (use_longtail, use_query_rewriting), len(query_embedding)
+            )
+            # Convert/normalize the key once for both get() and put()
+            query_key = query_cache.normalize(query_embedding)
+            cached = query_cache.get(query_key, normalized=True)
+            if cached is not None:
+                # Callers mutate results (parent expansion, context truncation):
+                # hand out copies so cached entries never change
+                return [result.copy() for result in cached]
+        
         # STEP 3: Query rewriting - generate variants
         if use_query_rewriting:
-            from .query_rewriter import QueryRewriter
-            rewriter = QueryRewriter()
-            query_variants = rewriter.rewrite(query)
+            query_variants = self.query_rewriter.rewrite(query)
         else:
             query_variants = [query]
         
-        # Embed all query variants and merge results
-        all_results = []
-        seen_chunk_ids = set()
+        # Embed all query variants in one batch and search each store once.
+        # The original query leads the variants; reuse its cache-lookup embedding.
+        if query_cache is not None and query_variants[0] == query:
+            query_embeddings = [query_embedding]
+            if len(query_variants) > 1:
+                query_embeddings.extend(self._embed_queries(query_variants[1:]))
+        else:
+            query_embeddings = self._embed_queries(query_variants)
+        
+        final_results = self._merge_rows(
+            *self._search_rows(query_embeddings, use_longtail, filters)
+        )
+        
+        if query_cache is not None:
+            query_cache.put(query_key, [result.copy() for result in final_results], normalized=True)
         
-        for variant in query_variants:
-            # Embed query variant
-            query_embedding = self.embedding_generator.embed(variant)
+        return final_results
+    
+    def retrieve_batch(
+        self,
+        queries: List[str],
+        use_longtail: bool = False,
+        filters: Optional[Dict[str, Any]] = None,
+        use_query_rewriting: bool = True,
+        parent_loader: Optional['ParentChunkLoader'] = None
+    ) -> List[List[RetrievalResult]]:
+        """
+        Retrieve chunks for several queries at once.
+        
+        Gives the same results as calling retrieve() (or
+        retrieve_with_parent_loader()) per query, but the variants of all
+        queries are embedded in one call and each store is searched once
+        for the whole batch.
+        
+        Args:
+            queries: Search query texts
+            use_longtail: Whether to also search longtail index
+            filters: Optional metadata filters
+            use_query_rewriting: Whether to generate query variants
+            parent_loader: Optional ParentChunkLoader for full parent expansion
+            
+        Returns:
+            One list of retrieval results per query, in input order
+        """
+        if use_query_rewriting:
+            variants_per_query = [self.query_rewriter.rewrite(query) for query in queries]
+        else:
+            variants_per_query = [[query] for query in queries]
+        
+        # The original query leads its variants, so its first row doubles as
+        # the semantic cache key
+        flat_variants = [variant for variants in variants_per_query for variant in variants]
+        embeddings = self._embed_queries(flat_variants) if flat_variants else []
+        
+        results: List[Optional[List[RetrievalResult]]] = [None] * len(queries)
+        pending = []  # (query index, first row, row count, semantic cache, cache key)
+        first_row = 0
+        for i, variants in enumerate(variants_per_query):
+            query_cache = query_key = None
+            if self.use_semantic_cache and not filters:
+                query_cache = self._get_query_cache(
+                    (use_longtail, use_query_rewriting), len(embeddings[first_row])
+                )
+                query_key = query_cache.normalize(embeddings[first_row])
+                cached = query_cache.get(query_key, normalized=True)
+                if cached is not None:
+                    results[i] = [result.copy() for result in cached]
+            if results[i] is None:
+                pending.append((i, first_row, len(variants), query_cache, query_key))
+            first_row += len(variants)
+        
+        if pending:
+            rows = [
+                embeddings[row]
+                for _, start, count, _, _ in pending
+                for row in range(start, start + count)
+            ]
+            core_batches, longtail_batches = self._search_rows(rows, use_longtail, filters)
             
-            # Search core index
-            core_results = self.core_store.query(
-                query_vector=query_embedding,
+            offset = 0
+            for i, _, count, query_cache, query_key in pending:
+                final_results = self._merge_rows(
+                    core_batches[offset:offset + count],
+                    longtail_batches[offset:offset + count]
+                )
+                offset += count
+                if query_cache is not None:
+                    query_cache.put(query_key, [result.copy() for result in final_results], normalized=True)
+                results[i] = final_results
+        
+        if parent_loader is not None:
+            results = [
+                self._expand_with_parents(query_results, parent_loader=parent_loader)
+                for query_results in results
+            ]
+        return results
+    
+    def _search_rows(
+        self,
+        query_embeddings: List[List[float]],
+        use_longtail: bool,
+        filters: Optional[Dict[str, Any]]
+    ) -> Tuple[List[List[Dict[str, Any]]], List[List[Dict[str, Any]]]]:
+        """
+        Search the stores for a list of query embeddings.
+        
+        Args:
+            query_embeddings: One embedding per query variant (row)
+            use_longtail: Whether every row also searches the longtail index
+            filters: Optional metadata filters
+            
+        Returns:
+            (core results, longtail results), one list per row
+        """
+        if use_longtail:
+            # Every variant needs longtail, so both searches are independent:
+            # run them concurrently (store calls release the GIL)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                core_future = executor.submit(
+                    self.core_store.query_batch, query_embeddings,
+                    top_k=self.core_top_k, filters=filters
+                )
+                longtail_future = executor.submit(
+                    self.longtail_store.query_batch, query_embeddings,
+                    top_k=self.longtail_top_k, filters=filters
+                )
+                core_batches = core_future.result()
+                longtail_batches = longtail_future.result()
+            longtail_rows = []
+        else:
+            core_batches = self.core_store.query_batch(
+                query_embeddings,
                 top_k=self.core_top_k,
                 filters=filters
             )
             
-            # Check if we need longtail (low scores or few results)
-            strong_hits = [r for r in core_results if r.get('score', 0) >= self.min_score_threshold]
-            
-            if use_longtail or len(strong_hits) < 5:
-                # Search longtail index
-                longtail_results = self.longtail_store.query(
-                    query_vector=query_embedding,
-                    top_k=self.longtail_top_k,
-                    filters=filters
-                )
-            else:
-                longtail_results = []
+            # Check per variant if we need longtail (low scores or few results)
+            longtail_rows = []
+            for row, core_results in enumerate(core_batches):
+                strong_hits = sum(1 for r in core_results if r['score'] >= self.min_score_threshold)
+                if strong_hits < 5:
+                    longtail_rows.append(row)
             
-            # Convert to RetrievalResult objects and merge
-            for result in core_results:
-                retrieval_result = self._create_retrieval_result(result, "core")
-                if retrieval_result and retrieval_result.chunk_id not in seen_chunk_ids:
-                    seen_chunk_ids.add(retrieval_result.chunk_id)
-                    all_results.append(retrieval_result)
+            longtail_batches = [[] for _ in query_embeddings]
+        
+        if longtail_rows:
+            # Search longtail index
+            longtail_found = self.longtail_store.query_batch(
+                [query_embeddings[row] for row in longtail_rows],
+                top_k=self.longtail_top_k,
+                filters=filters
+            )
+            for row, longtail_results in zip(longtail_rows, longtail_found):
+                longtail_batches[row] = longtail_results
+        
+        return core_batches, longtail_batches
+    
+    def _merge_rows(
+        self,
+        core_batches: List[List[Dict[str, Any]]],
+        longtail_batches: List[List[Dict[str, Any]]]
+    ) -> List[RetrievalResult]:
+        """
+        Merge the store results of one query's variants into final results.
+        
+        Args:
+            core_batches: Core results per variant
+            longtail_batches: Longtail results per variant
             
-            for result in longtail_results:
-                retrieval_result = self._create_retrieval_result(result, "longtail")
-                if retrieval_result and retrieval_result.chunk_id not in seen_chunk_ids:
-                    seen_chunk_ids.add(retrieval_result.chunk_id)
-                    all_results.append(retrieval_result)
+        Returns:
+            Deduplicated, score-sorted results with parent expansion
+        """
+        # Convert to RetrievalResult objects and merge. Score and seen-id
+        # checks run on the raw dicts so rejected hits are never materialized.
+        all_results = []
+        seen_chunk_ids = set()
+        min_score = self.min_score_threshold
+        
+        for core_results, longtail_results in zip(core_batches, longtail_batches):
+            for tier, results in (("core", core_results), ("longtail", longtail_results)):
+                for result in results:
+                    if result['score'] < min_score:
+                        continue
+                    chunk_id = result['id']
+                    if chunk_id in seen_chunk_ids:
+                        continue
+                    seen_chunk_ids.add(chunk_id)
+                    all_results.append(self._create_retrieval_result(result, tier))
         
-        # Sort by score (descending)
-        all_results.sort(key=lambda x: x.score, reverse=True)
+        # Sort by score (descending). This is the only sort: the single-pass
+        # dedup below relies on it and keeps the order.
+        all_results.sort(key=attrgetter('score'), reverse=True)
         
         # Apply parent expansion
         expanded_results = self._expand_with_parents(all_results)
@@ -197,25 +395,61 @@ class RetrievalPipeline:
         
         return final_results
     
+    def _get_query_cache(self, key: Tuple[bool, bool], dim: int) -> LSHQueryCache:
+        """Get (or create) the semantic cache for a set of retrieve() options."""
+        cache = self._query_caches.get(key)
+        if cache is None:
+            cache = self._query_caches.setdefault(
+                key, LSHQueryCache(dim, threshold=self.semantic_cache_threshold)
+            )
+        return cache
+    
+    def _embed_queries(self, texts: List[str]) -> Sequence[Sequence[float]]:
+        """Embed query variants with a single batched call when the generator supports it."""
+        embed_batch = getattr(self.embedding_generator, 'embed_batch', None)
+        if embed_batch is None:
+            return [self.embedding_generator.embed(text) for text in texts]
+        
+        # FreeEmbeddingGenerator: one encoder batch, no progress bar;
+        # EmbeddingGenerator (OpenAI) doesn't take batch_size
+        if self._embed_batch_supports_batch_size is None:
+            try:
+                embeddings = embed_batch(texts, batch_size=len(texts), show_progress=False)
+                self._embed_batch_supports_batch_size = True
+                return embeddings
+            except TypeError:
+                self._embed_batch_supports_batch_size = False
+        
+        if self._embed_batch_supports_batch_size:
+            return embed_batch(texts, batch_size=len(texts), show_progress=False)
+        return embed_batch(texts)
+    
     def _create_retrieval_result(
         self,
         result: Dict[str, Any],
         tier: str
     ) -> Optional[RetrievalResult]:
-        """Create RetrievalResult from store result."""
-        if result.get('score', 0) < self.min_score_threshold:
+        """
+        Create RetrievalResult from store result.
+        
+        Store results always carry id, score, text, video_id, start/end
+        seconds, speaker and parent_id; child_offset is FAISS-only.
+        """
+        score = result['score']
+        if score < self.min_score_threshold:
             return None
         
         return RetrievalResult(
-            chunk_id=result.get('id', ''),
-            text=result.get('text', ''),
-            score=result.get('score', 0.0),
-            video_id=result.get('video_id', ''),
-            start_seconds=result.get('start_seconds', 0.0),
-            end_seconds=result.get('end_seconds', 0.0),
-            parent_id=result.get('parent_id'),
-            speaker=result.get('speaker'),
-            tier=tier
+            chunk_id=result['id'],
+            text=result['text'],
+            score=score,
+            video_id=result['video_id'],
+            start_seconds=result['start_seconds'],
+            end_seconds=result['end_seconds'],
+            parent_id=result['parent_id'],
+            speaker=result['speaker'],
+            tier=tier,
+            child_offset=result.get('child_offset', -1)
         )
     
     def _expand_with_parents(
@@ -229,26 +463,35 @@ class RetrievalPipeline:
         Retrieve with child → answer with parent.
         Fetches complete parent chunk text (not just ±25%).
         """
+        # Resolve every distinct parent with one bulk lookup per source
+        keys = list(dict.fromkeys(
+            (result.video_id, result.parent_id)
+            for result in results if result.parent_id and result.video_id
+        ))
+        # STEP 2: Full parents from loader first
+        parents = parent_loader.get_parents_bulk(keys) if parent_loader and keys else {}
+        # Fallback: two_tier_pipeline (from embedding time) for the rest
+        parent_texts = self.two_tier_pipeline.get_parent_texts(
+            [key[1] for key in keys if key not in parents]
+        )
+        
         expanded = []
         
         for result in results:
             if result.parent_id and result.video_id:
-                # STEP 2: Try to get full parent from loader first
-                if parent_loader:
-                    parent_data = parent_loader.get_parent(result.video_id, result.parent_id)
-                    if parent_data:
-                        result.parent_text = parent_data['text']
-                        # CITATION FIX: Populate video title and guest for proper citations
-                        result.video_title = parent_data.get('title', '')
-                        result.guest = parent_data.get('guest', '')
-                        # Use guest as fallback speaker if speaker is missing
-                        if not result.speaker and result.guest:
-                            result.speaker = result.guest
-                        expanded.append(result)
-                        continue
+                parent_data = parents.get((result.video_id, result.parent_id))
+                if parent_data:
+                    result.parent_text = parent_data['text']
+                    # CITATION FIX: Populate video title and guest for proper citations
+                    result.video_title = parent_data.get('title', '')
+                    result.guest = parent_data.get('guest', '')
+                    # Use guest as fallback speaker if speaker is missing
+                    if not result.speaker and result.guest:
+                        result.speaker = result.guest
+                    expanded.append(result)
+                    continue
                 
-                # Fallback: Try two_tier_pipeline (from embedding time)
-                parent_text = self.two_tier_pipeline.get_parent_text(result.parent_id)
+                parent_text = parent_texts.get(result.parent_id)
                 if parent_text:
                     # Use FULL parent text (not just ±25%)
                     result.parent_text = parent_text
@@ -264,21 +507,29 @@ class RetrievalPipeline:
         self,
         parent_text: str,
         child_text: str,
-        percent: float
+        percent: float,
+        child_offset: int = -1
     ) -> str:
         """
         Extract surrounding context from parent text.
         
+        Not used on the retrieval path (_expand_with_parents returns the full
+        parent); kept as a utility for callers that want a narrower window.
+        
         Args:
             parent_text: Full parent chunk text
             child_text: Child chunk text (to find position)
             percent: Percentage of parent text to include (±percent)
+            child_offset: Offset recorded at chunking time, if known
             
         Returns:
             Expanded context text
         """
-        # Find child text position in parent
-        child_pos = parent_text.find(child_text)
+        # Use the offset from chunking time; only search when it's missing or stale
+        if child_offset >= 0 and parent_text.startswith(child_text, child_offset):
+            child_pos = child_offset
+        else:
+            child_pos = parent_text.find(child_text)
         
         if child_pos == -1:
             # Child text not found in parent (shouldn't happen, but fallback)
@@ -310,72 +561,39 @@ class RetrievalPipeline:
         Rules:
         - Keep top 1 chunk per (video_id, parent_id) - highest score
         - Keep top 5 chunks per episode
+        
+        Expects results sorted by score (descending), as retrieve() produces,
+        so a single pass keeps the best chunks and the output stays sorted.
         """
-        # STEP 1: Deduplicate by (video_id, parent_id) - keep highest score
-        # This ensures one idea per parent, eliminating noise
-        best_per_parent: Dict[tuple, RetrievalResult] = {}
+        parent_counts: Dict[Tuple[str, str], int] = {}
+        episode_counts: Dict[str, int] = {}
+        seen_texts = set()
+        final_selected = []
+        
         for result in results:
             if not result.video_id or not result.parent_id:
                 continue  # Skip results without proper IDs
             
+            # Keep top max_per_parent per (video_id, parent_id)
             key = (result.video_id, result.parent_id)
+            parent_count = parent_counts.get(key, 0)
+            if parent_count >= max_per_parent:
+                continue
+            parent_counts[key] = parent_count + 1
             
-            if key not in best_per_parent:
-                best_per_parent[key] = result
-            else:
-                # Keep the one with higher score
-                if result.score > best_per_parent[key].score:
-                    best_per_parent[key] = result
-        
-        # Convert back to list
-        deduplicated = list(best_per_parent.values())
-        
-        # Group by parent_id
-        by_parent: Dict[str, List[RetrievalResult]] = {}
-        for result in deduplicated:
-            parent_key = result.parent_id or "no_parent"
-            if parent_key not in by_parent:
-                by_parent[parent_key] = []
-            by_parent[parent_key].append(result)
-        
-        # Group by episode (video_id)
-        by_episode: Dict[str, List[RetrievalResult]] = {}
-        for result in deduplicated:
-            episode_key = result.video_id or "no_episode"
-            if episode_key not in by_episode:
-                by_episode[episode_key] = []
-            by_episode[episode_key].append(result)
-        
-        # Keep top chunks per parent
-        selected = []
-        seen_texts = set()
-        
-        for parent_id, parent_results in by_parent.items():
-            # Sort by score (already sorted, but ensure)
-            parent_results.sort(key=lambda x: x.score, reverse=True)
+            # Skip exact text duplicates. The set holds the strings themselves:
+            # str caches its hash, so this allocates nothing per result
+            if result.text in seen_texts:
+                continue
+            seen_texts.add(result.text)
             
-            # Keep top max_per_parent
-            for result in parent_results[:max_per_parent]:
-                # Skip exact text duplicates
-                text_key = result.text[:100]  # Use first 100 chars as key
-                if text_key not in seen_texts:
-                    seen_texts.add(text_key)
-                    selected.append(result)
-        
-        # Apply episode-level limit
-        final_selected = []
-        episode_counts: Dict[str, int] = {}
-        
-        for result in selected:
-            episode_key = result.video_id or "no_episode"
-            count = episode_counts.get(episode_key, 0)
+            # Apply episode-level limit
+            episode_count = episode_counts.get(result.video_id, 0)
+            if episode_count >= max_per_episode:
+                continue
+            episode_counts[result.video_id] = episode_count + 1
             
-            if count < max_per_episode:
-                final_selected.append(result)
-                episode_counts[episode_key] = count + 1
-        
-        # Re-sort by score
-        final_selected.sort(key=lambda x: x.score, reverse=True)
+            final_selected.append(result)
         
         return final_selected
     
@@ -433,4 +651,4 @@ class RetrievalPipeline:
             YouTube URL with timestamp
         """
         adjusted_start = max(0, int(start_seconds) - lead_in)
-        return f"https://www.youtube.com/watch?v={video_id}&t={adjusted_start}s"
+        return _deep_link(video_id, adjusted_start)
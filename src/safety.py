@@ -35,6 +35,11 @@ REDIRECT_RESPONSE = (
 )
 
 
+def _contains_any(q_lower: str, terms) -> bool:
+    """Check an already-lowercased query for any of the terms."""
+    return any(term in q_lower for term in terms)
+
+
 def is_self_harm(query: str) -> bool:
     """
     Detect if query contains self-harm related content.
@@ -45,8 +50,7 @@ def is_self_harm(query: str) -> bool:
     Returns:
         True if self-harm content detected
     """
-    q = query.lower()
-    return any(term in q for term in SELF_HARM_TERMS)
+    return _contains_any(query.lower(), SELF_HARM_TERMS)
 
 
 def is_harmful(query: str) -> bool:
@@ -59,8 +63,7 @@ def is_harmful(query: str) -> bool:
     Returns:
         True if harmful content detected
     """
-    q = query.lower()
-    return any(term in q for term in HARMFUL_TERMS)
+    return _contains_any(query.lower(), HARMFUL_TERMS)
 
 
 def get_safety_response(query: str) -> dict | None:
@@ -73,7 +76,10 @@ def get_safety_response(query: str) -> dict | None:
     Returns:
         Safety response dict if blocked, None if safe
     """
-    if is_self_harm(query):
+    # Lowercase once for both checks
+    q = query.lower()
+    
+    if _contains_any(q, SELF_HARM_TERMS):
         return {
             "mode": "safety",
             "answer": SAFETY_RESPONSE,
@@ -81,7 +87,7 @@ def get_safety_response(query: str) -> dict | None:
             "confidence": None
         }
     
-    if is_harmful(query):
+    if _contains_any(q, HARMFUL_TERMS):
         return {
             "mode": "safety", 
             "answer": REDIRECT_RESPONSE,
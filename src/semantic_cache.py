@@ -0,0 +1,187 @@
+"""
+Semantic Query Cache
+LSH-bucketed cache that serves near-duplicate queries (paraphrases, retries)
+without re-running retrieval.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class LSHQueryCache:
+    """
+    LRU cache keyed by query embedding.
+    
+    Each embedding is hashed into one bucket per table using random
+    hyperplanes (sign of the projection = one bit). A lookup only compares
+    against entries sharing at least one bucket, and returns the best match
+    whose cosine similarity clears the threshold.
+    """
+    
+    def __init__(
+        self,
+        dim: int,
+        n_tables: int = 8,
+        bits: int = 12,
+        max_entries: int = 4096,
+        threshold: float = 0.97,
+        seed: int = 0
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            dim: Embedding dimension
+            n_tables: Number of hash tables (more tables = better recall)
+            bits: Hyperplanes per table (more bits = smaller buckets)
+            max_entries: Maximum cached queries before LRU eviction
+            threshold: Minimum cosine similarity for a cache hit
+            seed: Seed for the random hyperplanes
+        """
+        self.dim = dim
+        self.max_entries = max_entries
+        self.threshold = threshold
+        
+        rng = np.random.default_rng(seed)
+        # (dim, n_tables * bits): one projection gives every table's bits at once
+        self.planes = rng.standard_normal((dim, n_tables * bits)).astype(np.float32)
+        self.n_tables = n_tables
+        self.bits = bits
+        
+        # Per table: bucket key -> ids of entries in that bucket
+        self.tables: List[Dict[bytes, set]] = [{} for _ in range(n_tables)]
+        # Entry id -> (row in self.vectors, bucket keys, cached value); order = recency
+        self.entries: "OrderedDict[int, tuple[int, List[bytes], Any]]" = OrderedDict()
+        self._next_id = 0
+        
+        # Unit vectors of cached queries, one row per entry. Grows by doubling;
+        # rows of evicted entries are reused, so it stays near max_entries.
+        self.vectors = np.empty((min(64, max_entries), dim), dtype=np.float32)
+        self._free_rows: List[int] = []
+        self._rows_used = 0
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def normalize(self, embedding) -> np.ndarray:
+        """
+        Convert an embedding to the float32 unit vector used as cache key.
+        
+        Callers doing both get() and put() for one query can convert once
+        and pass the result with normalized=True.
+        """
+        vec = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+    
+    def _bucket_keys(self, vec: np.ndarray) -> List[bytes]:
+        signs = (vec @ self.planes) > 0
+        return [row.tobytes() for row in np.packbits(signs.reshape(self.n_tables, self.bits), axis=1)]
+    
+    def get(self, embedding, normalized: bool = False) -> Optional[Any]:
+        """
+        Look up a query embedding.
+        
+        Args:
+            embedding: Query embedding
+            normalized: embedding already comes from normalize()
+            
+        Returns:
+            Cached value of the most similar query above threshold, or None
+        """
+        vec = embedding if normalized else self.normalize(embedding)
+        keys = self._bucket_keys(vec)
+        
+        with self._lock:
+            candidates = set()
+            for table, key in zip(self.tables, keys):
+                bucket = table.get(key)
+                if bucket:
+                    candidates.update(bucket)
+            
+            if not candidates:
+                self.misses += 1
+                return None
+            
+            ids = list(candidates)
+            rows = [self.entries[i][0] for i in ids]
+            # One gather + matrix-vector product over the candidate rows only
+            scores = self.vectors[rows] @ vec
+            best = int(np.argmax(scores))
+            
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+            
+            entry_id = ids[best]
+            self.entries.move_to_end(entry_id)
+            self.hits += 1
+            return self.entries[entry_id][2]
+    
+    def put(self, embedding, value: Any, normalized: bool = False):
+        """
+        Cache a value for a query embedding.
+        
+        Args:
+            embedding: Query embedding
+            value: Value to return for this and near-identical queries
+            normalized: embedding already comes from normalize()
+        """
+        vec = embedding if normalized else self.normalize(embedding)
+        keys = self._bucket_keys(vec)
+        
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            
+            row = self._allocate_row()
+            self.vectors[row] = vec
+            self.entries[entry_id] = (row, keys, value)
+            for table, key in zip(self.tables, keys):
+                table.setdefault(key, set()).add(entry_id)
+            
+            while len(self.entries) > self.max_entries:
+                self._evict_oldest()
+    
+    def _allocate_row(self) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+        if self._rows_used == len(self.vectors):
+            grown = np.empty((len(self.vectors) * 2, self.dim), dtype=np.float32)
+            grown[:self._rows_used] = self.vectors
+            self.vectors = grown
+        row = self._rows_used
+        self._rows_used += 1
+        return row
+    
+    def _evict_oldest(self):
+        entry_id, (row, keys, _) = self.entries.popitem(last=False)
+        self._free_rows.append(row)
+        for table, key in zip(self.tables, keys):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del table[key]
+    
+    def clear(self):
+        """Drop all cached entries."""
+        with self._lock:
+            self.entries.clear()
+            self._free_rows.clear()
+            self._rows_used = 0
+            for table in self.tables:
+                table.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'threshold': self.threshold
+        }
@@ -4,13 +4,144 @@ Handles saving and loading chunks to/from JSON format.
 """
 
 import json
+import mmap
+import os
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterable, Iterator
 from datetime import datetime
 
 from .chunking import ParentChildChunk
 from .ingestion import VideoMetadata, Segment
 
+# Optional - C JSON parser/serializer (several times faster on episode files)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# Optional - incremental parser for the consolidated all_chunks.json
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    ijson = None
+    IJSON_AVAILABLE = False
+
+
+# Optional - typed JSON decoding straight into structs (skips unused fields)
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    msgspec = None
+    MSGSPEC_AVAILABLE = False
+
+
+# Files at least this large are parsed straight from a memory map (no read
+# copy); below it the mmap setup costs more than the copy it saves
+MMAP_MIN_BYTES = 64 * 1024
+
+# One episode per line; read by the embed scripts in a single sequential pass
+EPISODES_JSONL = "chunks.jsonl"
+
+
+def read_json(path: Path) -> Any:
+    """
+    Read and parse a JSON file.
+    
+    Args:
+        path: Path to JSON file
+        
+    Returns:
+        Parsed JSON data
+    """
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < MMAP_MIN_BYTES:
+                return orjson.loads(f.read())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                return orjson.loads(view)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+if MSGSPEC_AVAILABLE:
+    class ChunkWire(msgspec.Struct):
+        """Stored chunk fields needed to rebuild a ParentChildChunk."""
+        id: str
+        text: str
+        start_seconds: float
+        end_seconds: float
+        speaker: Optional[str] = None
+        parent_id: Optional[str] = None
+        enriched_text: Optional[str] = None
+    
+    class EpisodeWire(msgspec.Struct):
+        """Stored episode: metadata plus its parent and child chunks."""
+        metadata: Dict[str, Any]
+        parent_chunks: List[ChunkWire] = []
+        child_chunks: List[ChunkWire] = []
+    
+    _episode_decoder = msgspec.json.Decoder(EpisodeWire)
+
+
+def decode_episode(data: bytes) -> "EpisodeWire":
+    """
+    Decode an episode JSON document into typed structs (requires msgspec).
+    
+    Fields not declared on the structs (per-chunk video_metadata, URLs,
+    statistics) are skipped without being materialized.
+    
+    Args:
+        data: UTF-8 encoded episode JSON (a file or one JSONL line)
+        
+    Returns:
+        EpisodeWire struct
+    """
+    return _episode_decoder.decode(data)
+
+
+def parse_json(data: bytes) -> Any:
+    """
+    Parse JSON from bytes (e.g. one line of a JSONL file).
+    
+    Args:
+        data: UTF-8 encoded JSON
+        
+    Returns:
+        Parsed JSON data
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_line(data: Any) -> bytes:
+    """Serialize data as one compact UTF-8 JSON line (newline-terminated)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def _json_bytes(data: Any) -> bytes:
+    """Serialize data as 2-space indented UTF-8 JSON."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def write_json(path: Path, data: Any) -> None:
+    """
+    Write data as indented UTF-8 JSON.
+    
+    Args:
+        path: Output file path
+        data: JSON-serializable data
+    """
+    Path(path).write_bytes(_json_bytes(data))
+
 
 class ChunkStorage:
     """Handles storage of processed chunks in JSON format."""
@@ -25,8 +156,21 @@ class ChunkStorage:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
+    @staticmethod
+    def video_metadata_dict(metadata: VideoMetadata) -> Dict[str, Any]:
+        """Per-chunk 'video_metadata' entry (identical for every chunk of an episode)."""
+        return {
+            'video_id': metadata.video_id,
+            'title': metadata.title,
+            'guest': metadata.guest,
+            'publish_date': metadata.publish_date,
+            'topics': metadata.topics,
+            'description': metadata.description,
+        }
+    
     def chunk_to_dict(self, chunk: ParentChildChunk, metadata: VideoMetadata, 
-                      enriched_text: Optional[str] = None) -> Dict[str, Any]:
+                      enriched_text: Optional[str] = None,
+                      video_metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Convert a chunk to a dictionary for JSON serialization.
         
@@ -36,6 +180,8 @@ class ChunkStorage:
             chunk: ParentChildChunk instance
             metadata: Video metadata
             enriched_text: Optional enriched text for embedding (must be provided for child chunks)
+            video_metadata: Prebuilt video_metadata_dict(metadata), shared by
+                reference across an episode's chunks (built here if None)
             
         Returns:
             Dictionary representation of the chunk
@@ -57,23 +203,18 @@ class ChunkStorage:
             'speaker': chunk.speaker,
             'chunk_type': chunk.chunk_type,
             'parent_id': chunk.parent_id,
-            'video_metadata': {
-                'video_id': metadata.video_id,
-                'title': metadata.title,
-                'guest': metadata.guest,
-                'publish_date': metadata.publish_date,
-                'topics': metadata.topics,
-                'description': metadata.description,
-            }
+            'video_metadata': (
+                video_metadata if video_metadata is not None
+                else self.video_metadata_dict(metadata)
+            )
         }
         
         # Add YouTube deep link if video_id is available
         if metadata.video_id:
-            start_min = int(chunk.start_seconds // 60)
-            start_sec = int(chunk.start_seconds % 60)
+            start_min, start_sec = divmod(chunk.start_seconds, 60)
             chunk_dict['youtube_url'] = (
                 f"https://www.youtube.com/watch?v={metadata.video_id}"
-                f"&t={start_min}m{start_sec}s"
+                f"&t={int(start_min)}m{int(start_sec)}s"
             )
         
         return chunk_dict
@@ -96,6 +237,42 @@ class ChunkStorage:
         Returns:
             Path to saved JSON file
         """
+        episode_data = self.episode_to_dict(
+            episode_id, parent_chunks, child_chunks, metadata, enriched_texts
+        )
+        return self.save_episode_data(episode_data)
+    
+    def save_episode_data(self, episode_data: Dict[str, Any]) -> Path:
+        """
+        Save an episode dictionary (from episode_to_dict) to its JSON file.
+        
+        Args:
+            episode_data: Episode data dictionary
+            
+        Returns:
+            Path to saved JSON file
+        """
+        output_file = self.output_dir / f"{episode_data['episode_id']}.json"
+        write_json(output_file, episode_data)
+        
+        return output_file
+    
+    def episode_to_dict(self, episode_id: str, parent_chunks: List[ParentChildChunk],
+                        child_chunks: List[ParentChildChunk], metadata: VideoMetadata,
+                        enriched_texts: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Build the JSON structure saved for a single episode.
+        
+        Args:
+            episode_id: Unique identifier for the episode
+            parent_chunks: List of parent chunks
+            child_chunks: List of child chunks
+            metadata: Video metadata
+            enriched_texts: REQUIRED list of enriched texts (one per child chunk)
+            
+        Returns:
+            Episode data dictionary
+        """
         # FIX 4: Require enriched_texts - no recomputation in storage
         if enriched_texts is None:
             raise ValueError(
@@ -112,9 +289,10 @@ class ChunkStorage:
         # FIX 5: Use index-based mapping since IDs are guaranteed sequential
         enriched_map = {i: enriched_texts[i] for i in range(len(enriched_texts))}
         
-        # Convert chunks to dictionaries
+        # Convert chunks to dictionaries (one video_metadata dict per episode)
+        video_metadata = self.video_metadata_dict(metadata)
         parent_chunks_dict = [
-            self.chunk_to_dict(chunk, metadata) 
+            self.chunk_to_dict(chunk, metadata, video_metadata=video_metadata)
             for chunk in parent_chunks
         ]
         
@@ -122,7 +300,8 @@ class ChunkStorage:
             self.chunk_to_dict(
                 chunk, 
                 metadata, 
-                enriched_text=enriched_map[i]
+                enriched_text=enriched_map[i],
+                video_metadata=video_metadata
             )
             for i, chunk in enumerate(child_chunks)
         ]
@@ -150,18 +329,81 @@ class ChunkStorage:
             'processed_at': datetime.now().isoformat(),
         }
         
-        # Save to JSON file
-        output_file = self.output_dir / f"{episode_id}.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(episode_data, f, indent=2, ensure_ascii=False)
+        return episode_data
+    
+    def build_episodes_jsonl(self, output_file: str = EPISODES_JSONL) -> Path:
+        """
+        Write the JSONL episode file from the per-episode JSON files.
         
-        return output_file
+        One-time migration for chunk directories written before the JSONL
+        file existed.
+        
+        Args:
+            output_file: Name of the JSONL file
+            
+        Returns:
+            Path to the JSONL file
+        """
+        json_files = sorted(
+            path for path in self.output_dir.glob("*.json")
+            if path.name != "all_chunks.json"
+        )
+        return self.write_episodes_jsonl((read_json(path) for path in json_files), output_file)
+    
+    def write_episodes_jsonl(self, episodes: Iterable[Dict[str, Any]],
+                             output_file: str = EPISODES_JSONL) -> Path:
+        """
+        Write episode dictionaries to a JSONL file, one episode per line.
+        
+        Args:
+            episodes: Episode data dictionaries (from episode_to_dict)
+            output_file: Name of the JSONL file
+            
+        Returns:
+            Path to the JSONL file
+        """
+        output_path = self.output_dir / output_file
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        
+        try:
+            with open(tmp_path, 'wb') as f:
+                for episode_data in episodes:
+                    f.write(json_line(episode_data))
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, output_path)
+        
+        return output_path
+    
+    def iter_episodes_jsonl(self, input_file: str = EPISODES_JSONL) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the episodes of a JSONL episode file.
+        
+        Args:
+            input_file: Name of the JSONL file
+            
+        Yields:
+            Episode data dictionaries
+        """
+        input_path = self.output_dir / input_file
+        if not input_path.exists():
+            raise FileNotFoundError(f"Chunk file not found: {input_path}")
+        
+        with open(input_path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield parse_json(line)
     
     def save_all_chunks(self, all_episodes: List[Dict[str, Any]], 
                        output_file: str = "all_chunks.json") -> Path:
         """
         Save all chunks from multiple episodes to a single JSON file.
         
+        Episodes are serialized and written one at a time, so the whole
+        file never has to exist as one dict in memory. The output is the
+        same as dumping the full structure with indent=2.
+        
         Args:
             all_episodes: List of episode processing results
             output_file: Name of output JSON file
@@ -169,16 +411,32 @@ class ChunkStorage:
         Returns:
             Path to saved JSON file
         """
-        all_data = {
-            'total_episodes': len(all_episodes),
-            'processed_at': datetime.now().isoformat(),
-            'episodes': []
-        }
+        output_path = self.output_dir / output_file
+        # Written to a temp file first so a failure never leaves a truncated file
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        
+        try:
+            with open(tmp_path, 'wb') as f:
+                self._write_all_chunks(f, all_episodes)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, output_path)
+        
+        return output_path
+    
+    def _write_all_chunks(self, f, all_episodes: List[Dict[str, Any]]) -> None:
+        """Stream the save_all_chunks JSON document into an open binary file."""
+        f.write(
+            b'{\n  "total_episodes": ' + _json_bytes(len(all_episodes))
+            + b',\n  "processed_at": ' + _json_bytes(datetime.now().isoformat())
+            + b',\n  "episodes": ['
+        )
         
         total_parent_chunks = 0
         total_child_chunks = 0
         
-        for episode_result in all_episodes:
+        for n, episode_result in enumerate(all_episodes):
             metadata = episode_result['metadata']
             parent_chunks = episode_result['parent_chunks']
             child_chunks = episode_result['child_chunks']
@@ -199,9 +457,10 @@ class ChunkStorage:
             # FIX 5: Use index-based mapping since IDs are guaranteed sequential
             enriched_map = {i: enriched_texts[i] for i in range(len(enriched_texts))}
             
-            # Convert chunks to dictionaries
+            # Convert chunks to dictionaries (one video_metadata dict per episode)
+            video_metadata = self.video_metadata_dict(metadata)
             parent_chunks_dict = [
-                self.chunk_to_dict(chunk, metadata) 
+                self.chunk_to_dict(chunk, metadata, video_metadata=video_metadata)
                 for chunk in parent_chunks
             ]
             
@@ -209,7 +468,8 @@ class ChunkStorage:
                 self.chunk_to_dict(
                     chunk, 
                     metadata, 
-                    enriched_text=enriched_map[i]
+                    enriched_text=enriched_map[i],
+                    video_metadata=video_metadata
                 )
                 for i, chunk in enumerate(child_chunks)
             ]
@@ -234,22 +494,24 @@ class ChunkStorage:
                 'child_chunks': child_chunks_dict,
             }
             
-            all_data['episodes'].append(episode_data)
+            # Re-indent the episode to its depth inside "episodes" (JSON strings
+            # never contain raw newlines, so this only touches layout)
+            f.write(b',\n    ' if n else b'\n    ')
+            f.write(_json_bytes(episode_data).replace(b'\n', b'\n    '))
             total_parent_chunks += len(parent_chunks)
             total_child_chunks += len(child_chunks)
         
-        all_data['total_statistics'] = {
+        total_statistics = {
             'total_parent_chunks': total_parent_chunks,
             'total_child_chunks': total_child_chunks,
             'total_chunks': total_parent_chunks + total_child_chunks,
         }
-        
-        # Save to JSON file
-        output_path = self.output_dir / output_file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(all_data, f, indent=2, ensure_ascii=False)
-        
-        return output_path
+        f.write(b'\n  ]' if all_episodes else b']')
+        f.write(
+            b',\n  "total_statistics": '
+            + _json_bytes(total_statistics).replace(b'\n', b'\n  ')
+            + b'\n}'
+        )
     
     def load_episode_chunks(self, episode_id: str) -> Dict[str, Any]:
         """
@@ -265,5 +527,27 @@ class ChunkStorage:
         if not input_file.exists():
             raise FileNotFoundError(f"Chunk file not found: {input_file}")
         
-        with open(input_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_json(input_file)
+    
+    def iter_all_chunks(self, input_file: str = "all_chunks.json") -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the episodes of a consolidated chunk file.
+        
+        With ijson installed the file is parsed incrementally, one episode
+        in memory at a time; otherwise it is loaded whole.
+        
+        Args:
+            input_file: Name of the consolidated JSON file
+            
+        Yields:
+            Episode data dictionaries (same layout as save_all_chunks writes)
+        """
+        input_path = self.output_dir / input_file
+        if not input_path.exists():
+            raise FileNotFoundError(f"Chunk file not found: {input_path}")
+        
+        if IJSON_AVAILABLE:
+            with open(input_path, 'rb') as f:
+                yield from ijson.items(f, 'episodes.item', use_float=True)
+        else:
+            yield from read_json(input_path)['episodes']
@@ -3,13 +3,18 @@ Two-Tier Embedding System
 Implements core and longtail index separation for optimized retrieval.
 """
 
-import uuid
-from typing import List, Dict, Optional, Any, Tuple
+import itertools
+import secrets
+from pathlib import Path
+from typing import List, Dict, Optional, Any, Sequence, Tuple
+import numpy as np
 from .chunking import ParentChildChunk
 from .ingestion import VideoMetadata
 from .chunk_classifier import ChunkClassifier, ChunkType
 from .embedding_formatter import EmbeddingFormatter
-from .embedding import EmbeddingGenerator, VectorStore
+from .embedding import EmbeddingGenerator, VectorStore, quantize_embeddings
+from .embedding_cache import EmbeddingCache
+from .parent_text_store import SpillingParentStore
 
 
 class TwoTierEmbeddingPipeline:
@@ -25,7 +30,11 @@ class TwoTierEmbeddingPipeline:
         core_store: VectorStore,
         longtail_store: VectorStore,
         classifier: Optional[ChunkClassifier] = None,
-        disable_two_tier: bool = True  # FIX 2: Temporarily disable two-tier
+        disable_two_tier: bool = True,  # FIX 2: Temporarily disable two-tier
+        quantize: str = "fp32",
+        parent_store_path: Optional[str] = None,
+        embedding_cache_path: Optional[str] = None,
+        max_resident_parents: int = 10_000
     ):
         """
         Initialize two-tier embedding pipeline.
@@ -36,15 +45,63 @@ class TwoTierEmbeddingPipeline:
             longtail_store: Vector store for longtail index
             classifier: Optional chunk classifier (creates default if None)
             disable_two_tier: If True, put everything in core (temporary fix for recall)
+            quantize: Precision of vectors handed to the stores: "fp32", "fp16" or
+                "int8" (normalized, symmetric scale). Keep "fp32" for existing indexes.
+            parent_store_path: If set, parent texts go to a SpillingParentStore
+                (the same store EmbeddingPipeline uses): at most
+                max_resident_parents stay in memory, the rest are kept in this
+                SQLite file, which is flushed after every episode
+            embedding_cache_path: If set, embeddings are cached in this SQLite file
+                keyed by a hash of (provider, model, dimension, formatted text),
+                so re-indexing unchanged chunks skips the embedding call
+            max_resident_parents: In-memory bound for the spilling parent store
         """
         self.embedding_generator = embedding_generator
         self.core_store = core_store
         self.longtail_store = longtail_store
         self.classifier = classifier or ChunkClassifier(relaxed_mode=True)
         self.disable_two_tier = disable_two_tier  # FIX 2
+        self.quantize = quantize
+        
+        # Vector ID suffix for episodes without a video_id: random per-instance
+        # salt + counter (unique without a urandom draw per record)
+        self._id_salt = secrets.token_hex(4)
+        self._id_counter = itertools.count()
+        
+        # Whether embed_batch accepts batch_size/show_progress (probed on first call)
+        self._embed_batch_supports_batch_size: Optional[bool] = None
+        
+        # Content-hash -> embedding cache (only when a path is given)
+        self.embedding_cache_path = Path(embedding_cache_path) if embedding_cache_path else None
+        self._embedding_cache: Optional[EmbeddingCache] = None
+        if self.embedding_cache_path:
+            # fp16/bf16 forward passes produce different vectors than fp32
+            namespace = ":".join((
+                type(embedding_generator).__name__,
+                str(getattr(embedding_generator, 'model_name', '')),
+                str(getattr(embedding_generator, 'dimensions', '')),
+                getattr(embedding_generator, 'precision', 'fp32'),
+            ))
+            # Quantized backends produce slightly different vectors
+            backend = getattr(embedding_generator, 'backend', 'torch')
+            if backend != 'torch':
+                namespace = f"{namespace}:{backend}"
+            self._embedding_cache = EmbeddingCache(self.embedding_cache_path, namespace)
+            print(f"Embedding cache: {len(self._embedding_cache)} stored embeddings")
         
         # Store parent chunks for expansion during retrieval
-        self.parent_store: Dict[str, str] = {}
+        # Parallel id/text lists with an id -> row index (columnar layout)
+        self._parent_ids: List[str] = []
+        self._parent_texts: List[str] = []
+        self._parent_index: Dict[str, int] = {}
+        
+        # Disk-backed mode: bounded in-memory LRU spilling to SQLite
+        self.parent_store_path = Path(parent_store_path) if parent_store_path else None
+        self._parent_disk_store: Optional[SpillingParentStore] = None
+        if self.parent_store_path:
+            self._parent_disk_store = SpillingParentStore(
+                str(self.parent_store_path), max_resident=max_resident_parents
+            )
     
     def index_chunks(
         self,
@@ -65,10 +122,95 @@ class TwoTierEmbeddingPipeline:
         Returns:
             Dictionary with indexing statistics
         """
+        return self.index_episodes([(child_chunks, parent_chunks, metadata, enriched_texts)])[0]
+    
+    def index_episodes(
+        self,
+        episodes: List[Tuple[List[ParentChildChunk], List[ParentChildChunk], VideoMetadata, Optional[List[str]]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Index several episodes with one embedding call and one upsert per tier.
+        
+        Same result as calling index_chunks per episode, but the per-call
+        overhead of the embedding backend (HTTP round trip, model launch) is
+        paid once for the whole group.
+        
+        Args:
+            episodes: (child_chunks, parent_chunks, metadata, enriched_texts)
+                tuples, as taken by index_chunks
+            
+        Returns:
+            One statistics dictionary per episode, in input order
+        """
+        plans = [self._plan_episode(*episode) for episode in episodes]
+        
+        # Generate embeddings (all episodes' texts in one call per tier)
+        core_formatted = [text for plan in plans for text in plan['core_formatted']]
+        print(f"Generating embeddings for {len(core_formatted)} core chunks...")
+        core_embeddings = self._embed_cached(core_formatted) if core_formatted else []
+        
+        # FIX 2: Only process longtail if not disabled and has chunks
+        longtail_formatted = [text for plan in plans for text in plan['longtail_formatted']]
+        if longtail_formatted:
+            print(f"Generating embeddings for {len(longtail_formatted)} longtail chunks...")
+            longtail_embeddings = self._embed_cached(longtail_formatted)
+        else:
+            longtail_embeddings = []
+        
+        # Prepare vectors per episode (records carry episode metadata)
+        core_parts, longtail_parts = [], []
+        core_offset = longtail_offset = 0
+        for plan in plans:
+            n_core = len(plan['core_chunks'])
+            n_longtail = len(plan['longtail_chunks'])
+            core_parts.append(self._prepare_vectors(
+                plan['core_chunks'], core_embeddings[core_offset:core_offset + n_core],
+                plan['core_formatted'], plan['metadata'], "core"
+            ))
+            longtail_parts.append(self._prepare_vectors(
+                plan['longtail_chunks'], longtail_embeddings[longtail_offset:longtail_offset + n_longtail],
+                plan['longtail_formatted'], plan['metadata'], "longtail"
+            ))
+            core_offset += n_core
+            longtail_offset += n_longtail
+        
+        # Upsert to respective stores
+        core_matrix, core_records = self._concat_vectors(core_parts)
+        if core_records:
+            print(f"Upserting {len(core_records)} vectors to core index...")
+            self.core_store.upsert_dense(core_matrix, core_records)
+        
+        longtail_matrix, longtail_records = self._concat_vectors(longtail_parts)
+        if longtail_records:
+            print(f"Upserting {len(longtail_records)} vectors to longtail index...")
+            self.longtail_store.upsert_dense(longtail_matrix, longtail_records)
+        
+        return [plan['stats'] for plan in plans]
+    
+    def _plan_episode(
+        self,
+        child_chunks: List[ParentChildChunk],
+        parent_chunks: List[ParentChildChunk],
+        metadata: VideoMetadata,
+        enriched_texts: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Store an episode's parents and classify and format its child chunks.
+        
+        Returns:
+            Dictionary with the per-tier chunks and formatted texts, the
+            metadata and the episode's indexing statistics
+        """
         # Store parent chunks
-        for parent_chunk in parent_chunks:
-            if parent_chunk.id:
-                self.parent_store[parent_chunk.id] = parent_chunk.text
+        if self._parent_disk_store is not None:
+            for parent_chunk in parent_chunks:
+                if parent_chunk.id:
+                    self._parent_disk_store[parent_chunk.id] = parent_chunk.text
+            self._parent_disk_store.flush()
+        else:
+            for parent_chunk in parent_chunks:
+                if parent_chunk.id:
+                    self._store_parent(parent_chunk.id, parent_chunk.text)
         
         # Classify chunks
         classifications = self.classifier.classify_batch(child_chunks)
@@ -120,64 +262,91 @@ class TwoTierEmbeddingPipeline:
         else:
             longtail_formatted = []
         
-        # Generate embeddings
-        print(f"Generating embeddings for {len(core_chunks)} core chunks...")
-        # Check if embed_batch supports batch_size parameter (FreeEmbeddingGenerator does)
-        if hasattr(self.embedding_generator, 'embed_batch'):
-            # Try with batch_size if supported (FreeEmbeddingGenerator)
-            try:
-                core_embeddings = self.embedding_generator.embed_batch(
-                    core_formatted, 
-                    batch_size=64,
-                    show_progress=True
-                )
-            except TypeError:
-                # Fallback for EmbeddingGenerator (OpenAI) which doesn't support batch_size
-                core_embeddings = self.embedding_generator.embed_batch(core_formatted)
-        else:
-            core_embeddings = [self.embedding_generator.embed(text) for text in core_formatted]
+        return {
+            'core_chunks': core_chunks,
+            'core_formatted': core_formatted,
+            'longtail_chunks': longtail_chunks,
+            'longtail_formatted': longtail_formatted,
+            'metadata': metadata,
+            'stats': {
+                "total_chunks": len(child_chunks),
+                "core_chunks": len(core_chunks),
+                "longtail_chunks": len(longtail_chunks),
+                "skipped_chunks": stats["total"] - stats["embeddable"],
+                "classification_stats": stats
+            }
+        }
+    
+    @staticmethod
+    def _concat_vectors(
+        parts: List[Tuple[np.ndarray, List[Dict[str, Any]]]]
+    ) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """Stack (matrix, records) pairs from _prepare_vectors into one pair."""
+        parts = [(matrix, records) for matrix, records in parts if records]
+        if not parts:
+            return np.empty((0, 0), dtype=np.float32), []
+        if len(parts) == 1:
+            return parts[0]
+        matrix = np.vstack([matrix for matrix, _ in parts])
+        return matrix, [record for _, records in parts for record in records]
+    
+    def _embed_cached(self, texts: List[str]) -> List[Any]:
+        """
+        Embed texts, serving unchanged ones from the embedding cache.
         
-        # FIX 2: Only process longtail if not disabled and has chunks
-        if not self.disable_two_tier and longtail_chunks:
-            print(f"Generating embeddings for {len(longtail_chunks)} longtail chunks...")
-            if hasattr(self.embedding_generator, 'embed_batch'):
-                try:
-                    longtail_embeddings = self.embedding_generator.embed_batch(
-                        longtail_formatted,
-                        batch_size=64,
-                        show_progress=True
-                    )
-                except TypeError:
-                    longtail_embeddings = self.embedding_generator.embed_batch(longtail_formatted)
-            else:
-                longtail_embeddings = [self.embedding_generator.embed(text) for text in longtail_formatted]
-        else:
-            longtail_embeddings = []
+        The key covers exactly what is embedded (the formatted text) plus the
+        provider, model and dimension, so any change to the chunk, its context
+        or the model misses. Only the misses are written back.
+        """
+        if self._embedding_cache is None:
+            # No cache: still embed repeated texts (intros, sponsor reads) once
+            unique = list(dict.fromkeys(texts))
+            if len(unique) == len(texts):
+                return self._embed_batch(texts)
+            by_text = dict(zip(unique, self._embed_batch(unique)))
+            print(f"Deduplicated {len(texts) - len(unique)} of {len(texts)} texts before embedding")
+            return [by_text[text] for text in texts]
         
-        # Prepare vectors for upsert
-        core_vectors = self._prepare_vectors(
-            core_chunks, core_embeddings, core_formatted, metadata, "core"
-        )
-        longtail_vectors = self._prepare_vectors(
-            longtail_chunks, longtail_embeddings, longtail_formatted, metadata, "longtail"
-        )
+        cache = self._embedding_cache
+        keys = [cache.key(text) for text in texts]
+        found = cache.get_many(set(keys))
         
-        # Upsert to respective stores
-        if core_vectors:
-            print(f"Upserting {len(core_vectors)} vectors to core index...")
-            self.core_store.upsert(core_vectors)
+        # Unique misses only: identical texts are embedded once
+        misses = {key: text for key, text in zip(keys, texts) if key not in found}
+        if misses:
+            embeddings = self._embed_batch(list(misses.values()))
+            new_vectors = {
+                key: np.asarray(embedding, dtype=np.float32)
+                for key, embedding in zip(misses, embeddings)
+            }
+            cache.put_many(new_vectors.items())
+            found.update(new_vectors)
+        print(f"Embedding cache: {len(misses)} embedded, {len(texts) - len(misses)} reused")
+        
+        return [found[key] for key in keys]
+    
+    def _embed_batch(self, texts: List[str]) -> Sequence[Sequence[float]]:
+        """
+        Embed texts with the generator's batch API.
         
-        if longtail_vectors:
-            print(f"Upserting {len(longtail_vectors)} vectors to longtail index...")
-            self.longtail_store.upsert(longtail_vectors)
+        FreeEmbeddingGenerator takes batch_size/show_progress, EmbeddingGenerator
+        (OpenAI) doesn't; which one we have is found out once and remembered.
+        """
+        embed_batch = getattr(self.embedding_generator, 'embed_batch', None)
+        if embed_batch is None:
+            return [self.embedding_generator.embed(text) for text in texts]
         
-        return {
-            "total_chunks": len(child_chunks),
-            "core_chunks": len(core_chunks),
-            "longtail_chunks": len(longtail_chunks),
-            "skipped_chunks": stats["total"] - stats["embeddable"],
-            "classification_stats": stats
-        }
+        if self._embed_batch_supports_batch_size is None:
+            try:
+                embeddings = embed_batch(texts, batch_size=64, show_progress=True)
+                self._embed_batch_supports_batch_size = True
+                return embeddings
+            except TypeError:
+                self._embed_batch_supports_batch_size = False
+        
+        if self._embed_batch_supports_batch_size:
+            return embed_batch(texts, batch_size=64, show_progress=True)
+        return embed_batch(texts)
     
     def _prepare_vectors(
         self,
@@ -186,31 +355,102 @@ class TwoTierEmbeddingPipeline:
         formatted_texts: List[str],
         metadata: VideoMetadata,
         tier: str
-    ) -> List[Dict[str, Any]]:
-        """Prepare vector records for upsert."""
+    ) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """
+        Prepare vectors for upsert.
+        
+        Returns:
+            Tuple of (float32 embedding matrix with one row per chunk,
+            metadata records in the same row order)
+        """
+        # One contiguous matrix instead of a List[float] per record
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2:
+            matrix = matrix.reshape(len(chunks), -1) if len(chunks) else matrix.reshape(0, 0)
+        if self.quantize != "fp32" and len(chunks):
+            matrix = quantize_embeddings(matrix, self.quantize)
         vectors = []
         
-        for chunk, embedding, formatted_text in zip(chunks, embeddings, formatted_texts):
+        # Timestamps converted column-wise (truncation matches int())
+        n = len(chunks)
+        starts = np.fromiter((c.start_seconds for c in chunks), dtype=np.float64, count=n).astype(np.int64).tolist()
+        ends = np.fromiter((c.end_seconds for c in chunks), dtype=np.float64, count=n).astype(np.int64).tolist()
+        
+        # Video-level fields are identical for every record
+        video_id = metadata.video_id
+        publish_date = metadata.publish_date
+        title = metadata.title or ''
+        guest = metadata.guest or ''
+        topics = metadata.topics or []
+        
+        # IDs are deterministic per (tier, video, chunk), so re-indexing an
+        # episode (e.g. retrying after a partial upsert) replaces its vectors
+        # instead of adding copies; without a video_id they are salted instead
+        id_prefix = f"{tier}_{video_id}_" if video_id else None
+        
+        for chunk, formatted_text, start, end in zip(chunks, formatted_texts, starts, ends):
             vector_record = {
-                'id': f"{tier}_{chunk.id}_{uuid.uuid4().hex[:8]}",  # Unique ID with tier prefix
-                'vector': embedding,
+                'id': (
+                    f"{id_prefix}{chunk.id}" if id_prefix
+                    else f"{tier}_{chunk.id}_{self._id_salt}{next(self._id_counter):06x}"
+                ),
                 'text': chunk.text,  # Original text for display
                 'formatted_text': formatted_text,  # What was actually embedded
-                'video_id': metadata.video_id,
-                'start_seconds': int(chunk.start_seconds),
-                'end_seconds': int(chunk.end_seconds),
+                'video_id': video_id,
+                'start_seconds': start,
+                'end_seconds': end,
+                # None on the chunk means "unknown" (and is persisted as null), so
+                # the empty-string normalization for the stores stays here
                 'speaker': chunk.speaker or '',
                 'parent_id': chunk.parent_id or '',
-                'publish_date': metadata.publish_date,
+                'child_offset': chunk.child_offset_in_parent,
+                'publish_date': publish_date,
                 'tier': tier,  # "core" or "longtail"
-                'title': metadata.title or '',
-                'guest': metadata.guest or '',
-                'topics': metadata.topics or []
+                'title': title,
+                'guest': guest,
+                'topics': topics,
+                'quant': self.quantize
             }
             vectors.append(vector_record)
         
-        return vectors
+        return matrix, vectors
+    
+    def _store_parent(self, parent_id: str, text: str):
+        """Add or replace a parent chunk text."""
+        idx = self._parent_index.get(parent_id)
+        if idx is None:
+            self._parent_index[parent_id] = len(self._parent_ids)
+            self._parent_ids.append(parent_id)
+            self._parent_texts.append(text)
+        else:
+            self._parent_texts[idx] = text
+    
+    @property
+    def parent_store(self) -> Dict[str, str]:
+        """Parent texts keyed by parent_id (built on access)."""
+        if self._parent_disk_store is not None:
+            return dict(self._parent_disk_store.items())
+        return dict(zip(self._parent_ids, self._parent_texts))
     
     def get_parent_text(self, parent_id: str) -> Optional[str]:
         """Get parent chunk text by ID."""
-        return self.parent_store.get(parent_id)
+        if self._parent_disk_store is not None:
+            return self._parent_disk_store.get(parent_id)
+        idx = self._parent_index.get(parent_id)
+        return self._parent_texts[idx] if idx is not None else None
+    
+    def get_parent_texts(self, parent_ids: List[str]) -> Dict[str, str]:
+        """
+        Get several parent chunk texts at once.
+        
+        Args:
+            parent_ids: Parent chunk IDs
+            
+        Returns:
+            Dictionary of parent_id -> text for the IDs that are known
+        """
+        if self._parent_disk_store is not None:
+            return self._parent_disk_store.get_many(parent_ids)
+        index = self._parent_index
+        texts = self._parent_texts
+        return {pid: texts[index[pid]] for pid in parent_ids if pid in index}
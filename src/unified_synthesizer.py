@@ -8,7 +8,17 @@ PROMPT CACHING:
 - User prompt is dynamic (query, sources, memory)
 """
 
-from typing import List, Dict, Any, Optional, Iterator
+import hashlib
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from .retrieval import RetrievalResult
 from .llm.base import BaseLLM
 
@@ -18,6 +28,44 @@ try:
 except ImportError:
     CACHED_SYSTEM_PROMPT = None
 
+# All synthesizer output goes through this logger (not print) so it can be
+# silenced or routed off the request thread; see enable_queue_logging()
+logger = logging.getLogger(__name__)
+
+# Default handler: INFO and up on stdout, the way the print-based
+# diagnostics used to appear (enable_queue_logging swaps it for a queue)
+_stdout_handler = logging.StreamHandler(sys.stdout)
+_stdout_handler.setFormatter(logging.Formatter("   %(message)s"))
+if not logger.handlers:
+    logger.addHandler(_stdout_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Static head of every user prompt: sits right after the system prompt so the
+# cached prefix extends into the user message. Dynamic sections follow it.
+PROMPT_STATIC_PREFIX = """RESPOND USING THIS EXACT FORMAT (no markdown, no headers with #):
+
+Direct Answer
+[your 2-3 sentence answer here]
+
+Key Ideas
+• [bullet 1]
+• [bullet 2]
+• [bullet 3]
+
+Common Pitfall
+[one sentence]
+
+Summary
+[one sentence]"""
+
+# Guidance appended after the question for each confidence level
+CONFIDENCE_NOTES = {
+    "high": "Sources are strong and directly relevant. Be authoritative.",
+    "medium": "Sources are relevant but not comprehensive. Be balanced.",
+    "low": "Sources are weak. Acknowledge limitations and be concise."
+}
+
 
 class UnifiedSynthesizer:
     """
@@ -81,7 +129,7 @@ STYLE:
 • NO markdown formatting ever"""
     
     # Refusal phrases to detect safety responses
-    REFUSAL_PHRASES = [
+    REFUSAL_PHRASES = frozenset([
         "i cannot provide",
         "i can't help with",
         "i'm unable to assist",
@@ -96,7 +144,17 @@ STYLE:
         "not able to provide",
         "i can't provide",
         "unable to help"
-    ]
+    ])
+    
+    # All phrases as one alternation: a single scan instead of one per phrase
+    # (sorted so the pattern is the same on every run)
+    _REFUSAL_PATTERN = re.compile("|".join(re.escape(phrase) for phrase in sorted(REFUSAL_PHRASES)))
+    
+    # Refusals open the answer; only this many leading characters are scanned
+    REFUSAL_SCAN_CHARS = 256
+    
+    # Refusals are short; answers longer than this are never treated as one
+    REFUSAL_MAX_CHARS = 2048
     
     @staticmethod
     def _is_refusal(answer: str) -> bool:
@@ -106,13 +164,17 @@ STYLE:
         
         This matches behavior of ChatGPT, Perplexity, and Google.
         """
-        answer_lower = answer.lower()
-        return any(phrase in answer_lower for phrase in UnifiedSynthesizer.REFUSAL_PHRASES)
+        if len(answer) > UnifiedSynthesizer.REFUSAL_MAX_CHARS:
+            return False
+        head = answer[:UnifiedSynthesizer.REFUSAL_SCAN_CHARS].lower()
+        return UnifiedSynthesizer._REFUSAL_PATTERN.search(head) is not None
     
     def __init__(
         self,
         llm_client: BaseLLM,
-        mode: str = "fast"
+        mode: str = "fast",
+        response_cache_size: int = 1024,
+        response_cache_ttl: float = 7200.0
     ):
         """
         Initialize synthesizer.
@@ -120,12 +182,26 @@ STYLE:
         Args:
             llm_client: LLM instance (Groq, Ollama, etc.)
             mode: "fast" or "deep"
+            response_cache_size: Max answers kept for exact repeat prompts (0 = off)
+            response_cache_ttl: Seconds a cached answer stays valid (keeps answers
+                from outliving index or prompt updates for long)
         """
         self.llm = llm_client
         self.mode = mode
         self.provider = llm_client.get_provider_name()
         
-        print(f"   [OK] Synthesizer ready (provider: {self.provider}, mode: {mode})")
+        # Exact-match answer cache: hash(system prompt, user prompt) -> (time, answer)
+        self.response_cache_size = response_cache_size
+        self.response_cache_ttl = response_cache_ttl
+        self._response_cache: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+        
+        # SYSTEM_PROMPT is static: hash it once for the cache-routing key
+        self._system_prompt_digest = hashlib.blake2b(
+            self.SYSTEM_PROMPT.encode('utf-8'), digest_size=8
+        ).digest()
+        
+        logger.info("[OK] Synthesizer ready (provider: %s, mode: %s)", self.provider, mode)
     
     def _compute_confidence(self, chunks: List[RetrievalResult]) -> str:
         """
@@ -166,20 +242,30 @@ STYLE:
         # Hard limit on number of chunks
         limited = unique[:max_chunks]
         
-        # Truncate each chunk's text
+        # Truncate each chunk's text (the only truncation; context blocks reuse it)
         for chunk in limited:
             text = chunk.parent_text if chunk.parent_text else chunk.text
             if len(text) > self.MAX_CHARS_PER_CHUNK:
-                truncated = text[:self.MAX_CHARS_PER_CHUNK]
-                last_period = truncated.rfind('.')
-                if last_period > self.MAX_CHARS_PER_CHUNK * 0.8:
-                    truncated = truncated[:last_period + 1]
-                chunk.parent_text = truncated + "..."
+                chunk.parent_text = self._truncate_at_sentence(text)
         
-        print(f"   [CONTEXT] Using {len(limited)} chunks (max: {max_chunks})")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[CONTEXT] Using %d chunks (max: %d)", len(limited), max_chunks)
         
         return limited
     
+    def _truncate_at_sentence(self, text: str) -> str:
+        """
+        Cut text to MAX_CHARS_PER_CHUNK, backing up to the last period if one
+        falls in the final 20%, and mark the cut with "...".
+        """
+        limit = self.MAX_CHARS_PER_CHUNK
+        truncated = text[:limit]
+        # Only the tail past 80% can hold an acceptable boundary, so only scan that
+        last_period = truncated.rfind('.', int(limit * 0.8) + 1)
+        if last_period != -1:
+            truncated = truncated[:last_period + 1]
+        return truncated + "..."
+    
     def _get_source_weight(self, score: float) -> str:
         """Determine source weight based on FAISS score."""
         if score >= 0.70:
@@ -189,42 +275,65 @@ STYLE:
         else:
             return "LOW"
     
-    def _build_context_blocks(self, chunks: List[RetrievalResult]) -> str:
+    def _process_chunks(
+        self,
+        chunks: List[RetrievalResult]
+    ) -> Tuple[str, List[Dict[str, Any]], List[Dict[str, str]]]:
         """
-        Build weighted context blocks with SOURCE numbers for citation.
-        Sources are explicitly weighted (HIGH/MEDIUM/LOW) for the LLM.
+        Build the context blocks, citations and sources in one pass.
+        
+        Context blocks carry SOURCE numbers for citation and are explicitly
+        weighted (HIGH/MEDIUM/LOW) for the LLM. Citations are GROUND-TRUTH
+        (built from chunk metadata, no hallucination possible).
+        
+        Expects chunks from _enforce_context_limits (text already truncated).
+        
+        Returns:
+            Tuple of (context string, citations, distinct sources)
         """
         blocks = []
+        citations = []
+        # Distinct sources in first-seen order; keyed by all fields (the URL
+        # carries the timestamp, so one video can appear more than once)
+        sources_by_key: Dict[Tuple[str, str, str], Dict[str, str]] = {}
         
         for i, chunk in enumerate(chunks, 1):
-            # Get metadata for citations
-            speaker = chunk.get_speaker() if hasattr(chunk, 'get_speaker') else (chunk.speaker or chunk.guest or 'Unknown')
+            # Use helper methods if available, otherwise compute directly
+            speaker = chunk.get_speaker() if hasattr(chunk, 'get_speaker') else (chunk.speaker or getattr(chunk, 'guest', None) or 'Unknown')
             timestamp = chunk.get_timestamp_str() if hasattr(chunk, 'get_timestamp_str') else f"{int(chunk.start_seconds // 60)}m{int(chunk.start_seconds % 60)}s"
+            youtube_url = chunk.get_youtube_url() if hasattr(chunk, 'get_youtube_url') else f"https://www.youtube.com/watch?v={chunk.video_id}&t={int(chunk.start_seconds)}s"
             video_title = getattr(chunk, 'video_title', '') or f"Episode {chunk.video_id}"
+            video_id = chunk.video_id
             
             # Determine source weight
             weight = self._get_source_weight(chunk.score)
             
             text = chunk.parent_text if chunk.parent_text else chunk.text
             
-            # Truncate text if needed
-            if len(text) > self.MAX_CHARS_PER_CHUNK:
-                truncated = text[:self.MAX_CHARS_PER_CHUNK]
-                last_period = truncated.rfind('.')
-                if last_period > self.MAX_CHARS_PER_CHUNK * 0.8:
-                    truncated = truncated[:last_period + 1]
-                text = truncated + "..."
-            
-            block = f"""SOURCE [{i}] - Confidence: {weight}
+            blocks.append(f"""SOURCE [{i}] - Confidence: {weight}
 Speaker: {speaker}
 Video: {video_title}
 Timestamp: {timestamp}
 Excerpt:
 {text}
-"""
-            blocks.append(block)
+""")
+            
+            child_text = chunk.text
+            citations.append({
+                'source_num': i,  # Matches [SOURCE X] in answer
+                'speaker': speaker,
+                'video_title': video_title,
+                'timestamp': timestamp,
+                'youtube_url': youtube_url,
+                'video_id': video_id,
+                'text_preview': child_text[:150] + "..." if len(child_text) > 150 else child_text
+            })
+            
+            key = (video_id, youtube_url, video_title)
+            if key not in sources_by_key:
+                sources_by_key[key] = {'video_id': video_id, 'youtube_url': youtube_url, 'video_title': video_title}
         
-        return "\n\n".join(blocks)
+        return "\n\n".join(blocks), citations, list(sources_by_key.values())
     
     def _build_prompt(
         self, 
@@ -239,20 +348,16 @@ Excerpt:
         Build complete prompt with proper assembly order for caching.
         
         ASSEMBLY ORDER (CRITICAL for prompt caching):
+        0. [OUTPUT FORMAT]   ← static, identical on every request
         1. [SUMMARY MEMORY]  ← compressed earlier conversation
         2. [RAG CONTEXT]     ← FAISS results
         3. [RECENT TURNS]    ← last 2 turns
-        4. [USER QUERY]
+        4. [USER QUERY]      ← plus confidence note
         
-        Note: System prompt is handled separately (static, cached by Groq)
+        Note: System prompt is handled separately (static, cached by Groq).
+        Together with the static block it forms the cacheable prefix.
         """
-        confidence_note = {
-            "high": "Sources are strong and directly relevant. Be authoritative.",
-            "medium": "Sources are relevant but not comprehensive. Be balanced.",
-            "low": "Sources are weak. Acknowledge limitations and be concise."
-        }
-        
-        sections = []
+        sections = [PROMPT_STATIC_PREFIX]
         
         # 1. Summary Memory (compressed earlier conversation)
         if summary_memory:
@@ -283,23 +388,9 @@ All factual claims must come from the VERIFIED SOURCES above.""")
 {query}
 
 CONFIDENCE LEVEL: {confidence.upper()}
-{confidence_note[confidence]}
+{CONFIDENCE_NOTES[confidence]}
 
-RESPOND USING THIS EXACT FORMAT (no markdown, no headers with #):
-
-Direct Answer
-[your 2-3 sentence answer here]
-
-Key Ideas
-• [bullet 1]
-• [bullet 2]
-• [bullet 3]
-
-Common Pitfall
-[one sentence]
-
-Summary
-[one sentence]""")
+Respond using the EXACT FORMAT given at the top (no markdown, no headers with #).""")
         
         return "\n\n---\n\n".join(sections)
     
@@ -311,7 +402,8 @@ Summary
         mode: Optional[str] = None,
         conversation_context: Optional[str] = None,
         summary_memory: Optional[str] = None,
-        recent_turns: Optional[str] = None
+        recent_turns: Optional[str] = None,
+        session_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Synthesize answer using configured LLM backend.
@@ -328,21 +420,106 @@ Summary
             conversation_context: Previous conversation turns (legacy format)
             summary_memory: Compressed earlier conversation summary
             recent_turns: Last 2 conversation turns
+            session_id: Stable conversation ID; hashed into a routing key so the
+                provider sends repeat requests to the same prompt cache
             
         Returns:
             Dictionary with answer, citations, confidence, etc.
         """
         if not retrieved_chunks:
-            return {
-                'answer': "I couldn't find relevant information to answer your question.",
-                'citations': [],
-                'sources': [],
-                'num_chunks_used': 0,
-                'confidence': 'low',
-                'provider': self.provider,
-                'mode': mode or self.mode
-            }
+            return self._empty_result(mode)
+        
+        active_mode, top_chunks, confidence, prompt, chunk_citations, chunk_sources = self._prepare(
+            query, retrieved_chunks, mode, conversation_context, summary_memory, recent_turns
+        )
+        
+        # Generate answer using PROPER system prompt
+        try:
+            answer = self._generate_cached(prompt, self._route_key(session_id))
+        except Exception as e:
+            logger.error("[ERROR] LLM generation failed: %s", e)
+            return self._error_result(e, top_chunks, confidence, active_mode)
+        
+        return self._finalize(
+            answer, top_chunks, confidence, chunk_citations, chunk_sources,
+            include_citations, active_mode
+        )
+    
+    def synthesize_stream(
+        self,
+        query: str,
+        retrieved_chunks: List[RetrievalResult],
+        include_citations: bool = True,
+        mode: Optional[str] = None,
+        conversation_context: Optional[str] = None,
+        summary_memory: Optional[str] = None,
+        recent_turns: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming variant of synthesize().
+        
+        Citations are built from the chunks before generation starts, so they
+        are ready the moment the last token arrives.
+        
+        Args:
+            Same as synthesize()
+            
+        Yields:
+            {'answer_delta': text} per generated piece, then one final
+            {'done': True, ...} dict with the same fields synthesize() returns
+        """
+        if not retrieved_chunks:
+            yield {'done': True, **self._empty_result(mode)}
+            return
         
+        active_mode, top_chunks, confidence, prompt, chunk_citations, chunk_sources = self._prepare(
+            query, retrieved_chunks, mode, conversation_context, summary_memory, recent_turns
+        )
+        
+        key = self._response_cache_key(prompt) if self.response_cache_size > 0 else None
+        answer = self._response_cache_get(key) if key is not None else None
+        
+        if answer is not None:
+            yield {'answer_delta': answer}
+        else:
+            parts = []
+            try:
+                for piece in self.llm.generate_stream_with_system(
+                    system_prompt=self.SYSTEM_PROMPT,
+                    user_prompt=prompt,
+                    session_id=self._route_key(session_id)
+                ):
+                    parts.append(piece)
+                    yield {'answer_delta': piece}
+            except Exception as e:
+                logger.error("[ERROR] LLM streaming failed: %s", e)
+                yield {'done': True, **self._error_result(e, top_chunks, confidence, active_mode)}
+                return
+            answer = "".join(parts).strip()
+            if key is not None:
+                self._response_cache_put(key, answer)
+        
+        yield {'done': True, **self._finalize(
+            answer, top_chunks, confidence, chunk_citations, chunk_sources,
+            include_citations, active_mode
+        )}
+    
+    def _prepare(
+        self,
+        query: str,
+        retrieved_chunks: List[RetrievalResult],
+        mode: Optional[str],
+        conversation_context: Optional[str],
+        summary_memory: Optional[str],
+        recent_turns: Optional[str]
+    ) -> Tuple[str, List[RetrievalResult], str, str, List[Dict[str, Any]], List[Dict[str, str]]]:
+        """
+        Everything before the LLM call: limits, confidence, context and prompt.
+        
+        Returns:
+            Tuple of (active mode, top chunks, confidence, prompt, citations, sources)
+        """
         # Determine mode limits
         active_mode = mode or self.mode
         max_chunks = self.MAX_CHUNKS_FAST if active_mode == "fast" else self.MAX_CHUNKS_DEEP
@@ -352,10 +529,13 @@ Summary
         
         # Compute confidence
         confidence = self._compute_confidence(top_chunks)
-        print(f"   [CONFIDENCE] {confidence.upper()}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[CONFIDENCE] %s", confidence.upper())
+        
+        # Context, citations and sources in one pass over the chunks
+        context, chunk_citations, chunk_sources = self._process_chunks(top_chunks)
         
         # Build prompt with proper assembly order for caching
-        context = self._build_context_blocks(top_chunks)
         prompt = self._build_prompt(
             context=context, 
             query=query, 
@@ -365,56 +545,31 @@ Summary
             recent_turns=recent_turns
         )
         
-        # Generate answer using PROPER system prompt
-        try:
-            answer = self.llm.generate_with_system(
-                system_prompt=self.SYSTEM_PROMPT,
-                user_prompt=prompt
-            )
-        except Exception as e:
-            print(f"   [ERROR] LLM generation failed: {e}")
-            return {
-                'answer': f"Error generating answer: {str(e)[:100]}",
-                'citations': [],
-                'sources': [],
-                'num_chunks_used': len(top_chunks),
-                'confidence': confidence,
-                'provider': self.provider,
-                'mode': active_mode
-            }
-        
+        return active_mode, top_chunks, confidence, prompt, chunk_citations, chunk_sources
+    
+    def _finalize(
+        self,
+        answer: str,
+        top_chunks: List[RetrievalResult],
+        confidence: str,
+        chunk_citations: List[Dict[str, Any]],
+        chunk_sources: List[Dict[str, str]],
+        include_citations: bool,
+        active_mode: str
+    ) -> Dict[str, Any]:
+        """Refusal check and result assembly once the full answer is known."""
         # SAFETY CHECK: Detect refusals - don't show citations for refused questions
         is_refusal = self._is_refusal(answer)
         if is_refusal:
-            print("   [SAFETY] Refusal detected - hiding citations")
+            logger.info("[SAFETY] Refusal detected - hiding citations")
             confidence = "low"  # Override confidence for refusals
         
-        # Build GROUND-TRUTH citations (no hallucination possible)
+        # Show the GROUND-TRUTH citations built above
         # BUT: Skip if LLM refused (citations would be irrelevant)
-        citations = []
-        sources = []
-        
         if include_citations and not is_refusal:
-            for i, chunk in enumerate(top_chunks, 1):
-                # Use helper methods if available, otherwise compute directly
-                speaker = chunk.get_speaker() if hasattr(chunk, 'get_speaker') else (chunk.speaker or getattr(chunk, 'guest', None) or 'Unknown')
-                timestamp_str = chunk.get_timestamp_str() if hasattr(chunk, 'get_timestamp_str') else f"{int(chunk.start_seconds // 60)}m{int(chunk.start_seconds % 60)}s"
-                youtube_url = chunk.get_youtube_url() if hasattr(chunk, 'get_youtube_url') else f"https://www.youtube.com/watch?v={chunk.video_id}&t={int(chunk.start_seconds)}s"
-                video_title = getattr(chunk, 'video_title', '') or f"Episode {chunk.video_id}"
-                
-                citations.append({
-                    'source_num': i,  # Matches [SOURCE X] in answer
-                    'speaker': speaker,
-                    'video_title': video_title,
-                    'timestamp': timestamp_str,
-                    'youtube_url': youtube_url,
-                    'video_id': chunk.video_id,
-                    'text_preview': chunk.text[:150] + "..." if len(chunk.text) > 150 else chunk.text
-                })
-                
-                source = {'video_id': chunk.video_id, 'youtube_url': youtube_url, 'video_title': video_title}
-                if source not in sources:
-                    sources.append(source)
+            citations, sources = chunk_citations, chunk_sources
+        else:
+            citations, sources = [], []
         
         return {
             'answer': answer,
@@ -426,3 +581,153 @@ Summary
             'mode': active_mode,
             'is_refusal': is_refusal
         }
+    
+    def _route_key(self, session_id: Optional[str]) -> str:
+        """
+        Provider cache-routing key for a conversation.
+        
+        8-byte hex of (system prompt, session): stable per session, changes
+        with the system prompt, and never sends the raw session ID out.
+        Requests without a session share the "global" key.
+        """
+        return hashlib.blake2b(
+            self._system_prompt_digest + (session_id or "global").encode('utf-8'),
+            digest_size=8
+        ).hexdigest()
+    
+    def _empty_result(self, mode: Optional[str]) -> Dict[str, Any]:
+        """Result when retrieval found nothing."""
+        return {
+            'answer': "I couldn't find relevant information to answer your question.",
+            'citations': [],
+            'sources': [],
+            'num_chunks_used': 0,
+            'confidence': 'low',
+            'provider': self.provider,
+            'mode': mode or self.mode
+        }
+    
+    def _error_result(
+        self,
+        error: Exception,
+        top_chunks: List[RetrievalResult],
+        confidence: str,
+        active_mode: str
+    ) -> Dict[str, Any]:
+        """Result when the LLM call failed."""
+        return {
+            'answer': f"Error generating answer: {str(error)[:100]}",
+            'citations': [],
+            'sources': [],
+            'num_chunks_used': len(top_chunks),
+            'confidence': confidence,
+            'provider': self.provider,
+            'mode': active_mode
+        }
+    
+    def _response_cache_key(self, prompt: str) -> bytes:
+        """Hash of everything the LLM sees for this prompt."""
+        return hashlib.blake2b(
+            f"{self.SYSTEM_PROMPT}\0{prompt}".encode('utf-8'), digest_size=16
+        ).digest()
+    
+    def _response_cache_get(self, key: bytes) -> Optional[str]:
+        """Cached answer for a key, or None if missing or expired."""
+        with self._response_cache_lock:
+            entry = self._response_cache.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] < self.response_cache_ttl:
+                self._response_cache.move_to_end(key)
+                logger.info("[CACHE HIT] Reusing answer for identical prompt")
+                return entry[1]
+            del self._response_cache[key]
+            return None
+    
+    def _response_cache_put(self, key: bytes, answer: str):
+        """Store an answer, evicting the least recently used beyond the limit."""
+        with self._response_cache_lock:
+            self._response_cache[key] = (time.monotonic(), answer)
+            while len(self._response_cache) > self.response_cache_size:
+                self._response_cache.popitem(last=False)
+    
+    def _generate_cached(self, prompt: str, session_id: Optional[str] = None) -> str:
+        """
+        Generate an answer, reusing the previous answer for an identical prompt.
+        
+        The user prompt already contains the sources, memory and query, so an
+        exact match means the LLM would see the same input.
+        """
+        if self.response_cache_size <= 0:
+            return self.llm.generate_with_system(
+                system_prompt=self.SYSTEM_PROMPT,
+                user_prompt=prompt,
+                session_id=session_id
+            )
+        
+        key = self._response_cache_key(prompt)
+        answer = self._response_cache_get(key)
+        if answer is not None:
+            return answer
+        
+        answer = self.llm.generate_with_system(
+            system_prompt=self.SYSTEM_PROMPT,
+            user_prompt=prompt,
+            session_id=session_id
+        )
+        self._response_cache_put(key, answer)
+        return answer
+    
+    def synthesize_batch(
+        self,
+        requests: List[Dict[str, Any]],
+        max_workers: int = 4
+    ) -> List[Dict[str, Any]]:
+        """
+        Synthesize several answers concurrently.
+        
+        Each LLM call is blocking network I/O, so independent requests are
+        overlapped on a thread pool instead of running back to back. All of
+        them share SYSTEM_PROMPT and the static prompt prefix, so they hit
+        the same provider prompt cache.
+        
+        Args:
+            requests: One dict of synthesize() keyword arguments per answer
+                (at least 'query' and 'retrieved_chunks')
+            max_workers: Maximum concurrent LLM calls
+            
+        Returns:
+            synthesize() results in the same order as requests
+        """
+        if len(requests) <= 1:
+            return [self.synthesize(**kwargs) for kwargs in requests]
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(requests))) as executor:
+            return list(executor.map(lambda kwargs: self.synthesize(**kwargs), requests))
+
+
+def enable_queue_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """
+    Print synthesizer logs from a background thread.
+    
+    Request threads only put records on a queue; a listener thread formats
+    them and writes to stdout, so a slow or full pipe never blocks a request.
+    Replaces the module's default stdout handler.
+    
+    Args:
+        level: Minimum level to emit
+        
+    Returns:
+        The started QueueListener (call .stop() on shutdown to flush)
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("   %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    
+    logger.removeHandler(_stdout_handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+    listener.start()
+    return listener